@@ -1,23 +1,46 @@
-# kessler-game/examples/scenario_test.py
+# kessler-game/examples/LLM_scenario.py
+import argparse
+import hashlib
+import json
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 from kesslergame import Scenario, KesslerGame, GraphicsType
-from fuzzy_aggressive_controller import AggressiveFuzzyController
+from fuzzy_aggressive_controller import AggressiveFuzzyController, DEFAULT_RULES
+from fuzzy_rules import RuleSpec
 #from defensive_fuzzy import DefensiveFuzzyController
-from LLM import gen_rule_set, insert_gen_code
-# Define game scenario
-
-def run_game():
-    my_test_scenario = Scenario(name='Test Scenario',
-                                num_asteroids=10,
-                                ship_states=[
-                                    #{'position': (400, 400), 'angle': 90, 'lives': 3, 'team': 1, "mines_remaining": 3},
-                                    {'position': (400, 600), 'angle': 90, 'lives': 3, 'team': 2, "mines_remaining": 3},
-                                ],
-                                map_size=(1000, 800),
-                                time_limit=120,
-                                ammo_limit_multiplier=0,
-                                stop_if_no_ammo=False)
+from LLM import OpenAIRuleGenerator, StubRuleGenerator
+
+"""
+Rule set search: a generator proposes rule sets, each one plays headlessly through --seeds seeded
+scenarios in parallel worker processes, and the fitness is stored by the rule set's RuleSpec key and
+the evaluation setup (fitness_cache.jsonl), so a proposal seen before, even reformatted, is never
+simulated again with the same --seeds, --time_limit and --death_penalty.
+Rule sets go straight into AggressiveFuzzyController(rules=...), no source patching.
+
+    python LLM_scenario.py --rounds 7                 # OpenAI generator
+    python LLM_scenario.py --rounds 20 --offline      # local stub generator, no network
+    python LLM_scenario.py --watch <hash>             # replay a cached rule set in realtime
+"""
+
+
+def make_scenario(seed=None, time_limit=120):
+    return Scenario(name='Test Scenario',
+                    num_asteroids=10,
+                    ship_states=[
+                        #{'position': (400, 400), 'angle': 90, 'lives': 3, 'team': 1, "mines_remaining": 3},
+                        {'position': (400, 600), 'angle': 90, 'lives': 3, 'team': 2, "mines_remaining": 3},
+                    ],
+                    map_size=(1000, 800),
+                    seed=seed,
+                    time_limit=time_limit,
+                    ammo_limit_multiplier=0,
+                    stop_if_no_ammo=False)
+
+
+def run_game(rules=None):
+    my_test_scenario = make_scenario()
 
     # Define Game Settings
     game_settings = {
@@ -34,7 +57,7 @@ def run_game():
     pre = time.perf_counter()
     score, perf_data = game.run(
         scenario=my_test_scenario,
-        controllers=[AggressiveFuzzyController()]
+        controllers=[AggressiveFuzzyController(rules=rules)]
     )
 
     print("Game ended — restarting!")
@@ -55,21 +78,149 @@ def run_game():
     ]
     return row
 
+
+def rule_hash(code):
+    # Same key for the same rules however they are written; unparseable text is keyed by itself
+    try:
+        return RuleSpec.parse(code).key()
+    except (SyntaxError, ValueError, KeyError, TypeError):
+        return hashlib.sha256(code.strip().encode("utf-8")).hexdigest()[:16]
+
+
+class FitnessCache:
+    """
+    Fitness per (rule hash, seeds, time_limit, death_penalty), appended to a JSONL file so it survives
+    across runs. Fitness from another evaluation setup is not comparable, so it is never reused.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.entries[self._entry_key(entry)] = entry
+
+    @staticmethod
+    def key(h, seeds, time_limit, death_penalty):
+        return h, int(seeds), float(time_limit), float(death_penalty)
+
+    @classmethod
+    def _entry_key(cls, entry):
+        if "seeds" not in entry or "time_limit" not in entry:
+            return entry["hash"], None, None, None
+        # Entries written before death_penalty was stored all used the default of 10
+        return cls.key(entry["hash"], entry["seeds"], entry["time_limit"], entry.get("death_penalty", 10.0))
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __getitem__(self, key):
+        return self.entries[key]
+
+    def rules(self, h):
+        """The rule text stored for a rule hash, under any evaluation setup."""
+        for entry in reversed(list(self.entries.values())):
+            if entry["hash"] == h:
+                return entry["rules"]
+        raise KeyError(h)
+
+    def add(self, entry):
+        self.entries[self._entry_key(entry)] = entry
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+
+def play_seed(rules, seed, time_limit):
+    # One headless game in a worker process; an invalid rule set fails here, not in the parent.
+    # The worker builds each rule set's fuzzy system once and reuses it for its other seeds.
+    try:
+        controller = AggressiveFuzzyController(rules=rules)
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+    game = KesslerGame(settings={'perf_tracker': True, 'graphics_type': GraphicsType.NoGraphics, 'prints_on': False})
+    score, _ = game.run(scenario=make_scenario(seed, time_limit), controllers=[controller])
+    team = score.teams[0]
+    return {"asteroids_hit": team.asteroids_hit, "deaths": team.deaths, "shots_fired": team.shots_fired,
+            "bullets_hit": team.bullets_hit, "eval_seconds": team.eval_times[-1] if team.eval_times else 0.0,
+            "frames": len(team.eval_times)}
+
+
+def fitness(games, death_penalty=10.0):
+    errors = [g["error"] for g in games if "error" in g]
+    if errors:
+        return {"status": "invalid", "error": errors[0], "score": None}
+    total = {k: sum(g[k] for g in games) for k in games[0]}
+    return {
+        "status": "ok",
+        "score": total["asteroids_hit"] - death_penalty * total["deaths"],
+        "asteroids_hit": total["asteroids_hit"],
+        "deaths": total["deaths"],
+        "accuracy": total["bullets_hit"] / total["shots_fired"] if total["shots_fired"] else 0.0,
+        "eval_ms": 1000 * total["eval_seconds"] / max(total["frames"], 1),
+    }
+
+
+def evaluate(rule_sets, seeds, time_limit, workers=None, death_penalty=10.0):
+    #{hash: fitness} for {hash: rule code}; every (rule set, seed) game is one pool job
+    jobs = [(h, seed) for h in rule_sets for seed in seeds]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(play_seed, rule_sets[h], seed, time_limit) for h, seed in jobs]
+        games = [f.result() for f in futures]
+    return {h: fitness([g for (jh, _), g in zip(jobs, games) if jh == h], death_penalty) for h in rule_sets}
+
+
 def main():
+    arguments = argparse.ArgumentParser()
+    arguments.add_argument("--rounds", type=int, default=7, help="rule sets to request from the generator")
+    arguments.add_argument("--seeds", type=int, default=8, help="seeded scenarios per rule set")
+    arguments.add_argument("--time_limit", type=float, default=60)
+    arguments.add_argument("--death_penalty", type=float, default=10.0, help="score lost per death in the fitness")
+    arguments.add_argument("--workers", type=int, default=None, help="game worker processes (default: all cores)")
+    arguments.add_argument("--offline", action="store_true", help="use the local StubRuleGenerator instead of OpenAI")
+    arguments.add_argument("--cache", default="fitness_cache.jsonl")
+    arguments.add_argument("--out", default="rule_search.csv")
+    arguments.add_argument("--watch", default=None, help="play the cached rule set with this hash in realtime")
+    args = arguments.parse_args()
+
+    cache = FitnessCache(args.cache)
+    if args.watch:
+        run_game(cache.rules(args.watch))
+        return
 
-    columns = ["eval_time", "stop_reason", "asteroids_hit", "deaths", "accuracy", "mean_eval_time"]
-    df = pd.DataFrame(columns=columns)
-    for i in range(7):
-        if i > 0:
-            code = gen_rule_set()
-            insert_gen_code(code)
-        for j in range(1):
-            row = run_game()
-            df.loc[len(df)] = row
-            print(f"Rule set {i+1}, experiment {j+1} complete")
+    # The base rules are round 0, as the original loop played the unmodified controller first
+    generator = StubRuleGenerator() if args.offline else OpenAIRuleGenerator()
+    proposals = [DEFAULT_RULES] + [generator() for _ in range(args.rounds)]
 
-        df.to_csv(f'Ruleset_{i}.csv')
+    def cache_key(code):
+        return FitnessCache.key(rule_hash(code), args.seeds, args.time_limit, args.death_penalty)
+
+    pending = {}
+    for code in proposals:
+        h = rule_hash(code)
+        if cache_key(code) not in cache and h not in pending:
+            pending[h] = code
+    print(f"{len(proposals)} rule sets, {len(proposals) - len(pending)} already evaluated, "
+          f"simulating {len(pending)} x {args.seeds} seeds")
+
+    pre = time.perf_counter()
+    seeds = list(range(args.seeds))
+    if pending:
+        results = evaluate(pending, seeds, args.time_limit, args.workers, args.death_penalty)
+        for h, code in pending.items():
+            cache.add(dict(results[h], hash=h, rules=code, seeds=args.seeds, time_limit=args.time_limit,
+                           death_penalty=args.death_penalty))
+    print(f"Evaluation took {time.perf_counter() - pre:.1f}s")
+
+    rows = []
+    for i, code in enumerate(proposals):
+        entry = cache[cache_key(code)]
+        rows.append({"round": i, **{k: v for k, v in entry.items() if k != "rules"}})
+    df = pd.DataFrame(rows)
+    df.to_csv(args.out, index=False)
+    print(df.sort_values("score", ascending=False).to_string(index=False))
 
 if __name__ == "__main__":
     main()
-
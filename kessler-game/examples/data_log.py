@@ -1,5 +1,5 @@
 """
-For logging game data to CSV files.
+For logging game data to CSV files (and optionally columnar .npy / Parquet files).
 
 Data structure:
 Each row in the CSV file contains feature values followed by target action values.
@@ -19,9 +19,27 @@ Example row:
     "thrust": 0.8,
     "turn_rate": -0.1
 }
+
+Rows are kept in preallocated per-column buffers and written in batches by a background
+thread, so log() never touches the disk. A batch is handed off when the buffer fills or
+flush_interval seconds have passed, and everything left is written on close(), at
+interpreter exit, or when the logger is garbage collected.
+
+Formats:
+  "csv"     - same file as before, appended to
+  "npy"     - <file stem>_npy/chunk_000000.npy, ... one structured array per batch,
+              load them all with load_npy_chunks()
+  "parquet" - <file stem>.parquet, one row group per batch (needs pyarrow)
 """
-import csv, os
-from pathlib import Path
+import csv
+import glob
+import os
+import queue
+import threading
+import time
+import weakref
+
+import numpy as np
 
 
 FEATURES = [
@@ -37,29 +55,212 @@ FEATURES = [
 
 TARGET = ["thrust", "turn_rate"]
 
+def _column_array(values, numeric=None):
+    """
+    Numeric columns become float64 (missing -> NaN), anything else a fixed-width string column.
+    numeric=None picks from the values; True/False keeps the kind chosen for an earlier batch.
+    """
+    if numeric is not False:
+        try:
+            return np.array([np.nan if v is None or v == "" else float(v) for v in values], dtype=np.float64)
+        except (TypeError, ValueError):
+            if numeric:
+                raise
+    return np.array(["" if v is None else str(v) for v in values], dtype=np.str_)
+
+
+class _BatchWriter:
+    """Owns the output files; only ever touched from the logger's writer thread."""
+
+    def __init__(self, filepath, fieldnames, formats):
+        self.filepath = filepath
+        self.fieldnames = fieldnames
+        self.formats = formats
+        self.csv_file = None
+        self.parquet_writer = None
+        stem = os.path.splitext(filepath)[0]
+        self.npy_dir = stem + "_npy"
+        self.parquet_path = stem + ".parquet"
+        self.chunk_idx = len(glob.glob(os.path.join(self.npy_dir, "chunk_*.npy"))) if "npy" in formats else 0
+        # Column kinds (numeric or not) are fixed by the first batch, so a later batch where a text
+        # column happens to be all blank stays text. A column blank throughout the first batch is numeric.
+        self.numeric = None
+
+    def write(self, columns, n):
+        if "csv" in self.formats:
+            self._write_csv(columns, n)
+        if "npy" in self.formats or "parquet" in self.formats:
+            if self.numeric is None:
+                arrays = [_column_array(col[:n]) for col in columns]
+                self.numeric = [arr.dtype.kind == "f" for arr in arrays]
+            else:
+                arrays = [_column_array(col[:n], numeric) for col, numeric in zip(columns, self.numeric)]
+            if "npy" in self.formats:
+                self._write_npy(arrays, n)
+            if "parquet" in self.formats:
+                self._write_parquet(arrays)
+
+    def _write_csv(self, columns, n):
+        if self.csv_file is None:
+            file_exists = os.path.exists(self.filepath) and os.path.getsize(self.filepath) > 0
+            self.csv_file = open(self.filepath, mode='a', newline='')
+            self.csv_writer = csv.writer(self.csv_file)
+            if not file_exists:
+                self.csv_writer.writerow(self.fieldnames)
+        self.csv_writer.writerows(zip(*[["" if v is None else v for v in col[:n]] for col in columns]))
+        self.csv_file.flush()
+
+    def _write_npy(self, arrays, n):
+        os.makedirs(self.npy_dir, exist_ok=True)
+        chunk = np.empty(n, dtype=[(name, arr.dtype) for name, arr in zip(self.fieldnames, arrays)])
+        for name, arr in zip(self.fieldnames, arrays):
+            chunk[name] = arr
+        np.save(os.path.join(self.npy_dir, f"chunk_{self.chunk_idx:06d}.npy"), chunk, allow_pickle=False)
+        self.chunk_idx += 1
+
+    def _write_parquet(self, arrays):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.table({name: arr for name, arr in zip(self.fieldnames, arrays)})
+        if self.parquet_writer is None:
+            self.parquet_writer = pq.ParquetWriter(self.parquet_path, table.schema)
+        else:
+            table = table.cast(self.parquet_writer.schema)
+        self.parquet_writer.write_table(table)
+
+    def close(self):
+        if self.csv_file is not None:
+            self.csv_file.close()
+            self.csv_file = None
+        if self.parquet_writer is not None:
+            self.parquet_writer.close()
+            self.parquet_writer = None
+
+
+class _Pipeline:
+    """Queue plus writer thread; batches are written in the order they were submitted."""
+
+    def __init__(self, writer, name):
+        self.queue = queue.Queue()
+        self.error = None
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, args=(writer,), name=name, daemon=True)
+        self.thread.start()
+
+    def _run(self, writer):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    writer.close()
+                    return
+                writer.write(*item)
+            except Exception as e:
+                self.error = e
+            finally:
+                self.queue.task_done()
+
+    def submit(self, columns, n):
+        self.queue.put((columns, n))
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.queue.put(None)
+            self.thread.join()
+
+
+class _Buffer:
+    """Preallocated column lists, filled row by row up to n."""
+
+    def __init__(self, num_columns, rows):
+        self.columns = [[None] * rows for _ in range(num_columns)]
+        self.n = 0
+
+
+def _finalize(pipeline, holder):
+    # Runs on close(), at interpreter exit, or when the logger is garbage collected,
+    # so rows still sitting in the buffer always reach the disk
+    buf = holder[0]
+    if buf.n:
+        pipeline.submit(buf.columns, buf.n)
+        buf.n = 0
+    pipeline.close()
+
+
 class Logger:
-    
-    def __init__(self, filepath, features, targets):
+
+    def __init__(self, filepath, features, targets, formats=("csv",), buffer_rows=4096, flush_interval=2.0):
         self.filepath = filepath
         self.features = features
         self.targets = targets
         self.fieldnames = features + targets
+        self.formats = (formats,) if isinstance(formats, str) else tuple(formats)
+        for fmt in self.formats:
+            if fmt not in ("csv", "npy", "parquet"):
+                raise ValueError(f"Unknown log format '{fmt}', use 'csv', 'npy' or 'parquet'")
+        if "parquet" in self.formats:
+            try:
+                import pyarrow.parquet  # noqa: F401
+            except ImportError as e:
+                raise ImportError("Parquet logging needs pyarrow (pip install pyarrow)") from e
         dir_path = os.path.dirname(filepath)
         if dir_path:
             os.makedirs(dir_path, exist_ok=True)
-        file_exists = os.path.exists(filepath)
 
-        self.file = open(self.filepath, mode='a', newline='')
-        self.writer = csv.DictWriter(self.file, fieldnames=self.fieldnames)
-        if not file_exists or os.path.getsize(filepath) == 0:
-            self.writer.writeheader()
-            
+        self.buffer_rows = max(1, int(buffer_rows))
+        self.flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+        # One-element list so the finalizer sees buffer swaps without holding a reference to self
+        self._holder = [_Buffer(len(self.fieldnames), self.buffer_rows)]
+        self._pipeline = _Pipeline(_BatchWriter(filepath, self.fieldnames, self.formats),
+                                   name=f"Logger({os.path.basename(filepath)})")
+        self._finalizer = weakref.finalize(self, _finalize, self._pipeline, self._holder)
+
     def log(self, ctx, actions):
-        row = {name: ctx.get(name, "") for name in self.features}
-        for name, value in zip(self.targets, actions):
-            row[name] = value
-        self.writer.writerow(row)
-        self.file.flush()
-        
+        if self._pipeline.closed:
+            raise RuntimeError(f"Logger for {self.filepath} is closed")
+        buf = self._holder[0]
+        i = buf.n
+        columns = buf.columns
+        for col, name in enumerate(self.features):
+            columns[col][i] = ctx.get(name, "")
+        offset = len(self.features)
+        for col, value in enumerate(actions):
+            if col < len(self.targets):
+                columns[offset + col][i] = value
+        buf.n = i + 1
+        if buf.n >= self.buffer_rows or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self, wait=False):
+        """Hand the buffered rows to the writer thread; wait=True blocks until they are on disk."""
+        self._check_error()
+        buf = self._holder[0]
+        if buf.n and not self._pipeline.closed:
+            self._pipeline.submit(buf.columns, buf.n)
+            self._holder[0] = _Buffer(len(self.fieldnames), self.buffer_rows)
+        self._last_flush = time.monotonic()
+        if wait:
+            self._pipeline.queue.join()
+
     def close(self):
-        self.file.close()
\ No newline at end of file
+        self._finalizer()
+        self._check_error()
+
+    def _check_error(self):
+        if self._pipeline.error is not None:
+            raise RuntimeError(f"Logger for {self.filepath} failed while writing") from self._pipeline.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_npy_chunks(filepath):
+    """Concatenate every .npy chunk written for a logger's filepath into one structured array."""
+    npy_dir = os.path.splitext(filepath)[0] + "_npy"
+    chunks = [np.load(path) for path in sorted(glob.glob(os.path.join(npy_dir, "chunk_*.npy")))]
+    return np.concatenate(chunks) if chunks else None
@@ -3,6 +3,8 @@ import numpy as np
 import skfuzzy as fuzz
 from skfuzzy import control as ctrl
 from kesslergame.controller import KesslerController
+from fuzzy_compiler import SystemHandle, shared_system
+from fuzzy_rules import RuleSpec
 
 # Small helpers to read fields
 def _get(o, names, default=None):
@@ -39,17 +41,86 @@ def _wrap180(a):
     return (a + 180.0) % 360.0 - 180.0
 
 
+# Built-in rule set, in the same rule code form the LLM loop (LLM.py) generates. Other rule sets
+# are passed to the constructor instead of editing this file.
+DEFAULT_RULES = """
+rules = []
+
+rules += [
+    ctrl.Rule(mine_distance['very_near'] & (mine_angle['left'] | mine_angle['right'] | mine_angle['ahead']), (thrust['high'], turn['hard_right'], fire['no'], mine['no'])),
+]
+
+rules += [
+    ctrl.Rule((mine_distance['near'] | mine_distance['mid']) & (mine_angle['left'] | mine_angle['right']), (thrust['high'], turn['hard_right'], mine['no'])),
+    ctrl.Rule((mine_distance['near'] | mine_distance['mid']) & mine_angle['ahead'], (thrust['high'], turn['soft_right'], mine['no'])),
+    ctrl.Rule((mine_distance['near'] | mine_distance['mid']) & angle['ahead'], fire['yes']),
+]
+
+rules += [
+    ctrl.Rule(danger['imminent'], (thrust['reverse_hard'], turn['hard_right'], fire['no'], mine['no'])),
+    ctrl.Rule(danger['risky'], thrust['medium']),
+]
+
+rules += [
+    ctrl.Rule(distance['very_close'], (thrust['reverse_hard'], turn['soft_right'])),
+    ctrl.Rule(distance['close'] & rel_speed['fast'], thrust['reverse_soft']),
+]
+
+rules += [
+    ctrl.Rule(angle['ahead'] & (danger['safe'] | danger['risky']) & (mine_distance['mid'] | mine_distance['near'] | mine_distance['far']), fire['yes'])
+]
+
+rules.append(ctrl.Rule(mine_distance['far'] & distance['very_close'], (thrust['reverse_hard'], turn['zero'], fire['no'])))
+
+rules += [
+    ctrl.Rule(mine_distance['far'] & (danger['safe'] | danger['risky']) & distance['close'] & (angle['left'] | angle['ahead'] | angle['right']), (thrust['medium'], turn['zero'], fire['yes'])),
+]
+
+rules += [
+    ctrl.Rule(mine_distance['far'] & danger['safe'] & (distance['sweet'] | distance['close']) & (angle['ahead'] | angle['left'] | angle['right']), (thrust['medium'], fire['yes'])),
+]
+
+rules += [
+    ctrl.Rule(mine_distance['far'] & (danger['safe'] | danger['risky']) & (distance['far'] | distance['sweet']) & (angle['ahead'] | angle['left'] | angle['right']), (thrust['high'], turn['zero'], fire['yes'])),
+]
+
+rules.append(ctrl.Rule(mine_distance['far'] & (distance['sweet'] | distance['far']) & rel_speed['fast'] & angle['ahead'], fire['yes']))
+
+rules += [
+    ctrl.Rule(mine_distance['far'] & (danger['safe'] | danger['risky']) & (distance['close'] | distance['sweet']) & angle['ahead'], mine['yes']),
+    ctrl.Rule(mine_distance['far'] & (distance['close'] | distance['sweet']) & rel_speed['fast'], mine['yes']),
+    ctrl.Rule(mine_distance['very_near'] | mine_distance['near'] | danger['imminent'], mine['no']),
+]
+"""
+
 # Aggressive fuzzy-logic ship controller
 
 class AggressiveFuzzyController(KesslerController):
     """Fuzzy controller that chases and shoots, with simple mine avoidance."""
 
-    def __init__(self, normalization_distance_scale: float = None):
+    # Output values used when no rule fires for an output
+    FIS_DEFAULTS = {'thrust': 0.5, 'turn': 0.0, 'fire': 1.0, 'mine': 0.0}
+
+    def __init__(self, normalization_distance_scale: float = None, compiled: bool = True, rules=None):
         super().__init__()
         self._norm_dist_scale = normalization_distance_scale  # scale used to normalize distances
+        self._use_compiled = compiled  # False runs the original skfuzzy simulation every frame
+        # rules: RuleSpec, JSON rule set (text or parsed) or rule code text; None = DEFAULT_RULES
+        self.rule_spec = RuleSpec.parse(DEFAULT_RULES if rules is None else rules)
         self._build_fis()  # build fuzzy inference system
 
     def _build_fis(self):
+        """Get the fuzzy system for this rule set, building it only the first time it is seen."""
+        # One shared system per (definition, rule set) in the process; this instance only holds a handle
+        key = (type(self)._make_fis.__qualname__, self.rule_spec.key())
+        system = shared_system(key, lambda: self._make_fis(self.rule_spec))
+        self._fis = SystemHandle(system, self._use_compiled)
+        self.ctrl_system = system.ctrl_system
+        self._compiled_fis = system.compiled
+        self._fis_variables = system.variables
+
+    @staticmethod
+    def _make_fis(rule_spec):
         """Define fuzzy inputs/outputs and rules."""
         # Inputs (Antecedents) normalized to small ranges
         distance      = ctrl.Antecedent(np.linspace(0.0, 1.0, 101), "distance")
@@ -109,60 +180,10 @@ class AggressiveFuzzyController(KesslerController):
         mine['no']  = fuzz.trimf(mine.universe, [0.0, 0.0, 0.35])
         mine['yes'] = fuzz.trimf(mine.universe, [0.25, 1.0, 1.0])
 
-        #BEGIN GENERATED CODE
-        rules = []
-
-        rules += [
-            ctrl.Rule(mine_distance['very_near'] & (mine_angle['left'] | mine_angle['right'] | mine_angle['ahead']), (thrust['high'], turn['hard_right'], fire['no'], mine['no'])),
-        ]
-
-        rules += [
-            ctrl.Rule((mine_distance['near'] | mine_distance['mid']) & (mine_angle['left'] | mine_angle['right']), (thrust['high'], turn['hard_right'], mine['no'])),
-            ctrl.Rule((mine_distance['near'] | mine_distance['mid']) & mine_angle['ahead'], (thrust['high'], turn['soft_right'], mine['no'])),
-            ctrl.Rule((mine_distance['near'] | mine_distance['mid']) & angle['ahead'], fire['yes']),
-        ]
-
-        rules += [
-            ctrl.Rule(danger['imminent'], (thrust['reverse_hard'], turn['hard_right'], fire['no'], mine['no'])),
-            ctrl.Rule(danger['risky'], thrust['medium']),
-        ]
-
-        rules += [
-            ctrl.Rule(distance['very_close'], (thrust['reverse_hard'], turn['soft_right'])),
-            ctrl.Rule(distance['close'] & rel_speed['fast'], thrust['reverse_soft']),
-        ]
-
-        rules += [
-            ctrl.Rule(angle['ahead'] & (danger['safe'] | danger['risky']) & (mine_distance['mid'] | mine_distance['near'] | mine_distance['far']), fire['yes'])
-        ]
-
-        rules.append(ctrl.Rule(mine_distance['far'] & distance['very_close'], (thrust['reverse_hard'], turn['zero'], fire['no'])))
-
-        rules += [
-            ctrl.Rule(mine_distance['far'] & (danger['safe'] | danger['risky']) & distance['close'] & (angle['left'] | angle['ahead'] | angle['right']), (thrust['medium'], turn['zero'], fire['yes'])),
-        ]
-
-        rules += [
-            ctrl.Rule(mine_distance['far'] & danger['safe'] & (distance['sweet'] | distance['close']) & (angle['ahead'] | angle['left'] | angle['right']), (thrust['medium'], fire['yes'])),
-        ]
-
-        rules += [
-            ctrl.Rule(mine_distance['far'] & (danger['safe'] | danger['risky']) & (distance['far'] | distance['sweet']) & (angle['ahead'] | angle['left'] | angle['right']), (thrust['high'], turn['zero'], fire['yes'])),
-        ]
-
-        rules.append(ctrl.Rule(mine_distance['far'] & (distance['sweet'] | distance['far']) & rel_speed['fast'] & angle['ahead'], fire['yes']))
-
-        rules += [
-            ctrl.Rule(mine_distance['far'] & (danger['safe'] | danger['risky']) & (distance['close'] | distance['sweet']) & angle['ahead'], mine['yes']),
-            ctrl.Rule(mine_distance['far'] & (distance['close'] | distance['sweet']) & rel_speed['fast'], mine['yes']),
-            ctrl.Rule(mine_distance['very_near'] | mine_distance['near'] | danger['imminent'], mine['no']),
-        ]
-        #END GENERATED CODE
-        
-        self.ctrl_system = ctrl.ControlSystem(rules)
-        self._fis_inputs = dict(distance=distance, rel_speed=rel_speed, angle=angle,
-                                mine_distance=mine_distance, mine_angle=mine_angle, danger=danger)
-        self._fis_outputs = dict(thrust=thrust, turn=turn, fire=fire, mine=mine)
+        variables = dict(distance=distance, rel_speed=rel_speed, angle=angle,
+                         mine_distance=mine_distance, mine_angle=mine_angle, danger=danger,
+                         thrust=thrust, turn=turn, fire=fire, mine=mine)
+        return ctrl.ControlSystem(rule_spec.build(variables)), variables
 
     # Normalization helper methods
 
@@ -200,10 +221,6 @@ class AggressiveFuzzyController(KesslerController):
     # Main control: produce actions
     def actions(self, ship_state, game_state):
         """Return (thrust, turn_rate, fire?, drop_mine?) for the current frame."""
-        sim = ctrl.ControlSystemSimulation(self.ctrl_system)
-
-        
-
         # Grab world objects
         asteroids = _get(game_state, ["asteroids", "asteroid_states"], []) or []
         if not asteroids:
@@ -282,23 +299,20 @@ class AggressiveFuzzyController(KesslerController):
         danger_n = self._norm_ttc_like(dist_n, rel_n)
 
         # Run fuzzy inference
+        fis_inputs = dict(distance=dist_n, rel_speed=rel_n, angle=ang_n,
+                          mine_distance=mdis_n, mine_angle=mang_n, danger=danger_n)
         try:
-            sim.input['distance'] = dist_n
-            sim.input['rel_speed'] = rel_n
-            sim.input['angle'] = ang_n
-            sim.input['mine_distance'] = mdis_n
-            sim.input['mine_angle'] = mang_n
-            sim.input['danger'] = danger_n
-            sim.compute()
+            fis_out = self._fis.compute(fis_inputs)
         except:
             # If FIS fails, idle (safe fallback)
             return 0.0, 0.0, False, False
 
         # Decode fuzzy outputs
-        out_thrust = float(sim.output.get('thrust', 0.5))
-        out_turn   = float(sim.output.get('turn', 0.0))
-        out_fire   = float(sim.output.get('fire', 1.0))
-        out_mine   = float(sim.output.get('mine', 0.0))
+        d = self.FIS_DEFAULTS
+        out_thrust = float(fis_out.get('thrust', d['thrust']))
+        out_turn   = float(fis_out.get('turn', d['turn']))
+        out_fire   = float(fis_out.get('fire', d['fire']))
+        out_mine   = float(fis_out.get('mine', d['mine']))
 
         T_MAX = 230.0                   # engine's max thrust
         engine_thrust = max(-1.0, min(1.0, out_thrust)) * T_MAX
@@ -0,0 +1,299 @@
+# kessler-game/examples/fuzzy_compiler.py
+# Compiles a skfuzzy ControlSystem into a plain NumPy evaluator.
+#
+# skfuzzy walks its rule graph, stores every intermediate value in per-simulation
+# dictionaries and defuzzifies with a Python loop over the whole output universe,
+# on every compute(). All of that is fixed once the system is built, so here we:
+#  - stack each variable's sampled membership functions into one lookup table,
+#  - turn each rule antecedent into a small closure over those memberships,
+#  - accumulate rule activations per consequent term,
+#  - and take the centroid with the closed-form trapezoid moments, vectorized across
+#    the universe and, in compute_batch, across the batch too.
+#
+# The math follows skfuzzy step by step (input clipping, linear interpolation of the
+# sampled MFs, the upsampled output universe, lenient skipping of empty outputs),
+# so outputs match ControlSystemSimulation up to float rounding.
+
+import numpy as np
+from skfuzzy import control as ctrl, defuzz
+from skfuzzy.control.term import Term, TermAggregate
+
+
+class _Variable:
+    """Lookup table for one fuzzy variable: universe plus stacked term MFs."""
+
+    def __init__(self, var):
+        self.label = var.label
+        self.universe = np.asarray(var.universe, dtype=np.float64)
+        self.terms = list(var.terms.keys())
+        self.index = {name: i for i, name in enumerate(self.terms)}
+        # (T, U) table of sampled memberships
+        self.mfs = np.array([np.asarray(var.terms[t].mf, dtype=np.float64) for t in self.terms])
+        self.lo = float(self.universe.min())
+        self.hi = float(self.universe.max())
+        # Slopes between samples, so fuzzification is one gather and one multiply-add
+        self.slopes = np.diff(self.mfs, axis=1) / np.diff(self.universe)
+
+    def fuzzify(self, x):
+        """Memberships of every term at x (shape (B,)), returned as (T, B)."""
+        x = np.clip(x, self.lo, self.hi)
+        u = self.universe
+        j = np.clip(np.searchsorted(u, x, side='right') - 1, 0, len(u) - 2)
+        return self.mfs[:, j] + self.slopes[:, j] * (x - u[j])
+
+
+def _compile_expr(expr, rule, term_slots):
+    """Turn a skfuzzy antecedent (Term or TermAggregate tree) into fn(memberships) -> (B,)."""
+    if isinstance(expr, Term):
+        slot = term_slots[id(expr)]
+        return lambda m: m[slot]
+    if isinstance(expr, TermAggregate):
+        left = _compile_expr(expr.term1, rule, term_slots)
+        if expr.kind == 'not':
+            return lambda m: 1.0 - left(m)
+        right = _compile_expr(expr.term2, rule, term_slots)
+        fn = rule.and_func if expr.kind == 'and' else rule.or_func
+        return lambda m: fn(left(m), right(m))
+    raise TypeError("Unsupported antecedent element: {!r}".format(expr))
+
+
+def _trapezoid_moments(x1, x2, y1, y2):
+    """Area and first moment of each linear piece from (x1, y1) to (x2, y2)."""
+    dx = x2 - x1
+    return 0.5 * dx * (y1 + y2), dx * (x1 * (2.0 * y1 + y2) + x2 * (y1 + 2.0 * y2)) / 6.0
+
+
+class CompiledControlSystem:
+    """
+    Vectorized stand-in for skfuzzy's ControlSystemSimulation.
+
+    compute({'distance': 0.3, ...}) -> {'thrust': ..., ...} for one sample, or
+    compute_batch({'distance': array, ...}) -> {'thrust': array, ...} for many.
+    Outputs that have no activated terms are left out, like skfuzzy's lenient mode.
+    """
+
+    def __init__(self, ctrl_system):
+        self.antecedents = [_Variable(a) for a in ctrl_system.antecedents]
+        self.consequents = [_Variable(c) for c in ctrl_system.consequents]
+        self.input_names = [a.label for a in self.antecedents]
+        self.output_names = [c.label for c in self.consequents]
+
+        cons_by_label = {c.label: c for c in ctrl_system.consequents}
+        self._accumulate = [cons_by_label[c.label].accumulation_method for c in self.consequents]
+        self._defuzz_method = [cons_by_label[c.label].defuzzify_method.lower() for c in self.consequents]
+
+        # Every antecedent term gets one row in the stacked membership matrix
+        term_slots = {}
+        self._row_offsets = []
+        row = 0
+        for src, var in zip(ctrl_system.antecedents, self.antecedents):
+            self._row_offsets.append(row)
+            for name in var.terms:
+                term_slots[id(src.terms[name])] = row
+                row += 1
+        self._num_rows = row
+
+        cons_index = {c.label: i for i, c in enumerate(self.consequents)}
+        self._rules = []
+        for rule in ctrl_system.rules:
+            fire = _compile_expr(rule.antecedent, rule, term_slots)
+            targets = [(cons_index[wt.term.parent.label],
+                        self.consequents[cons_index[wt.term.parent.label]].index[wt.term.label],
+                        float(wt.weight)) for wt in rule.consequent]
+            self._rules.append((fire, targets))
+
+    def _memberships(self, inputs, batch):
+        m = np.empty((self._num_rows, batch))
+        for var, offset in zip(self.antecedents, self._row_offsets):
+            if var.label not in inputs:
+                raise ValueError("All antecedents must have input values! Missing: " + var.label)
+            x = np.broadcast_to(np.asarray(inputs[var.label], dtype=np.float64), (batch,))
+            m[offset:offset + len(var.terms)] = var.fuzzify(x)
+        return m
+
+    def _cuts(self, m):
+        """Accumulated activation per consequent term, None where no rule touches it."""
+        cuts = [[None] * len(c.terms) for c in self.consequents]
+        for fire, targets in self._rules:
+            strength = fire(m)
+            for ci, ti, weight in targets:
+                value = strength * weight
+                prev = cuts[ci][ti]
+                cuts[ci][ti] = value if prev is None else self._accumulate[ci](value, prev)
+        return cuts
+
+    def _defuzz_one(self, ci, cuts):
+        """Defuzzify one consequent for one sample, given per-term cut levels (None = unused)."""
+        var = self.consequents[ci]
+        u = var.universe
+        active = [(t, c) for t, c in enumerate(cuts) if c is not None]
+        if not active:
+            return None
+
+        # Upsample the universe with the points where each term's MF meets its cut level
+        new_points = [u]
+        for t, cut in active:
+            mf = var.mfs[t]
+            idx = np.flatnonzero(np.diff(mf > cut if cut == 0.0 else mf >= cut))
+            if idx.size:
+                new_points.append(u[idx] + (cut - mf[idx]) * (u[idx + 1] - u[idx]) / (mf[idx + 1] - mf[idx]))
+        grid = np.unique(np.concatenate(new_points)) if len(new_points) > 1 else u
+
+        out = np.zeros_like(grid)
+        for t, cut in active:
+            mf = var.mfs[t] if grid is u else np.interp(grid, u, var.mfs[t], left=0.0, right=0.0)
+            np.maximum(out, np.minimum(cut, mf), out)
+
+        if self._defuzz_method[ci] != 'centroid':
+            try:
+                return float(defuzz(grid, out, self._defuzz_method[ci]))
+            except Exception:
+                return None
+        if out.sum() == 0:
+            return None
+
+        # Closed-form centroid of the piecewise-linear aggregate: per-segment trapezoid area and first moment
+        area, moment = _trapezoid_moments(grid[:-1], grid[1:], out[:-1], out[1:])
+        return float(moment.sum() / max(area.sum(), np.finfo(float).eps))
+
+    def _centroid_batch(self, ci, cuts, batch):
+        """
+        Centroids of one consequent for a whole batch, NaN where the aggregate is empty.
+
+        Uses the same grid as _defuzz_one without building it per sample: the aggregate is
+        integrated over the plain universe first, then the few segments where a term's MF
+        crosses its cut (the points _defuzz_one inserts) are integrated again with those points.
+        """
+        var = self.consequents[ci]
+        active = [t for t, c in enumerate(cuts) if c is not None]
+        centroids = np.full(batch, np.nan)
+        if not active:
+            return centroids
+        cut = np.stack([np.broadcast_to(np.asarray(cuts[t], dtype=np.float64), (batch,)) for t in active], axis=1)
+        u = var.universe
+        x1, x2 = u[:-1], u[1:]
+        mfs = var.mfs[active]
+        slopes = var.slopes[active]
+
+        # Bound the (chunk, T, U) temporaries
+        chunk = max(1, 4_000_000 // (len(active) * len(u)))
+        for start in range(0, batch, chunk):
+            c = cut[start:start + chunk, :, None]
+            rows = c.shape[0]
+            out = np.minimum(c, mfs).max(axis=1)
+            area, moment = _trapezoid_moments(x1, x2, out[:, :-1], out[:, 1:])
+            area_sum = area.sum(axis=1)
+            moment_sum = moment.sum(axis=1)
+            nonempty = out.max(axis=1) > 0.0
+
+            # Segments where some term's MF crosses its cut get that point (one per term at most)
+            above = np.where(c == 0.0, mfs > c, mfs >= c)
+            crosses = above[:, :, :-1] != above[:, :, 1:]
+            rows_idx, seg_idx = np.nonzero(crosses.any(axis=1))
+            if rows_idx.size:
+                sc = c[rows_idx, :, 0]
+                sx1, sx2 = x1[seg_idx], x2[seg_idx]
+                sy1 = mfs[:, seg_idx].T
+                sslope = slopes[:, seg_idx].T
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    xc = sx1[:, None] + (sc - sy1) / sslope
+                # Terms that do not cross this segment collapse onto its start as zero-width pieces
+                xc = np.where(crosses[rows_idx, :, seg_idx], xc, sx1[:, None])
+                points = np.sort(np.concatenate([sx1[:, None], xc, sx2[:, None]], axis=1), axis=1)
+                seg_mf = sy1[:, :, None] + (points[:, None, :] - sx1[:, None, None]) * sslope[:, :, None]
+                seg_out = np.minimum(sc[:, :, None], seg_mf).max(axis=1)
+                seg_area, seg_moment = _trapezoid_moments(points[:, :-1], points[:, 1:], seg_out[:, :-1], seg_out[:, 1:])
+                np.add.at(area_sum, rows_idx, seg_area.sum(axis=1) - area[rows_idx, seg_idx])
+                np.add.at(moment_sum, rows_idx, seg_moment.sum(axis=1) - moment[rows_idx, seg_idx])
+
+            centroids[start:start + rows] = np.where(nonempty, moment_sum / np.maximum(area_sum, np.finfo(float).eps), np.nan)
+        return centroids
+
+    def compute_batch(self, inputs):
+        """Evaluate many samples at once. Inputs are equal-length 1-D arrays (scalars broadcast)."""
+        batch = max((np.size(v) for v in inputs.values()), default=1)
+        m = self._memberships(inputs, batch)
+        cuts = self._cuts(m)
+        results = {}
+        for ci, name in enumerate(self.output_names):
+            if self._defuzz_method[ci] == 'centroid':
+                results[name] = self._centroid_batch(ci, cuts[ci], batch)
+                continue
+            # Other defuzzification methods go through skfuzzy one sample at a time
+            values = np.full(batch, np.nan)
+            for b in range(batch):
+                sample_cuts = [None if c is None else float(c[b]) for c in cuts[ci]]
+                value = self._defuzz_one(ci, sample_cuts)
+                if value is not None:
+                    values[b] = value
+            results[name] = values
+        return results
+
+    def compute(self, inputs):
+        """Evaluate one sample, returning a dict like ControlSystemSimulation.output."""
+        m = self._memberships(inputs, 1)
+        cuts = self._cuts(m)
+        results = {}
+        for ci, name in enumerate(self.output_names):
+            value = self._defuzz_one(ci, [None if c is None else float(c[0]) for c in cuts[ci]])
+            if value is not None:
+                results[name] = value
+        return results
+
+
+def compile_control_system(ctrl_system):
+    """Build a CompiledControlSystem from a skfuzzy ControlSystem."""
+    return CompiledControlSystem(ctrl_system)
+
+
+# Built systems shared by every controller in the process, keyed by what defines them
+# (e.g. a rule set key). Only read after they are built, so all instances can use one copy.
+_SYSTEM_CACHE = {}
+
+
+class SharedSystem:
+    """A built ControlSystem with its compiled form and variables ({label: Antecedent/Consequent})."""
+
+    def __init__(self, ctrl_system, variables):
+        self.ctrl_system = ctrl_system
+        self.compiled = compile_control_system(ctrl_system)
+        self.variables = variables
+
+
+def shared_system(key, build):
+    """The SharedSystem for key; build() -> (ControlSystem, variables) only runs the first time."""
+    system = _SYSTEM_CACHE.get(key)
+    if system is None:
+        system = _SYSTEM_CACHE[key] = SharedSystem(*build())
+    return system
+
+
+def clear_system_cache():
+    _SYSTEM_CACHE.clear()
+
+
+class SystemHandle:
+    """
+    One controller's view of a SharedSystem: compute(inputs) -> outputs dict.
+
+    Compiled handles keep no state. Otherwise the handle owns a single skfuzzy
+    ControlSystemSimulation, created on first use and reused every frame. skfuzzy keeps
+    per-simulation values on the shared variables; one long-lived simulation flushes them
+    every flush_after_run computes, where a new simulation per frame never would.
+    """
+
+    def __init__(self, system, compiled=True):
+        self.system = system
+        self.compiled = compiled
+        self._sim = None
+
+    def compute(self, inputs):
+        if self.compiled:
+            return self.system.compiled.compute(inputs)
+        if self._sim is None:
+            self._sim = ctrl.ControlSystemSimulation(self.system.ctrl_system, flush_after_run=250)
+        sim = self._sim
+        for key, value in inputs.items():
+            sim.input[key] = value
+        sim.compute()
+        return dict(sim.output)
@@ -0,0 +1,291 @@
+# kessler-game/examples/fuzzy_lut.py
+# Lookup-table surrogate for a fuzzy controller's inference system.
+#
+# With its rule base fixed, a controller's FIS is a deterministic function of a few inputs
+# (distance, rel_speed, angle, ... for AggressiveFuzzyController). FuzzyLUT samples it once
+# on a grid per input and answers with multilinear interpolation between the 2^N grid points
+# around the query: a few small NumPy ops per frame instead of a full inference.
+#
+# By default each input's grid is its membership functions' breakpoints plus the universe
+# ends. Between breakpoints every membership is linear, so that is where the output surface
+# bends; --points resamples each axis to a fixed count instead.
+#
+#   python fuzzy_lut.py --controller aggressive --out aggressive_lut.npz --workers 4
+#   python fuzzy_lut.py --controller aggressive --rules my_rules.json --points 8
+#   python fuzzy_lut.py --controller defensive --out defensive_lut.npz --samples 20000
+#
+# LUTController(controller, lut) plays like the controller with its FIS swapped for the table:
+#   LUTController(AggressiveFuzzyController(), FuzzyLUT.load("aggressive_lut.npz"))
+
+import argparse
+import bisect
+import copy
+import functools
+import itertools
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from kesslergame.controller import KesslerController
+
+from fuzzy_compiler import SystemHandle
+
+
+def axis_points(var, points=None):
+    """Grid for one compiled input variable: MF breakpoints and ends, or `points` of them."""
+    u = var.universe
+    knots = {var.lo, var.hi}
+    for mf in var.mfs:
+        bends = np.abs(np.diff(mf, 2)) > 1e-9
+        knots.update(u[1:-1][bends].tolist())
+    grid = sorted(knots)
+    if points is None:
+        return np.array(grid)
+    if points < 2:
+        raise ValueError("An axis needs at least 2 points")
+    # Drop the breakpoint closest to its neighbours, or split the widest gap, until the count fits
+    while len(grid) > points:
+        gaps = np.diff(grid)
+        i = int(np.argmin(gaps[:-1] + gaps[1:])) + 1
+        del grid[i]
+    while len(grid) < points:
+        i = int(np.argmax(np.diff(grid)))
+        grid.insert(i + 1, 0.5 * (grid[i] + grid[i + 1]))
+    return np.array(grid)
+
+
+def _system(make_controller):
+    # Built fuzzy systems are shared per process (fuzzy_compiler.shared_system), so this is cheap after the first call
+    return make_controller()._fis.system
+
+
+def reference_outputs(compiled, inputs, outputs, defaults=None):
+    """Compiled FIS outputs for a batch -> (B, n_out); NaN where no rule fired, unless in `defaults`."""
+    result = compiled.compute_batch(inputs)
+    columns = []
+    for name in outputs:
+        col = result[name]
+        if defaults and name in defaults:
+            col = np.where(np.isnan(col), defaults[name], col)
+        columns.append(col)
+    return np.stack(columns, axis=1)
+
+
+def _sample_chunk(make_controller, inputs, outputs):
+    return reference_outputs(_system(make_controller).compiled, inputs, outputs)
+
+
+class FuzzyLUT:
+    """
+    Output table of a FIS over a grid of its inputs, evaluated by multilinear interpolation.
+
+    compute({'distance': 0.3, ...}) -> {'thrust': ..., ...} like a SystemHandle, so it can
+    replace a controller's _fis directly. Inputs outside the grid are clipped to it, as the
+    FIS clips to its universes.
+
+    The table is NaN at grid points where no rule fires for an output. A centroid jumps
+    there (from its default straight to the centroid of the weakest firing term), so the
+    interpolation only weights the defined corners of a cell. A cell with none gives the
+    output's default, or leaves the output out of compute()'s result like the FIS does.
+    """
+
+    def __init__(self, inputs, axes, outputs, table, meta=None):
+        self.inputs = list(inputs)
+        self.axes = [np.asarray(a, dtype=np.float64) for a in axes]
+        self.outputs = list(outputs)
+        self.table = np.asarray(table, dtype=np.float64)  # (*grid shape, n_outputs), NaN = no rule fired
+        self.meta = dict(meta or {})
+        if self.table.shape != tuple(len(a) for a in self.axes) + (len(self.outputs),):
+            raise ValueError(f"Table shape {self.table.shape} does not match the axes and outputs")
+        defaults = self.meta.get("defaults", {})
+        self._defaults = np.array([defaults.get(name, np.nan) for name in self.outputs], dtype=np.float64)
+        # Values (0 where undefined) and definedness side by side, so one interpolation gives both
+        defined = ~np.isnan(self.table)
+        self._cells = np.ascontiguousarray(np.concatenate([np.where(defined, self.table, 0.0), defined], axis=-1))
+        self._axis_lists = [a.tolist() for a in self.axes]  # bisect on lists beats NumPy for one sample
+
+    @classmethod
+    def build(cls, make_controller, points=None, defaults=None, workers=1, chunk=2000):
+        """
+        Sample make_controller()'s FIS on the grid. make_controller must be picklable
+        (a controller class or functools.partial of one) when workers > 1.
+        points: None (breakpoints), an int for every input, or {input: int}.
+        defaults: output values where no rule fires (default: the controller's FIS_DEFAULTS).
+        """
+        controller = make_controller()
+        system = controller._fis.system
+        compiled = system.compiled
+        if defaults is None:
+            defaults = getattr(controller, "FIS_DEFAULTS", {})
+        inputs = [v.label for v in compiled.antecedents]
+        axes = []
+        for var in compiled.antecedents:
+            n = points.get(var.label) if isinstance(points, dict) else points
+            axes.append(axis_points(var, n))
+        outputs = list(compiled.output_names)
+
+        mesh = np.meshgrid(*axes, indexing="ij")
+        flat = {name: m.ravel() for name, m in zip(inputs, mesh)}
+        total = mesh[0].size
+        chunks = [{name: col[i:i + chunk] for name, col in flat.items()} for i in range(0, total, chunk)]
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parts = list(pool.map(_sample_chunk, itertools.repeat(make_controller), chunks,
+                                      itertools.repeat(outputs)))
+        else:
+            parts = [reference_outputs(compiled, c, outputs) for c in chunks]
+        table = np.concatenate(parts).reshape(mesh[0].shape + (len(outputs),))
+
+        meta = {"controller": controller.name, "defaults": defaults}
+        if getattr(controller, "rule_spec", None) is not None:
+            meta["rule_key"] = controller.rule_spec.key()
+        return cls(inputs, axes, outputs, table, meta)
+
+    def compute(self, inputs):
+        """Interpolated outputs for one sample."""
+        corner = []
+        fracs = []
+        for name, axis in zip(self.inputs, self._axis_lists):
+            x = min(max(float(inputs[name]), axis[0]), axis[-1])
+            j = min(max(bisect.bisect_right(axis, x) - 1, 0), len(axis) - 2)
+            corner.append(slice(j, j + 2))
+            fracs.append((x - axis[j]) / (axis[j + 1] - axis[j]))
+        # Collapse the 2 x 2 x ... cell one axis at a time
+        cell = self._cells[tuple(corner)]
+        for t in fracs:
+            cell = cell[0] + t * (cell[1] - cell[0])
+        return {name: float(v) for name, v in zip(self.outputs, self._resolve(cell)) if v == v}
+
+    def _resolve(self, cell):
+        # Interpolated (values, weight of defined corners) -> outputs
+        n = len(self.outputs)
+        weight = cell[..., n:]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(weight > 1e-12, cell[..., :n] / weight, self._defaults)
+
+    def compute_batch(self, inputs):
+        """Interpolated outputs for equal-length input arrays -> {output: array}."""
+        idx, fracs = [], []
+        for name, axis in zip(self.inputs, self.axes):
+            x = np.clip(np.asarray(inputs[name], dtype=np.float64), axis[0], axis[-1])
+            j = np.clip(np.searchsorted(axis, x, side="right") - 1, 0, len(axis) - 2)
+            idx.append(j)
+            fracs.append((x - axis[j]) / (axis[j + 1] - axis[j]))
+        cell = 0.0
+        for bits in itertools.product((0, 1), repeat=len(self.axes)):
+            weight = 1.0
+            for b, t in zip(bits, fracs):
+                weight = weight * (t if b else 1.0 - t)
+            cell = cell + weight[:, None] * self._cells[tuple(j + b for j, b in zip(idx, bits))]
+        out = self._resolve(cell)
+        return {name: out[:, k] for k, name in enumerate(self.outputs)}
+
+    def save(self, path):
+        arrays = {f"axis_{i}": a for i, a in enumerate(self.axes)}
+        header = json.dumps({"inputs": self.inputs, "outputs": self.outputs, "meta": self.meta})
+        np.savez_compressed(path, table=self.table, header=np.array(header), **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            header = json.loads(str(data["header"]))
+            axes = [data[f"axis_{i}"] for i in range(len(header["inputs"]))]
+            return cls(header["inputs"], axes, header["outputs"], data["table"], header["meta"])
+
+
+def error_report(lut, make_controller, samples=10000, seed=0):
+    """Per-output absolute error of the table against the compiled FIS on uniform random inputs."""
+    compiled = _system(make_controller).compiled
+    rng = np.random.default_rng(seed)
+    inputs = {name: rng.uniform(axis[0], axis[-1], samples) for name, axis in zip(lut.inputs, lut.axes)}
+    defaults = lut.meta.get("defaults", {})
+    expected = reference_outputs(compiled, inputs, lut.outputs, defaults)
+    got = lut.compute_batch(inputs)
+    report = {}
+    for k, name in enumerate(lut.outputs):
+        want, have = expected[:, k], got[name]
+        both = ~np.isnan(want) & ~np.isnan(have)
+        err = np.abs(have[both] - want[both])
+        report[name] = {"max": float(err.max()), "mean": float(err.mean()),
+                        "p99": float(np.percentile(err, 99)), "rms": float(np.sqrt(np.mean(err ** 2))),
+                        # one side has the output and the other does not (outputs without a default)
+                        "undefined_mismatch": float(np.mean(np.isnan(want) != np.isnan(have)))}
+    return report
+
+
+class LUTController(KesslerController):
+    """Plays like the wrapped fuzzy controller, with its FIS replaced by a FuzzyLUT. The wrapped controller is left unchanged."""
+
+    def __init__(self, controller, lut):
+        labels = {v.label for v in controller._fis.system.compiled.antecedents}
+        if labels != set(lut.inputs):
+            raise ValueError(f"Table inputs {sorted(lut.inputs)} do not match the controller's {sorted(labels)}")
+        rule_key = lut.meta.get("rule_key")
+        if rule_key and getattr(controller, "rule_spec", None) is not None and controller.rule_spec.key() != rule_key:
+            raise ValueError("Table was built for a different rule set than the controller's")
+        # Swap the FIS on a shallow copy, so the caller's controller keeps its own. The built systems it shares are read-only.
+        self.controller = copy.copy(controller)
+        self.controller._fis = lut
+
+    def actions(self, ship_state, game_state):
+        return self.controller.actions(ship_state, game_state)
+
+    @property
+    def name(self) -> str:
+        return f"{self.controller.name} (LUT)"
+
+
+def _time_per_call(fn, inputs, repeat):
+    start = time.perf_counter()
+    for x in inputs[:repeat]:
+        fn(x)
+    return 1e6 * (time.perf_counter() - start) / min(repeat, len(inputs))
+
+
+def main():
+    arguments = argparse.ArgumentParser()
+    arguments.add_argument("--controller", choices=["aggressive", "defensive"], default="aggressive")
+    arguments.add_argument("--rules", default=None, help="rule set file for the aggressive controller (fuzzy_rules.load_rule_set)")
+    arguments.add_argument("--points", type=int, default=None, help="grid points per input (default: MF breakpoints)")
+    arguments.add_argument("--workers", type=int, default=1, help="processes sampling the FIS")
+    arguments.add_argument("--samples", type=int, default=10000, help="random inputs for the error report")
+    arguments.add_argument("--seed", type=int, default=0)
+    arguments.add_argument("--out", default=None, help="save the table (.npz)")
+    args = arguments.parse_args()
+
+    if args.controller == "aggressive":
+        from fuzzy_aggressive_controller import AggressiveFuzzyController
+        from fuzzy_rules import load_rule_set
+        make_controller = functools.partial(AggressiveFuzzyController,
+                                            rules=load_rule_set(args.rules) if args.rules else None)
+    else:
+        from defensive_fuzzy import DefensiveFuzzyController
+        make_controller = DefensiveFuzzyController
+
+    pre = time.perf_counter()
+    lut = FuzzyLUT.build(make_controller, args.points, workers=args.workers)
+    shape = " x ".join(f"{name}:{len(a)}" for name, a in zip(lut.inputs, lut.axes))
+    print(f"Sampled {lut.table[..., 0].size} points ({shape}) in {time.perf_counter() - pre:.1f}s")
+    if args.out:
+        lut.save(args.out)
+        print(f"Saved {args.out}")
+
+    report = error_report(lut, make_controller, args.samples, args.seed)
+    print(f"\nAbsolute error over {args.samples} random inputs")
+    print(f"{'output':>10} {'max':>9} {'p99':>9} {'mean':>9} {'rms':>9} {'undef':>7}")
+    for name, r in report.items():
+        print(f"{name:>10} {r['max']:>9.5f} {r['p99']:>9.5f} {r['mean']:>9.5f} {r['rms']:>9.5f} "
+              f"{r['undefined_mismatch']:>7.2%}")
+
+    system = _system(make_controller)
+    rng = np.random.default_rng(args.seed + 1)
+    queries = [{name: rng.uniform(a[0], a[-1]) for name, a in zip(lut.inputs, lut.axes)} for _ in range(500)]
+    print("\nPer call (us): "
+          f"skfuzzy {_time_per_call(SystemHandle(system, compiled=False).compute, queries, 50):.0f}, "
+          f"compiled {_time_per_call(system.compiled.compute, queries, 500):.0f}, "
+          f"table {_time_per_call(lut.compute, queries, 500):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+# kessler-game/examples/fuzzy_rules.py
+# Rule sets as data, for controllers that take their rules at construction.
+#
+# A RuleSpec is a tuple of rules, each (condition, consequents):
+#   condition    ("distance", "close")                     one antecedent term
+#                ("and", c1, c2, ...) / ("or", ...) / ("not", c)
+#   consequents  (("thrust", "high"), ("turn", "zero"), ...)
+#
+# It can be read from the `rules = []` / `rules += [ctrl.Rule(...)]` Python text the LLM
+# loop produces (parsed from its syntax tree, never executed) or from JSON:
+#   [{"if": ["and", ["distance", "close"], ["angle", "ahead"]], "then": {"thrust": "medium", "fire": "yes"}}, ...]
+# key() hashes the canonical form, so the same rules written differently share one key
+# and one compiled system in caches keyed by it.
+
+import ast
+import functools
+import hashlib
+import json
+import re
+import textwrap
+
+from skfuzzy import control as ctrl
+
+_OPS = ("and", "or", "not")
+_RULE_LISTS = ("rules",)
+
+
+def normalize_rule_code(code):
+    """Canonical form of a rule block: no markdown fences, comments or layout differences."""
+    code = re.sub(r"^\s*```[a-zA-Z]*\s*$", "", code, flags=re.MULTILINE)
+    return ast.unparse(ast.parse(textwrap.dedent(code).strip("\n")))
+
+
+def _term(node):
+    # var['term'] -> ("var", "term")
+    if (isinstance(node, ast.Subscript) and isinstance(node.value, ast.Name)
+            and isinstance(node.slice, ast.Constant) and isinstance(node.slice.value, str)):
+        return (node.value.id, node.slice.value)
+    raise ValueError(f"Expected var['term'], got: {ast.unparse(node)}")
+
+
+def _condition(node):
+    if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.BitAnd, ast.BitOr)):
+        op = "and" if isinstance(node.op, ast.BitAnd) else "or"
+        parts = []
+        for side in (node.left, node.right):
+            c = _condition(side)
+            parts.extend(c[1:] if c[0] == op else [c])  # a & b & c -> ("and", a, b, c)
+        return (op, *parts)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Invert):
+        return ("not", _condition(node.operand))
+    return _term(node)
+
+
+def _consequents(node):
+    if isinstance(node, (ast.Tuple, ast.List)):
+        return tuple(_term(e) for e in node.elts)
+    return (_term(node),)
+
+
+def _rule(node):
+    if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "Rule"
+            and isinstance(node.func.value, ast.Name) and node.func.value.id == "ctrl"):
+        raise ValueError(f"Expected ctrl.Rule(...), got: {ast.unparse(node)}")
+    args = dict(zip(("antecedent", "consequent"), node.args))
+    args.update((k.arg, k.value) for k in node.keywords if k.arg in ("antecedent", "consequent"))
+    if set(args) != {"antecedent", "consequent"}:
+        raise ValueError(f"ctrl.Rule needs an antecedent and a consequent: {ast.unparse(node)}")
+    return (_condition(args["antecedent"]), _consequents(args["consequent"]))
+
+
+def _rule_list(node):
+    if not isinstance(node, (ast.List, ast.Tuple)):
+        raise ValueError(f"Expected a list of ctrl.Rule, got: {ast.unparse(node)}")
+    return [_rule(e) for e in node.elts]
+
+
+def _condition_from_json(c):
+    if isinstance(c, (list, tuple)) and c and c[0] in _OPS:
+        if c[0] == "not" and len(c) != 2 or c[0] != "not" and len(c) < 3:
+            raise ValueError(f"Bad '{c[0]}' condition: {c}")
+        return (c[0], *(_condition_from_json(x) for x in c[1:]))
+    if isinstance(c, (list, tuple)) and len(c) == 2 and all(isinstance(x, str) for x in c):
+        return (c[0], c[1])
+    raise ValueError(f"Bad condition: {c!r}")
+
+
+def _condition_to_json(c):
+    return [c[0], *(_condition_to_json(x) for x in c[1:])] if c[0] in _OPS else list(c)
+
+
+class RuleSpec:
+    """Immutable, hashable description of a fuzzy rule set."""
+
+    def __init__(self, rules):
+        self.rules = tuple((cond, tuple(tuple(t) for t in cons)) for cond, cons in rules)
+        if not self.rules:
+            raise ValueError("A rule set needs at least one rule")
+        self._key = None
+
+    @classmethod
+    def from_code(cls, code):
+        """Parse a `rules = []` block of ctrl.Rule(...) entries. Only that syntax is accepted."""
+        tree = ast.parse(normalize_rule_code(code))
+        rules = []
+        for stmt in tree.body:
+            if (isinstance(stmt, ast.Assign) and len(stmt.targets) == 1
+                    and isinstance(stmt.targets[0], ast.Name) and stmt.targets[0].id in _RULE_LISTS):
+                rules = _rule_list(stmt.value)  # rules = [...]
+            elif (isinstance(stmt, ast.AugAssign) and isinstance(stmt.op, ast.Add)
+                    and isinstance(stmt.target, ast.Name) and stmt.target.id in _RULE_LISTS):
+                rules += _rule_list(stmt.value)  # rules += [...]
+            elif (isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Call)
+                    and isinstance(stmt.value.func, ast.Attribute) and stmt.value.func.attr in ("append", "extend")
+                    and isinstance(stmt.value.func.value, ast.Name) and stmt.value.func.value.id in _RULE_LISTS
+                    and len(stmt.value.args) == 1):
+                arg = stmt.value.args[0]
+                rules += [_rule(arg)] if stmt.value.func.attr == "append" else _rule_list(arg)
+            else:
+                raise ValueError(f"Unsupported statement in rule code: {ast.unparse(stmt)}")
+        return cls(rules)
+
+    @classmethod
+    def from_json(cls, data):
+        """Rules from a JSON string or the parsed list (or {"rules": [...]})."""
+        if isinstance(data, str):
+            data = json.loads(data)
+        if isinstance(data, dict):
+            data = data["rules"]
+        rules = []
+        for r in data:
+            then = r["then"].items() if isinstance(r["then"], dict) else r["then"]
+            rules.append((_condition_from_json(r["if"]), tuple((v, t) for v, t in then)))
+        return cls(rules)
+
+    @classmethod
+    def parse(cls, rules):
+        """RuleSpec from any accepted form: RuleSpec, JSON text or data, or rule code text."""
+        if isinstance(rules, cls):
+            return rules
+        if isinstance(rules, str):
+            return _parse_text(rules.strip())
+        return cls.from_json(rules)
+
+    def to_json(self):
+        return [{"if": _condition_to_json(cond), "then": [list(t) for t in cons]} for cond, cons in self.rules]
+
+    def key(self):
+        if self._key is None:
+            text = json.dumps(self.to_json(), separators=(",", ":"))
+            self._key = hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+        return self._key
+
+    def __eq__(self, other):
+        return isinstance(other, RuleSpec) and self.rules == other.rules
+
+    def __hash__(self):
+        return hash(self.rules)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def build(self, variables):
+        """ctrl.Rule list over {name: Antecedent/Consequent}; unknown variables or terms raise ValueError."""
+        def term(name, label):
+            if name not in variables:
+                raise ValueError(f"Unknown fuzzy variable '{name}'")
+            if label not in variables[name].terms:
+                raise ValueError(f"'{name}' has no term '{label}' (has {', '.join(variables[name].terms)})")
+            return variables[name][label]
+
+        def expr(c):
+            if c[0] == "not":
+                return ~expr(c[1])
+            if c[0] in _OPS:
+                out = expr(c[1])
+                for x in c[2:]:
+                    out = out & expr(x) if c[0] == "and" else out | expr(x)
+                return out
+            return term(*c)
+
+        return [ctrl.Rule(expr(cond), tuple(term(*t) for t in cons) if len(cons) > 1 else term(*cons[0]))
+                for cond, cons in self.rules]
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_text(text):
+    # Controllers built over and over from the same text only parse it once
+    return RuleSpec.from_json(text) if text[:1] in "[{" else RuleSpec.from_code(text)
+
+
+def load_rule_set(path):
+    """RuleSpec from a .json file, or a .py/.txt file holding a rule block."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    return RuleSpec.from_json(text) if path.endswith(".json") else RuleSpec.from_code(text)
@@ -1,76 +1,240 @@
 #Author: Kyle Nguyen
 #Description: Everything needed for fuzzy logic controller
+import numpy as np
+
 from kesslergame.controller import KesslerController
 from util import wrap180, intercept_point, side_score
 
 
 """
-    PLANSS:
-    A rule class that handles taking in the antecedents and consequents
-    
-    A engine that take cares of
-    
-    
-    
+    How it works:
+    FuzzyVariable holds the triangle/trapezoid parameters of all its terms in one array,
+    so every term's membership for a whole batch of inputs is one numpy expression.
+
+    Rules name their antecedents as (input_name, term_name) and get compiled into an
+    index array over the columns of that membership matrix (R rules x K antecedents,
+    padded with an always-1 column). Rule strength is then a prod/min over one gather.
+
+    SugenoSystem: consequents are constants or linear functions of the inputs,
+                  output = weighted average of the rule outputs.
+    MamdaniSystem: consequents are output terms, clipped by rule strength,
+                   max-aggregated and centroid defuzzified on the output universe.
+
+    evaluate() takes a dict of scalars (one input) or arrays (a batch), e.g. every
+    candidate action at once, and returns floats or arrays to match.
 """
 
 
 def rule_strength(mus, mode="prod"):
     #mus: list of membership values in [0,1]
-    acc = 1.0 if mode == "prod" else 1.0    
     if mode == "prod":
+        acc = 1.0
         for m in mus: acc *= m
         return acc
     else:  # "min"
         return min(mus) if mus else 0.0
 
 
+def _tnorm(mus, mode, axis=-1):
+    if mode == "prod":
+        return np.prod(mus, axis=axis)
+    if mode == "min":
+        return np.min(mus, axis=axis)
+    raise ValueError(f"Unknown t-norm '{mode}', use 'prod' or 'min'")
+
+
+class FuzzyVariable:
+    def __init__(self, name, terms, universe=None):
+        #name: input/output name, ex: 'dist'
+        #terms: {'close': (a, b, c)} triangle or {'far': (a, b, c, d)} trapezoid, same shapes as util.triag/trap
+        #universe: (lo, hi, n) sample grid, only needed for Mamdani outputs
+        self.name = name
+        self.term_names = list(terms.keys())
+        self.index = {t: i for i, t in enumerate(self.term_names)}
+        params = []
+        for t in self.term_names:
+            p = tuple(float(v) for v in terms[t])
+            if len(p) == 3:
+                p = (p[0], p[1], p[1], p[2])  # triangle = trapezoid with a flat top of width 0
+            elif len(p) != 4:
+                raise ValueError(f"Term '{t}' of '{name}' needs 3 (triangle) or 4 (trapezoid) points")
+            params.append(p)
+        self.params = np.array(params)  # (T, 4)
+        self.universe = np.linspace(*universe[:2], int(universe[2])) if universe is not None else None
+        # Sampled memberships on the universe, precomputed once for Mamdani aggregation
+        self.mf_table = self.memberships(self.universe).T if self.universe is not None else None  # (T, U)
+
+    def memberships(self, x):
+        #x: (B,) crisp values -> (B, T) memberships of every term
+        x = np.asarray(x, dtype=float)[:, None]
+        a, b, c, d = self.params.T
+        with np.errstate(divide="ignore", invalid="ignore"):
+            up = np.where(b > a, (x - a) / (b - a), (x >= a).astype(float))
+            down = np.where(d > c, (d - x) / (d - c), (x <= d).astype(float))
+        return np.clip(np.minimum(up, down), 0.0, 1.0)
 
-class SugenoRule:
+
+class _RuleBase:
     def __init__(self, antecedents, consequents, weight=1.0):
-        self.antecedents = antecedents  #list of (fuzzy_set_name, membership_value) tuples
-        self.consequents = consequents  #list of (output_name, output_value) tuples
+        self.antecedents = antecedents  #list of (input_name, term_name) or (input_name, membership_fn) tuples
+        self.consequents = consequents
         self.weight = weight  #weight of the rule, default to 1.0
-    
-class SugenoSystem:
-    def __init__(self, rules=None, mode="prod"):
+
+
+class _FuzzySystem:
+    def __init__(self, rules=None, mode="prod", variables=None):
         self.rules = rules if rules else []
         self.mode = mode  #"prod" or "min"
-    def add_rule(self,rule:SugenoRule):
+        self.variables = {v.name: v for v in (variables or [])}
+        self._compiled = None
+
+    def add_rule(self, rule):
         self.rules.append(rule)
-    def evaluate(self,inputs:dict): #evalutate with crisp inputs, ex:{'dist': 300, 'approach': 1.5, 'ammo': 3}
-        numerator, denominator = 0.0,0.0
-        #For each rule, calculate its strength and contribute to the output
+        self._compiled = None  # recompile on next evaluate
+
+    def add_variable(self, var: FuzzyVariable):
+        self.variables[var.name] = var
+        self._compiled = None
+
+    def _compile_antecedents(self):
+        #Lay out one membership column per (input, term) or (input, fn) pair used by any rule.
+        #Column 0 is all ones, used to pad rules with fewer antecedents.
+        columns = [None]
+        slot = {}
         for rule in self.rules:
-            mus = []
-            for (fuzzy_set_name, membership_value) in rule.antecedents:
-                if fuzzy_set_name in inputs:
-                    mu = membership_value(inputs[fuzzy_set_name])
-                    mus.append(mu)
+            for name, term in rule.antecedents:
+                key = (name, term if isinstance(term, str) else id(term))
+                if key not in slot:
+                    slot[key] = len(columns)
+                    columns.append((name, term))
+        k = max((len(r.antecedents) for r in self.rules), default=1) or 1
+        idx = np.zeros((len(self.rules), k), dtype=np.intp)
+        for r, rule in enumerate(self.rules):
+            for j, (name, term) in enumerate(rule.antecedents):
+                idx[r, j] = slot[(name, term if isinstance(term, str) else id(term))]
+        weights = np.array([float(r.weight) for r in self.rules])
+        return columns, idx, weights
+
+    def _memberships(self, columns, inputs, batch):
+        #(B, C) membership matrix; each variable's terms are computed together and cached
+        M = np.empty((batch, len(columns)))
+        M[:, 0] = 1.0
+        per_var = {}
+        for col, entry in enumerate(columns[1:], start=1):
+            name, term = entry
+            if name not in inputs:
+                M[:, col] = 0.0  # If input not found, assume membership is 0
+                continue
+            x = np.broadcast_to(np.asarray(inputs[name], dtype=float), (batch,))
+            if isinstance(term, str):
+                if name not in per_var:
+                    per_var[name] = self.variables[name].memberships(x)
+                M[:, col] = per_var[name][:, self.variables[name].index[term]]
+            else:
+                M[:, col] = np.fromiter((term(v) or 0.0 for v in x), dtype=float, count=batch)
+        return M
+
+    def strengths(self, inputs):
+        #(B, R) weighted firing strength of every rule
+        if self._compiled is None:
+            self._compiled = self._compile()
+        columns, idx, weights = self._compiled[:3]
+        batch, _ = _batch_size(inputs)
+        M = self._memberships(columns, inputs, batch)
+        return _tnorm(M[:, idx], self.mode) * weights, batch
+
+
+def _batch_size(inputs):
+    sizes = [np.size(v) for v in inputs.values()]
+    scalar = all(np.ndim(v) == 0 for v in inputs.values())
+    return (max(sizes) if sizes else 1), scalar
+
+
+def _unbatch(outputs, inputs):
+    if _batch_size(inputs)[1]:
+        return {k: float(v[0]) for k, v in outputs.items()}
+    return outputs
+
+
+class SugenoRule(_RuleBase):
+    #consequents: list of (output_name, value) where value is a constant
+    #or a dict of linear coefficients, ex: {'dist': 0.2, 'bias': 50.0}
+    pass
+
+
+class SugenoSystem(_FuzzySystem):
+    def _compile(self):
+        columns, idx, weights = self._compile_antecedents()
+        outputs = sorted({name for rule in self.rules for name, _ in rule.consequents})
+        inputs = sorted({k for rule in self.rules for _, v in rule.consequents if isinstance(v, dict) for k in v if k != "bias"})
+        # (R, O, F+1) linear consequent coefficients, last column is the bias
+        coef = np.zeros((len(self.rules), len(outputs), len(inputs) + 1))
+        # (R, O) which rules say anything about each output
+        mask = np.zeros((len(self.rules), len(outputs)))
+        for r, rule in enumerate(self.rules):
+            for name, value in rule.consequents:
+                o = outputs.index(name)
+                mask[r, o] = 1.0
+                if isinstance(value, dict):
+                    for k, c in value.items():
+                        coef[r, o, -1 if k == "bias" else inputs.index(k)] = float(c)
                 else:
-                    mus.append(0.0)  # If input not found, assume membership is 0
-                    
-        
-        
+                    coef[r, o, -1] = float(value)
+        return columns, idx, weights, outputs, inputs, coef, mask
 
+    def evaluate(self, inputs: dict): #evaluate with crisp inputs, ex:{'dist': 300, 'approach': 1.5, 'ammo': 3}, or arrays for a batch
+        w, batch = self.strengths(inputs)
+        _, _, _, outputs, lin_inputs, coef, mask = self._compiled
+        X = np.ones((batch, len(lin_inputs) + 1))
+        for i, name in enumerate(lin_inputs):
+            X[:, i] = np.broadcast_to(np.asarray(inputs.get(name, 0.0), dtype=float), (batch,))
+        f = np.einsum("bf,rof->bro", X, coef)  # (B, R, O) rule outputs
+        wm = w[:, :, None] * mask[None]        # only rules that mention an output vote on it
+        numerator = (wm * f).sum(axis=1)
+        denominator = wm.sum(axis=1)
+        out = np.where(denominator > 0, numerator / np.where(denominator > 0, denominator, 1.0), 0.0)
+        return _unbatch({name: out[:, o] for o, name in enumerate(outputs)}, inputs)
 
 
+class MamdaniRule(_RuleBase):
+    #consequents: list of (output_name, term_name) on an output FuzzyVariable with a universe
+    pass
 
 
+class MamdaniSystem(_FuzzySystem):
+    def __init__(self, rules=None, mode="prod", variables=None, implication="min"):
+        super().__init__(rules, mode, variables)
+        self.implication = implication  #"min" clips the output term, "prod" scales it
 
-#WIP
-class MamdaniRule:
-    def __init__(self, antecedents, consequents, weight=1.0):
-        self.antecedents = antecedents  #list of (fuzzy_set_name, membership_value) tuples
-        self.consequents = consequents  #list of (output_name, fuzzy_set_name) tuples
-        self.weight = weight  #weight of the rule, default to 1.0
-class MamdaniSystem:
-    def __init__(self, rules=None, mode="prod"):
-        self.rules = rules if rules else []
-        self.mode = mode  #"prod" or "min"
-    def add_rule(self,rule:MamdaniRule):
-        self.rules.append(rule)
-    def evaluate(self,inputs:dict):
-        pass
-        
-        
+    def _compile(self):
+        columns, idx, weights = self._compile_antecedents()
+        outputs = sorted({name for rule in self.rules for name, _ in rule.consequents})
+        # For each output: (R, T) 0/1 matrix of which rule fires which output term
+        targets = {}
+        for name in outputs:
+            var = self.variables[name]
+            if var.universe is None:
+                raise ValueError(f"Output '{name}' needs a universe for Mamdani defuzzification")
+            hit = np.zeros((len(self.rules), len(var.term_names)))
+            for r, rule in enumerate(self.rules):
+                for out_name, term in rule.consequents:
+                    if out_name == name:
+                        hit[r, var.index[term]] = 1.0
+            targets[name] = hit
+        return columns, idx, weights, outputs, targets
+
+    def evaluate(self, inputs: dict):
+        w, batch = self.strengths(inputs)
+        _, _, _, outputs, targets = self._compiled
+        results = {}
+        for name in outputs:
+            var = self.variables[name]
+            cuts = np.max(w[:, :, None] * targets[name][None], axis=1)  # (B, T) max accumulation per term
+            if self.implication == "min":
+                agg = np.minimum(cuts[:, :, None], var.mf_table[None]).max(axis=1)  # (B, U)
+            else:
+                agg = (cuts[:, :, None] * var.mf_table[None]).max(axis=1)
+            area = agg.sum(axis=1)
+            centroid = (agg * var.universe).sum(axis=1) / np.where(area > 0, area, 1.0)
+            results[name] = np.where(area > 0, centroid, 0.0)
+        return _unbatch(results, inputs)
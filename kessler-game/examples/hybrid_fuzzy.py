@@ -4,66 +4,10 @@
 
 import math
 from kesslergame.controller import KesslerController
-from util import wrap180, triag, intercept_point
-
-
-
-
-# threat priority calculation for targeting
-"""A higher score means a more threatening asteroid,
-calculate relative speed, factor in size and distance. """
-def calculate_threat_priority(asteroid, ship_pos, ship_vel):
-    ax, ay = asteroid.position
-    dx, dy = ax - ship_pos[0], ay - ship_pos[1]
-    #hypot gives sqrt(dx*dx + dy*dy)
-    distance = math.hypot(dx, dy)#hypot is very very nice
-    
-    avx, avy = getattr(asteroid, "velocity", (0.0, 0.0))
-    closing_speed = ((avx - ship_vel[0]) * dx + (avy - ship_vel[1]) * dy) / max(distance, 1)
-    
-    size = getattr(asteroid, "size", 2)
-    
-    """(1000 / distance) → closer asteroids = higher priority.
-(max(closing_speed, 0) / 50) → if the asteroid is rushing toward you, add danger. If moving away, ignore it (max(...,0)).
-(5 - size) → smaller asteroids add to priority (maybe theyare harder to hit or dodge).
-
-"""
-
-
-    priority = (1000.0 / distance) + max(closing_speed, 0) / 50.0 + (5 - size)#give priority to smaller asteroids
-    return priority
-
-def find_closest_threat(asteroids, ship_pos):
-    closest_dist = float('inf')
-    closest_asteroid = None
-    
-    for asteroid in asteroids:
-        ax, ay = asteroid.position
-        distance = math.hypot(ax - ship_pos[0], ay - ship_pos[1])
-        if distance < closest_dist:
-            closest_dist = distance
-            closest_asteroid = asteroid
-    
-    return closest_asteroid, closest_dist
-
-
-def rear_clearance(ship_pos, heading_deg, asteroids, check_range=200.0, safety=40.0):
-    #vector pointing behind the ship, basically get the ship heading +180
-    hx = math.cos(math.radians(heading_deg + 180))
-    hy = math.sin(math.radians(heading_deg + 180))
-    sx, sy = ship_pos
-    for a in asteroids:
-        ax, ay = a.position
-        dx, dy = ax - sx, ay - sy
-        
-        proj = dx*hx + dy*hy #dot product to project vector from ship to asteroid onto the heading vector
-        if 0 < proj < check_range:
-            #perpendicular distance from point dx dy to a line
-            perp = abs(dx*(-hy) + dy*hx)
-            if perp < safety + getattr(a, "radius", 0.0):
-                return False
+from util import wrap180, triag
+from perception import perceive
+
 
-    return True
 
 
 class hybrid_controller(KesslerController):
@@ -76,24 +20,20 @@ class hybrid_controller(KesslerController):
         """for b in game_state.bullets:
             print("Bullet speed:", math.hypot(b.vx, b.vy))""" #checking bullet speed
 
-        asteroids = getattr(game_state, "asteroids", [])
-        if not asteroids:
+        p = perceive(ship_state, game_state)  # shared per-frame asteroid geometry
+        if not p.num_asteroids:
             return 0.0, 0.0, False, False 
 
         sx, sy = ship_state.position
         heading = ship_state.heading
         svx, svy = getattr(ship_state, "velocity", (0.0, 0.0))
 
-        closest_asteroid, closest_distance = find_closest_threat(asteroids, (sx, sy))
-        if closest_asteroid is None:
-            return 0.0, 0.0, False, False # no threats, safe
+        closest_asteroid, closest_distance = p.closest()
 
         ax, ay = closest_asteroid.position
         dx, dy = ax - sx, ay - sy
-        avx, avy = getattr(closest_asteroid, "velocity", (0.0, 0.0))
 
-        rel_vel_x, rel_vel_y = avx - svx, avy - svy
-        approaching_speed = (rel_vel_x * dx + rel_vel_y * dy) / max(closest_distance, 1)
+        approaching_speed = float(p.range_rate[p.closest_index])
 
         # Membership functions
         very_close = triag(closest_distance, 0, 80, 160)
@@ -120,19 +60,12 @@ class hybrid_controller(KesslerController):
             perp1 = (-dy, dx)# perpendicular vectors left and right
             perp2 = (dy, -dx)
             
-            #all asteroid positions
-            asteroid_positions = [a.position for a in asteroids]
-
-            #compute vector from ship to asteroid
-            vectors_to_asteroids = [(bx - sx, by - sy) for (bx, by) in asteroid_positions]
-
-            dot_products_perp1 = [(vx * perp1[0] + vy * perp1[1]) for (vx, vy) in vectors_to_asteroids]
-            dot_products_perp2 = [(vx * perp2[0] + vy * perp2[1]) for (vx, vy) in vectors_to_asteroids]
-
+            #sum of the vectors from ship to every asteroid
+            vx, vy = p.rel.sum(axis=0)
 
-            #counting how many asteroids are on each side
-            score1 = sum(dot_products_perp1)
-            score2 = sum(dot_products_perp2)
+            #counting how many asteroids are on each side (sum of dot products = dot product with the sum)
+            score1 = vx * perp1[0] + vy * perp1[1]
+            score2 = vx * perp2[0] + vy * perp2[1]
             perp = perp1 if score1 > score2 else perp2
 
             dodge_angle = math.degrees(math.atan2(perp[1], perp[0]))
@@ -144,7 +77,7 @@ class hybrid_controller(KesslerController):
                 print("MODE: Panic Mode")
 
         elif danger_level > 0.3:
-            if rear_clearance((sx, sy), heading, asteroids):# clear behind, back off
+            if p.rear_clear():# clear behind, back off
                 approach_angle = math.degrees(math.atan2(dy, dx)) #atan2 gives angle from x-axis to point (x,y)
                 aim_err = wrap180(approach_angle - heading)
                 
@@ -159,12 +92,11 @@ class hybrid_controller(KesslerController):
             else: # blocked behind, dodge sideways
                 perp1 = (-dy, dx)
                 perp2 = (dy, -dx)
-                asteroid_positions = [a.position for a in asteroids]
-                vectors_to_asteroids = [(bx - sx, by - sy) for (bx, by) in asteroid_positions]
+                vx, vy = p.rel.sum(axis=0)
                 #Score how many asteroids are on each side
                 """NOTE: Not very good, very far asteroids still count, should only count within a certain range"""
-                score1 = sum(vx * perp1[0] + vy * perp1[1] for (vx, vy) in vectors_to_asteroids)
-                score2 = sum(vx * perp2[0] + vy * perp2[1] for (vx, vy) in vectors_to_asteroids)
+                score1 = vx * perp1[0] + vy * perp1[1]
+                score2 = vx * perp2[0] + vy * perp2[1]
                 perp = perp1 if score1 > score2 else perp2
                 dodge_angle = math.degrees(math.atan2(perp[1], perp[0]))
                 dodge_err = wrap180(dodge_angle - heading)
@@ -179,7 +111,7 @@ class hybrid_controller(KesslerController):
             if best_asteroid:
                 
                 #bullet_speed = 800.0
-                ix, iy = intercept_point((sx, sy), (svx, svy), 800.0,best_asteroid.position, getattr(best_asteroid, "velocity", (0.0, 0.0)))    
+                ix, iy = p.intercept(p.best_threat_index, 800.0)
                 desired_heading = math.degrees(math.atan2(dy_i, dx_i))
                 heading_err = wrap180(desired_heading - heading)
                 turn_rate = max(-180.0, min(180.0, heading_err * 3.0))
@@ -198,10 +130,9 @@ class hybrid_controller(KesslerController):
                 print("MODE: FAR APPROACH (cruisin')")
 
         if closest_distance > 100:
-            best_asteroid = max(asteroids, key=lambda a: calculate_threat_priority(a, (sx,sy), (svx,svy)))
+            best_asteroid = p.best_threat()
             bullet_speed = 800.0
-            ix, iy = intercept_point((sx, sy), (svx, svy), bullet_speed,
-                                    best_asteroid.position, best_asteroid.velocity)
+            ix, iy = p.intercept(p.best_threat_index, bullet_speed)
             dx_i, dy_i = ix - sx, iy - sy
             desired_heading = math.degrees(math.atan2(dy_i, dx_i)) #take the angle to the intercept point and turn into a heading
             heading_err = wrap180(desired_heading - heading)
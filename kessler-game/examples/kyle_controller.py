@@ -2,7 +2,8 @@
 #Description: A full fuzzy logic controller for the Kessler game.
 
 from kesslergame.controller import KesslerController
-from util import wrap180, intercept_point, side_score, triag, find_nearest_asteroid, angle_between, distance
+from util import wrap180, side_score, triag, angle_between
+from perception import perceive
 from fuzzy_system import SugenoRule
 
 import math
@@ -105,20 +106,19 @@ def build_rules():
 
 def context(ship_state, game_state):
     # find nearest asteroid
-    asteroids = game_state.asteroids
-    if not asteroids:
+    p = perceive(ship_state, game_state)
+    if not p.num_asteroids:
         return None  # no asteroids, nothing to do
-    nearest_asteroid = find_nearest_asteroid(ship_state, game_state)
-    dist = distance(ship_state.position, nearest_asteroid.position)
-    
-    rel_vel = (nearest_asteroid.velocity[0] - ship_state.velocity[0], nearest_asteroid.velocity[1] - ship_state.velocity[1])
-    approach_speed = (rel_vel[0] * (nearest_asteroid.position[0] - ship_state.position[0]) + rel_vel[1] * (nearest_asteroid.position[1] - ship_state.position[1])) / dist if dist != 0 else 0
+    i = p.closest_index
+    dist = float(p.dist[i])
+
+    approach_speed = float(p.range_rate[i]) if dist != 0 else 0
 
     ttc = dist / approach_speed if approach_speed > 0 else float('inf')
 
-    intercept = intercept_point(ship_state.position, ship_state.velocity, nearest_asteroid.position, nearest_asteroid.velocity)
+    intercept = p.intercept(i)
     target_angle = angle_between(ship_state.position, intercept)
-    heading_err = wrap180(target_angle - ship_state.angle)
+    heading_err = wrap180(target_angle - ship_state.heading)
 
 
     return {
@@ -0,0 +1,424 @@
+# kessler-game/examples/perception.py
+# Per-frame perception shared by controllers and loggers.
+#
+# The controllers all start from the same questions: which asteroid is closest, which one
+# is the biggest threat, where to aim to hit it, is it clear behind us. Asked through the
+# helpers below, each one was a Python loop over every asteroid, often several per frame.
+#
+# perceive(ship_state, game_state) turns the frame into arrays once (shared by every ship)
+# and returns the ship's Perception, built once per (ship, frame): relative positions,
+# distances and range rates up front, everything else (threat ranking, intercepts,
+# time to collision, sector occupancy, rear clearance, nearest mine) computed on first
+# use and kept. A controller and its logger calling perceive() in the same frame share it.
+#
+# solve_firing() is the batched aiming solver: for every asteroid at once, the time to turn
+# onto it at the ship's turn rate limit, the bullet's flight time, the aim angle and whether
+# the shot can land at all, over the asteroid's wrap-around images. Picking a target is then
+# one argmin (FiringSolutions.best, Perception.best_shot).
+#
+# find_closest_threat / calculate_threat_priority / rear_clearance keep the old
+# per-asteroid signatures for code that still calls them.
+
+import math
+from functools import cached_property
+
+import numpy as np
+from kesslergame.state_models import AsteroidView, MineView
+
+BULLET_SPEED = 800.0
+_AST_COLS = 7  # x, y, vx, vy, size, mass, radius (AsteroidView's data layout)
+
+
+class FrameArrays:
+    """Asteroid and mine data of one frame as arrays: pos/vel (N, 2), size/radius (N,), mine_pos (M, 2)."""
+
+    def __init__(self, game_state):
+        compact = getattr(game_state, "compact", None)
+        if isinstance(compact, dict):
+            # GameState: read its raw lists instead of building a view per asteroid
+            self._ast_rows = compact["asteroids"]
+            self._mine_rows = compact["mines"]
+            self._asteroids = None
+            self._mines = None
+            ast = np.array(self._ast_rows, dtype=np.float64).reshape(-1, _AST_COLS)
+            mines = np.array([m[:2] for m in self._mine_rows], dtype=np.float64).reshape(-1, 2)
+        else:
+            # Anything else with .asteroids / .mines objects
+            self._ast_rows = self._mine_rows = None
+            self._asteroids = list(getattr(game_state, "asteroids", None) or [])
+            self._mines = list(getattr(game_state, "mines", None) or [])
+            ast = np.array([[*a.position, *getattr(a, "velocity", (0.0, 0.0)), getattr(a, "size", 2),
+                             getattr(a, "mass", 0.0), getattr(a, "radius", 0.0)] for a in self._asteroids],
+                           dtype=np.float64).reshape(-1, _AST_COLS)
+            mines = np.array([m.position for m in self._mines], dtype=np.float64).reshape(-1, 2)
+        self.pos = ast[:, 0:2]
+        self.vel = ast[:, 2:4]
+        self.size = ast[:, 4]
+        self.radius = ast[:, 6]
+        self.mine_pos = mines
+        self.map_size = getattr(game_state, "map_size", None)
+
+    def __len__(self):
+        return len(self.pos)
+
+    def asteroid(self, i):
+        """Asteroid i as the object controllers expect (.position, .velocity, .size, ...)."""
+        if self._asteroids is not None:
+            return self._asteroids[i]
+        return AsteroidView(self._ast_rows[i])
+
+    def mine(self, i):
+        if self._mines is not None:
+            return self._mines[i]
+        return MineView(self._mine_rows[i])
+
+
+class Perception:
+    """
+    One ship's view of one frame. Arrays are indexed like the frame's asteroids:
+    rel (N, 2) asteroid - ship, rel_vel (N, 2), dist (N,) and range_rate (N,), the relative
+    velocity along the line of sight. That is the controllers' "approach"/"closing" speed;
+    note it is positive while the distance grows.
+    """
+
+    def __init__(self, frame, ship_state):
+        self.frame = frame
+        self.position = tuple(ship_state.position)
+        self.velocity = tuple(getattr(ship_state, "velocity", (0.0, 0.0)))
+        self.heading = getattr(ship_state, "heading", 0.0)
+        self.ship_radius = getattr(ship_state, "radius", 0.0)
+        self.turn_rate_range = tuple(getattr(ship_state, "turn_rate_range", None) or (-180.0, 180.0))
+        self.num_asteroids = len(frame)
+        self.rel = frame.pos - self.position
+        self.rel_vel = frame.vel - self.velocity
+        self.dist = np.hypot(self.rel[:, 0], self.rel[:, 1])
+        # Relative velocity onto the line of sight, distance floored at 1 like the controllers
+        self.range_rate = np.einsum("ij,ij->i", self.rel_vel, self.rel) / np.maximum(self.dist, 1.0)
+
+    def asteroid(self, i):
+        return self.frame.asteroid(i)
+
+    # Nearest
+
+    @cached_property
+    def closest_index(self):
+        return int(np.argmin(self.dist)) if self.num_asteroids else None
+
+    def closest(self):
+        """(asteroid, distance) of the closest asteroid, (None, inf) without any; as find_closest_threat."""
+        i = self.closest_index
+        if i is None:
+            return None, float("inf")
+        return self.asteroid(i), float(self.dist[i])
+
+    def nearest(self, k):
+        """Indices of the k closest asteroids, closest first."""
+        k = min(k, self.num_asteroids)
+        if k <= 0:
+            return np.empty(0, dtype=np.intp)
+        idx = np.argpartition(self.dist, k - 1)[:k] if k < self.num_asteroids else np.arange(self.num_asteroids)
+        return idx[np.argsort(self.dist[idx], kind="stable")]
+
+    # Threats
+
+    @cached_property
+    def threat_priority(self):
+        """calculate_threat_priority for every asteroid: closer, approaching and smaller rank higher."""
+        return 1000.0 / np.maximum(self.dist, 1.0) + np.maximum(self.range_rate, 0.0) / 50.0 + (5 - self.frame.size)
+
+    def ranked_threats(self, k=None):
+        """Asteroid indices by threat priority, highest first (ties keep frame order)."""
+        order = np.argsort(-self.threat_priority, kind="stable")
+        return order if k is None else order[:k]
+
+    @cached_property
+    def best_threat_index(self):
+        return int(np.argmax(self.threat_priority)) if self.num_asteroids else None
+
+    def best_threat(self):
+        """The highest priority asteroid, as max(asteroids, key=calculate_threat_priority)."""
+        i = self.best_threat_index
+        return None if i is None else self.asteroid(i)
+
+    # Aiming
+
+    def intercepts(self, bullet_speed=BULLET_SPEED):
+        """
+        Aim points (N, 2) and bullet flight times (N,) for every asteroid, as intercept_point:
+        where no positive solution exists the aim point is the asteroid itself and the time NaN.
+        """
+        cache = self.__dict__.setdefault("_intercepts", {})
+        if bullet_speed not in cache:
+            cache[bullet_speed] = _solve_intercepts(self.rel, self.rel_vel, self.frame.pos, self.frame.vel, bullet_speed)
+        return cache[bullet_speed]
+
+    def intercept(self, i, bullet_speed=BULLET_SPEED):
+        points, _ = self.intercepts(bullet_speed)
+        return float(points[i, 0]), float(points[i, 1])
+
+    def firing_solutions(self, bullet_speed=BULLET_SPEED, wrap=True):
+        """solve_firing for this ship and every asteroid; wrap=False ignores the wrap-around images."""
+        key = (bullet_speed, wrap)
+        cache = self.__dict__.setdefault("_firing", {})
+        if key not in cache:
+            cache[key] = solve_firing(self.position, self.velocity, self.heading, self.frame.pos, self.frame.vel,
+                                      bullet_speed=bullet_speed, map_size=self.frame.map_size if wrap else None,
+                                      turn_rate_range=self.turn_rate_range, muzzle=self.ship_radius)
+        return cache[key]
+
+    def best_shot(self, bullet_speed=BULLET_SPEED):
+        """Index of the asteroid that can be hit soonest (turn + flight), None if none can."""
+        return self.firing_solutions(bullet_speed).best()
+
+    # Collisions
+
+    @cached_property
+    def ttc(self):
+        """
+        Time until each asteroid touches the ship if neither changes velocity: first t >= 0
+        with |rel + rel_vel t| <= ship radius + asteroid radius. 0 if already touching, inf if never.
+        """
+        reach = self.ship_radius + self.frame.radius
+        a = np.einsum("ij,ij->i", self.rel_vel, self.rel_vel)
+        b = 2.0 * np.einsum("ij,ij->i", self.rel, self.rel_vel)
+        c = self.dist ** 2 - reach ** 2
+        disc = b * b - 4.0 * a * c
+        with np.errstate(invalid="ignore", divide="ignore"):
+            t = (-b - np.sqrt(disc)) / (2.0 * a)
+        t = np.where((disc >= 0) & (a > 0) & (t >= 0), t, np.inf)
+        return np.where(c <= 0, 0.0, t)
+
+    def sector_occupancy(self, sectors=8, max_range=None):
+        """
+        Asteroid count per angular sector around the ship, relative to its heading. Sector 0
+        is centred on the nose and they go counter-clockwise (the game's angle direction).
+        """
+        key = (sectors, max_range)
+        cache = self.__dict__.setdefault("_sectors", {})
+        if key not in cache:
+            bearing = np.degrees(np.arctan2(self.rel[:, 1], self.rel[:, 0])) - self.heading
+            width = 360.0 / sectors
+            sector = np.floor(((bearing + width / 2.0) % 360.0) / width).astype(np.intp) % sectors
+            if max_range is not None:
+                sector = sector[self.dist <= max_range]
+            cache[key] = np.bincount(sector, minlength=sectors)
+        return cache[key]
+
+    def rear_clear(self, check_range=200.0, safety=40.0):
+        """True if no asteroid is within check_range behind the ship and safety (+radius) of its tail line."""
+        key = (check_range, safety)
+        cache = self.__dict__.setdefault("_rear", {})
+        if key not in cache:
+            hx = math.cos(math.radians(self.heading + 180))
+            hy = math.sin(math.radians(self.heading + 180))
+            proj = self.rel[:, 0] * hx + self.rel[:, 1] * hy
+            perp = np.abs(self.rel[:, 0] * -hy + self.rel[:, 1] * hx)
+            cache[key] = not np.any((proj > 0) & (proj < check_range) & (perp < safety + self.frame.radius))
+        return cache[key]
+
+    # Mines
+
+    @cached_property
+    def mine_dist(self):
+        return np.hypot(self.frame.mine_pos[:, 0] - self.position[0], self.frame.mine_pos[:, 1] - self.position[1])
+
+    def closest_mine(self):
+        """(mine, distance) of the closest mine, (None, inf) without any."""
+        if not len(self.mine_dist):
+            return None, float("inf")
+        i = int(np.argmin(self.mine_dist))
+        return self.frame.mine(i), float(self.mine_dist[i])
+
+
+def _solve_intercepts(rel, rel_vel, pos, vel, bullet_speed):
+    # intercept_point's quadratic for all asteroids at once: |rel + rel_vel t| = bullet_speed t
+    a = np.einsum("ij,ij->i", rel_vel, rel_vel) - bullet_speed ** 2
+    b = 2.0 * np.einsum("ij,ij->i", rel, rel_vel)
+    c = np.einsum("ij,ij->i", rel, rel)
+    delta = b * b - 4.0 * a * c
+    ok = (delta >= 0) & (np.abs(a) >= 1e-6)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        root = np.sqrt(np.where(ok, delta, 0.0))
+        t1 = (-b + root) / (2.0 * a)
+        t2 = (-b - root) / (2.0 * a)
+    t1 = np.where(ok & (t1 > 0), t1, np.inf)
+    t2 = np.where(ok & (t2 > 0), t2, np.inf)
+    t = np.minimum(t1, t2)
+    hit = np.isfinite(t)
+    t = np.where(hit, t, np.nan)
+    points = np.where(hit[:, None], pos + vel * np.where(hit, t, 0.0)[:, None], pos)
+    return points, t
+
+
+class FiringSolutions:
+    """
+    One ship's shot at every asteroid, arrays indexed like the asteroids:
+    turn (N,) degrees to turn onto the aim point (wrapped to [-180, 180), + is a positive turn rate),
+    turn_time (N,) seconds that takes at the turn rate limit, flight_time (N,) bullet travel after it,
+    time (N,) their sum, aim (N, 2) where the bullet meets the asteroid, aim_angle (N,) the heading
+    to fire on, and feasible (N,). Infeasible shots have time inf and flight_time NaN.
+    """
+
+    def __init__(self, turn, turn_time, flight_time, aim, aim_angle, feasible):
+        self.turn = turn
+        self.turn_time = turn_time
+        self.flight_time = flight_time
+        self.time = np.where(feasible, turn_time + flight_time, np.inf)
+        self.aim = aim
+        self.aim_angle = aim_angle
+        self.feasible = feasible
+
+    def __len__(self):
+        return len(self.time)
+
+    def best(self):
+        """Index of the soonest hit, None if nothing can be hit."""
+        if not self.feasible.any():
+            return None
+        return int(np.argmin(self.time))
+
+    def order(self, k=None):
+        """Indices of the feasible shots, soonest first."""
+        idx = np.flatnonzero(self.feasible)
+        idx = idx[np.argsort(self.time[idx], kind="stable")]
+        return idx if k is None else idx[:k]
+
+
+def _first_hit(d, v, bullet_speed, muzzle):
+    # Smallest s > 0 with |d + v s| = muzzle + bullet_speed s, NaN if there is none
+    a = np.einsum("...j,...j->...", v, v) - bullet_speed ** 2
+    b = 2.0 * (np.einsum("...j,...j->...", d, v) - muzzle * bullet_speed)
+    c = np.einsum("...j,...j->...", d, d) - muzzle ** 2
+    delta = b * b - 4.0 * a * c
+    ok = (delta >= 0) & (np.abs(a) >= 1e-6)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        root = np.sqrt(np.where(ok, delta, 0.0))
+        t1 = (-b + root) / (2.0 * a)
+        t2 = (-b - root) / (2.0 * a)
+    t1 = np.where(ok & (t1 > 0), t1, np.inf)
+    t2 = np.where(ok & (t2 > 0), t2, np.inf)
+    t = np.minimum(t1, t2)
+    return np.where(np.isfinite(t), t, np.nan)
+
+
+def solve_firing(ship_pos, ship_vel, heading, positions, velocities, bullet_speed=BULLET_SPEED,
+                 map_size=None, turn_rate_range=(-180.0, 180.0), muzzle=0.0, iterations=3):
+    """
+    Firing solutions against every asteroid (positions/velocities (N, 2)) in one pass.
+
+    A shot is: turn at the turn rate limit until the nose points at the aim point, then fire.
+    Meanwhile the ship coasts on its velocity and the asteroid on its own. Bullets keep their
+    own 800 m/s (they do not inherit the ship's velocity), leave from `muzzle` ahead of the
+    ship's centre and are removed at the map edge, while asteroids wrap around it. So with a
+    map_size, each asteroid's 9 wrap images are solved and the soonest one whose hit point is
+    inside the map is kept. The turn time and the aim point depend on each other; `iterations`
+    fixed-point passes settle them (the first pass assumes no turn).
+    """
+    ship_pos = np.asarray(ship_pos, dtype=np.float64)
+    ship_vel = np.asarray(ship_vel, dtype=np.float64)
+    pos = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+    vel = np.asarray(velocities, dtype=np.float64).reshape(-1, 2)
+    if map_size is not None:
+        w, h = float(map_size[0]), float(map_size[1])
+        offsets = np.array([(i * w, j * h) for i in (0, -1, 1) for j in (0, -1, 1)])
+    else:
+        offsets = np.zeros((1, 2))
+    images = pos[None, :, :] + offsets[:, None, :]  # (K, N, 2), image 0 is the asteroid itself
+    left, right = abs(turn_rate_range[0]) or 1e-9, abs(turn_rate_range[1]) or 1e-9
+
+    turn_time = np.zeros(images.shape[:2])
+    for it in range(max(1, iterations)):
+        if it:
+            turn_time = np.where(turn >= 0, turn / right, -turn / left)
+        origin = ship_pos + ship_vel * turn_time[..., None]
+        flight = _first_hit(images + vel * turn_time[..., None] - origin, vel, bullet_speed, muzzle)
+        aim = images + vel * (turn_time + np.nan_to_num(flight))[..., None]
+        aim_angle = np.degrees(np.arctan2(aim[..., 1] - origin[..., 1], aim[..., 0] - origin[..., 0]))
+        turn = (aim_angle - heading + 180.0) % 360.0 - 180.0
+
+    # The bullet path is a straight segment from inside the map, so it stays in if its end does
+    feasible = np.isfinite(flight)
+    if map_size is not None:
+        feasible &= (aim[..., 0] >= 0) & (aim[..., 0] <= w) & (aim[..., 1] >= 0) & (aim[..., 1] <= h)
+    total = np.where(feasible, turn_time + np.nan_to_num(flight), np.inf)
+    k = np.argmin(total, axis=0)  # all-inf columns fall back to image 0
+    n = np.arange(pos.shape[0])
+    ok = feasible[k, n]
+    return FiringSolutions(turn[k, n], turn_time[k, n], np.where(ok, flight[k, n], np.nan),
+                           aim[k, n], aim_angle[k, n], ok)
+
+
+# The current frame and the Perceptions built in it. Keyed on the frame's contents rather
+# than the GameState object, so the per-ship copies of one frame made in competition safe
+# mode share a single FrameArrays.
+_cache = {"key": None, "arrays": None, "ships": {}}
+
+
+def _frame_key(game_state):
+    """(frame, time, map_size) plus a cheap check of the asteroids and mines: their counts and first rows."""
+    compact = getattr(game_state, "compact", None)
+    if isinstance(compact, dict):
+        asteroids, mines = compact["asteroids"], compact["mines"]
+        first = tuple(asteroids[0]) if asteroids else None
+        first_mine = tuple(mines[0]) if mines else None
+    else:
+        asteroids = getattr(game_state, "asteroids", None) or []
+        mines = getattr(game_state, "mines", None) or []
+        first = tuple(asteroids[0].position) if asteroids else None
+        first_mine = tuple(mines[0].position) if mines else None
+    return (getattr(game_state, "frame", None), getattr(game_state, "time", None),
+            getattr(game_state, "map_size", None), len(asteroids), first, len(mines), first_mine)
+
+
+def frame_arrays(game_state):
+    """The FrameArrays of this frame, built on the first call in it."""
+    key = _frame_key(game_state)
+    if _cache["key"] != key:
+        _cache.update(key=key, arrays=FrameArrays(game_state), ships={})
+    return _cache["arrays"]
+
+
+def perceive(ship_state, game_state):
+    """This ship's Perception of this frame, shared by every caller in the frame."""
+    arrays = frame_arrays(game_state)
+    key = (getattr(ship_state, "id", None), tuple(ship_state.position), getattr(ship_state, "heading", 0.0))
+    ships = _cache["ships"]
+    if key not in ships:
+        ships[key] = Perception(arrays, ship_state)
+    return ships[key]
+
+
+# Per-asteroid helpers, as the controllers used to define them
+
+def calculate_threat_priority(asteroid, ship_pos, ship_vel):
+    ax, ay = asteroid.position
+    dx, dy = ax - ship_pos[0], ay - ship_pos[1]
+    d = math.hypot(dx, dy)
+    avx, avy = getattr(asteroid, "velocity", (0.0, 0.0))
+    closing = ((avx - ship_vel[0]) * dx + (avy - ship_vel[1]) * dy) / max(d, 1)
+    size = getattr(asteroid, "size", 2)
+    return (1000.0 / max(d, 1)) + max(closing, 0) / 50.0 + (5 - size)
+
+
+def find_closest_threat(asteroids, ship_pos):
+    m = float('inf'); best = None
+    for a in asteroids:
+        ax, ay = a.position
+        d = math.hypot(ax - ship_pos[0], ay - ship_pos[1])
+        if d < m: m = d; best = a
+    return best, m
+
+
+def rear_clearance(ship_pos, heading_deg, asteroids, check_range=200.0, safety=40.0):
+    hx = math.cos(math.radians(heading_deg + 180))
+    hy = math.sin(math.radians(heading_deg + 180))
+    sx, sy = ship_pos
+    for a in asteroids:
+        ax, ay = a.position
+        dx, dy = ax - sx, ay - sy
+        proj = dx * hx + dy * hy
+        if 0 < proj < check_range:
+            perp = abs(dx * (-hy) + dy * hx)
+            if perp < safety + getattr(a, "radius", 0.0):
+                return False
+    return True
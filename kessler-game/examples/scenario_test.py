@@ -15,6 +15,8 @@ from human_xbox_controller import HumanXboxController
 #SCENARIO = sc.giants_with_kamikaze()
 #SCENARIO = sc.donut_ring_closing()
 #SCENARIO = sc.rotating_cross()
+#SCENARIO = sc.stress_1k()
+#SCENARIO = sc.ffa_8()
 SCENARIO = sc.moving_maze_right()
 
 game_settings = {
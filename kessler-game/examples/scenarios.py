@@ -1,6 +1,6 @@
 # ------------------------------------------------------------
 # kessler-game/examples/scenarios.py
-# Scenario definitions for the asteroid
+# Scenario definitions for the asteroid, shared with neural_fuzzy/scenarios.py
 # Each scenario returns with:
 #  - map_size: (width, height)
 #  - ship_states: list of ships
@@ -11,6 +11,7 @@
 import math
 import random
 from kesslergame import Scenario
+from kesslergame import scenario_generator as gen
 
 
 def _mk_ship(team=1, pos=(400, 400), angle=0, mines=3):
@@ -31,6 +32,33 @@ def _get_asteroid_list(scenario):
         pass
     return []
 
+class _GlobalSeededRandom(random.Random):
+    """
+    Seeded from the module-level random on its first draw, so random.seed(...) still reproduces the layout,
+    while layouts that never draw leave the module-level stream where it was.
+    """
+
+    def __init__(self):
+        self._seeded = False
+        super().__init__(0)
+
+    def _seed_once(self):
+        if not self._seeded:
+            self._seeded = True
+            self.seed(random.getrandbits(64))
+
+    def random(self):
+        self._seed_once()
+        return super().random()
+
+    def getrandbits(self, k):
+        self._seed_once()
+        return super().getrandbits(k)
+
+
+def _scenario_rng(seed=None):
+    return random.Random(seed) if seed is not None else _GlobalSeededRandom()
+
 # ------------------------------------------------------------
 # A general baseline: random asteroids
 # ------------------------------------------------------------
@@ -63,36 +91,20 @@ def vertical_wall_left(map_size=(1000, 800), *,
 
     ship = {'position': (cx, cy), 'angle': 0, 'lives': 3, 'team': 1, 'mines_remaining': 3}
 
-    # Compute evenly spaced Y positions for the wall from top to bottom
-    available_height = H - top_margin - bottom_margin
-    spacing = available_height / max(1, count - 1)
-
-    # All wall asteroids start at the same left X, different Ys
-    x_pos = left_margin
-
-    ast_states = []
-    for i in range(count):
-        y_pos = top_margin + i * spacing
-        ast_states.append({
-            'position': (x_pos, y_pos),
-            'size': int(size_class),
-            'angle': 0.0,
-            'speed': float(wall_speed)
-        })
-
-    return Scenario(
+    # All wall asteroids start at the same left X, evenly spaced from top to bottom
+    return gen.generate_scenario(
         name="Vertical Wall Left (Big Moving Right)",
         map_size=map_size,
-        num_asteroids=0,
-        asteroid_states=ast_states,
+        positions=lambda rng: gen.line_positions(count, (left_margin, top_margin), (left_margin, H - bottom_margin)),
+        velocity=gen.uniform_field(0.0, wall_speed),
+        sizes=gen.fixed_size(size_class),
         ship_states=[ship],
+        seed=None,
         time_limit=time_limit,
-        ammo_limit_multiplier=0,
-        stop_if_no_ammo=False
     )
 
 # ------------------------------------------------------------
-# Still work in progress, Spiral swarm: asteroids moves tangentially
+# Spiral swarm: asteroids move tangentially, faster toward the arm tips
 # ------------------------------------------------------------
 def spiral_arms(map_size=(1200, 900), *, arms=4, per_arm=10,
                  r_min_ratio=0.05, r_max_ratio=0.45,
@@ -106,39 +118,19 @@ def spiral_arms(map_size=(1200, 900), *, arms=4, per_arm=10,
 
     ship = {'position': (W * 0.75, H * 0.5), 'angle': 180, 'lives': 3, 'team': 1, 'mines_remaining': 3}
 
-    ast_states = []
-    total = arms * per_arm
-    for a in range(arms):
-        arm_phase = (2.0 * math.pi / arms) * a
-        for k in range(per_arm):
-            t = k / max(1, (per_arm - 1))
-            r = r_min + t * (r_max - r_min)
-            theta = arm_phase + 4.0 * t * math.pi
-            x = cx + r * math.cos(theta)
-            y = cy + r * math.sin(theta)
-
-            # Tangential heading (theta + 90°)
-            heading_deg = math.degrees(theta + math.pi / 2.0)
-            spd = base_speed + speed_step * k
-            size = int(size_cycle[(a * per_arm + k) % len(size_cycle)])
-
-            ast_states.append({
-                'position': (x, y),
-                'size': size,
-                'angle': float(heading_deg),
-                'speed': float(spd),
-            })
+    # Tangential heading, with the speed stepping up along each arm
+    velocity = [gen.tangential_field((cx, cy), speed=base_speed + speed_step * k)
+                for _ in range(arms) for k in range(per_arm)]
 
-
-    return Scenario(
+    return gen.generate_scenario(
         name="Spiral Swarm",
         map_size=map_size,
-        num_asteroids=0,
-        asteroid_states=ast_states,
+        positions=lambda rng: gen.spiral_positions(arms, per_arm, (cx, cy), r_min, r_max, turns=2.0),
+        velocity=velocity,
+        sizes=gen.size_cycle(size_cycle),
         ship_states=[ship],
+        seed=None,
         time_limit=time_limit,
-        ammo_limit_multiplier=0,
-        stop_if_no_ammo=False
     )
 
 
@@ -154,49 +146,35 @@ def crossing_lanes(map_size=(1200, 900), *,
     cx, cy = W * 0.5, H * 0.5
     ship = {'position': (cx, cy), 'angle': 0, 'lives': 9, 'team': 1, 'mines_remaining': 3}
 
-    ast_states = []
-
-    # Horizontal lanes
-    y_spacing = (H - 2 * lane_margin) / max(1, rows - 1)
-    for r in range(rows):
-        y = lane_margin + r * y_spacing
-
-        # Alternate directions
-        if r % 2 == 0:
-            # left -> right
-            x_positions = [lane_margin + i * ((W - 2 * lane_margin) / max(1, cols - 1)) for i in range(cols)]
-            for x in x_positions:
-                ast_states.append({'position': (x, y), 'size': size_class, 'angle': 0.0, 'speed': lane_speed})
-        else:
-            # right -> left
-            x_positions = [W - lane_margin - i * ((W - 2 * lane_margin) / max(1, cols - 1)) for i in range(cols)]
-            for x in x_positions:
-                ast_states.append({'position': (x, y), 'size': size_class, 'angle': 180.0, 'speed': lane_speed})
-
-    # Vertical lanes
-    x_spacing = (W - 2 * lane_margin) / max(1, cols - 1)
-    for c in range(cols):
-        x = lane_margin + c * x_spacing
-        if c % 2 == 0:
-            # top -> down
-            y_positions = [lane_margin + i * ((H - 2 * lane_margin) / max(1, rows - 1)) for i in range(rows)]
-            for y in y_positions:
-                ast_states.append({'position': (x, y), 'size': size_class, 'angle': 90.0, 'speed': lane_speed})
-        else:
-            # bottom -> up
-            y_positions = [H - lane_margin - i * ((H - 2 * lane_margin) / max(1, rows - 1)) for i in range(rows)]
-            for y in y_positions:
-                ast_states.append({'position': (x, y), 'size': size_class, 'angle': 270.0, 'speed': lane_speed})
-
-    return Scenario(
+    left, right = lane_margin, W - lane_margin
+    top, bottom = lane_margin, H - lane_margin
+    positions, velocity = [], []
+
+    # Horizontal lanes, alternating left -> right and right -> left
+    for r, (_, y) in enumerate(gen.line_positions(rows, (0, top), (0, bottom))):
+        ends, angle = ((left, y), (right, y)), 0.0
+        if r % 2 == 1:
+            ends, angle = ends[::-1], 180.0
+        positions += gen.line_positions(cols, *ends)
+        velocity += [gen.uniform_field(angle, lane_speed)] * cols
+
+    # Vertical lanes, alternating top -> down and bottom -> up
+    for c, (x, _) in enumerate(gen.line_positions(cols, (left, 0), (right, 0))):
+        ends, angle = ((x, top), (x, bottom)), 90.0
+        if c % 2 == 1:
+            ends, angle = ends[::-1], 270.0
+        positions += gen.line_positions(rows, *ends)
+        velocity += [gen.uniform_field(angle, lane_speed)] * rows
+
+    return gen.generate_scenario(
         name="Crossing Lanes",
         map_size=map_size,
-        num_asteroids=0,
-        asteroid_states=ast_states,
+        positions=lambda rng: positions,
+        velocity=velocity,
+        sizes=gen.fixed_size(size_class),
         ship_states=[ship],
+        seed=None,
         time_limit=time_limit,
-        ammo_limit_multiplier=0,
-        stop_if_no_ammo=False
     )
 
 # ------------------------------------------------------------
@@ -212,30 +190,24 @@ def asteroid_rain(map_size=(1000, 800), *,
     # Use only a fraction of the width so edge wrap doesn’t bunch columns too tightly
     usable_w = W * spacing_ratio
     left = (W - usable_w) * 0.5
-    dx = usable_w / max(1, columns - 1)
-
-    # Build columns for several waves
-    ast_states = []
-    for w in range(waves):
-        y0 = top_margin - w * 70.0  # staggered starts
-        for c in range(columns):
-            x = left + c * dx
-            ast_states.append({
-                'position': (x, y0),
-                'size': int(size_class),
-                'angle': 270.0,
-                'speed': float(fall_speed)
-            })
 
-    return Scenario(
+    # One row of columns per wave, with staggered starts
+    def rows(rng):
+        positions = []
+        for w in range(waves):
+            y0 = top_margin - w * 70.0
+            positions += gen.line_positions(columns, (left, y0), (left + usable_w, y0))
+        return positions
+
+    return gen.generate_scenario(
         name="Asteroid Rain",
         map_size=map_size,
-        num_asteroids=0,
-        asteroid_states=ast_states,
+        positions=rows,
+        velocity=gen.uniform_field(270.0, fall_speed),
+        sizes=gen.fixed_size(size_class),
         ship_states=[ship],
+        seed=None,
         time_limit=time_limit,
-        ammo_limit_multiplier=0,
-        stop_if_no_ammo=False
     )
 
 # ------------------------------------------------------------
@@ -250,46 +222,34 @@ def giants_with_kamikaze(map_size=(1200, 900), *,
     cx, cy = W * 0.5, H * 0.5
     ship = {'position': (cx, cy), 'angle': 0, 'lives': 3, 'team': 1, 'mines_remaining': 3}
 
-    # Fixed RNG seed for reproducible sprays around each giant
-    rng = random.Random(1337)
-    ast_states = []
-
     # Giants: big class=3 moving left->right and right->left on alternating rows
-    rows = max(1, giants)
-    y_spacing = H / (rows + 1)
-    for i in range(giants):
-        y = y_spacing * (i + 1)
-        angle = 0.0 if (i % 2 == 0) else 180.0
-        x = W * (0.1 if angle == 0.0 else 0.9)
-        ast_states.append({
-            'position': (x, y),
-            'size': 3,
-            'angle': angle,
-            'speed': float(giant_speed)
-        })
-
-        # Smalls: sprays pointing roughly toward ship
-        for k in range(smalls_per_giant):
-            # spawn around the giant with a little jitter
-            sx = x + rng.uniform(-60, 60)
-            sy = y + rng.uniform(-60, 60)
-            heading = math.degrees(math.atan2(cy - sy, cx - sx)) + rng.uniform(-15, 15)
-            ast_states.append({
-                'position': (sx, sy),
-                'size': 1,
-                'angle': float(heading),
-                'speed': float(small_speed)
-            })
-
-    return Scenario(
+    y_spacing = H / (max(1, giants) + 1)
+    headings = [0.0 if i % 2 == 0 else 180.0 for i in range(giants)]
+    centers = [(W * (0.1 if angle == 0.0 else 0.9), y_spacing * (i + 1)) for i, angle in enumerate(headings)]
+
+    # Each giant is followed by its pack of smalls, jittered around it and aimed roughly at the ship
+    def packs(rng):
+        positions = []
+        for center in centers:
+            positions.append(center)
+            positions += gen.cluster_positions(smalls_per_giant, [center], 60, rng)
+        return positions
+
+    kamikaze = gen.radial_field((cx, cy), small_speed, angle_jitter=15)
+    velocity = []
+    for angle in headings:
+        velocity += [gen.uniform_field(angle, giant_speed)] + [kamikaze] * smalls_per_giant
+
+    return gen.generate_scenario(
         name="Giants with Kamikaze",
         map_size=map_size,
-        num_asteroids=0,
-        asteroid_states=ast_states,
+        positions=packs,
+        velocity=velocity,
+        sizes=gen.size_cycle([3] + [1] * smalls_per_giant),
         ship_states=[ship],
+        seed=None,
+        rng=random.Random(1337),  # Fixed RNG seed for reproducible sprays around each giant
         time_limit=time_limit,
-        ammo_limit_multiplier=0,
-        stop_if_no_ammo=False
     )
 
 # --------------------------------------
@@ -306,51 +266,33 @@ def sniper_practice(map_size=(2000, 1400), *,
     cx, cy = W * 0.5, H * 0.1  # ship near bottom center
     ship = {'position': (cx, cy), 'angle': 90, 'lives': 3, 'team': 1, 'mines_remaining': 3}
 
-    def ring_asteroids(count, radius_ratio, size):
-        r = min(W, H) * radius_ratio
-        return [{
-            'position': (cx + r * math.cos(2 * math.pi * i / count),
-                         cy + r * math.sin(2 * math.pi * i / count)),
-            'size': int(size),
-            'angle': 0.0,
-            'speed': 0.0
-        } for i in range(count)]
-
-    ast_states = []
-    ast_states += ring_asteroids(*near_ring)
-    ast_states += ring_asteroids(*mid_ring)
-    ast_states += ring_asteroids(*far_ring)
+    # Three rings of stationary targets around the ship
+    positions, sizes = [], []
+    for count, radius_ratio, size in (near_ring, mid_ring, far_ring):
+        positions += gen.ring_positions(count, (cx, cy), min(W, H) * radius_ratio)
+        sizes += [int(size)] * count
 
     # Long-range sniper line near top
     cols = max(2, int(top_row_count))
-    left, right = W * 0.10, W * 0.90
-    y_top = H * 0.85
-    for i in range(cols):
-        t = i / (cols - 1)
-        x = left + t * (right - left)
-        ast_states.append({
-            'position': (x, y_top),
-            'size': 1,
-            'angle': 0.0,
-            'speed': 0.0
-        })
+    positions += gen.line_positions(cols, (W * 0.10, H * 0.85), (W * 0.90, H * 0.85))
+    sizes += [1] * cols
 
-    return Scenario(
+    return gen.generate_scenario(
         name="Sniper Practice (Large Arena)",
         map_size=map_size,
-        num_asteroids=0,
-        asteroid_states=ast_states,
+        positions=lambda rng: positions,
+        velocity=gen.static_field(),
+        sizes=gen.size_cycle(sizes),
         ship_states=[ship],
+        seed=None,
         time_limit=time_limit,
-        ammo_limit_multiplier=0,
-        stop_if_no_ammo=False
     )
 
 
 # ------------------------------------
 # Donut shaped ring around the player
 # ------------------------------------
-def donut_ring(map_size=(1000, 800), *, count=24, radius_ratio=0.35, size_class=2, time_limit=60):
+def donut_ring(map_size=(1000, 800), *, count=24, radius_ratio=0.35, size_class=2, time_limit=60, seed=None):
 
     # Takes the map size and splits it into Width and Height 
     W, H = map_size
@@ -365,35 +307,17 @@ def donut_ring(map_size=(1000, 800), *, count=24, radius_ratio=0.35, size_class=
     # The ships's position, angle, lives, mines, and belongs to team 1
     ship = {'position': (cx, cy), 'angle': 0, 'lives': 3, 'team': 1, 'mines_remaining': 3}
 
-    # Starts and empty list that will later hold all asteroid info
-    ast_states = []
-
-    # This loop will run once for each number of asteroid (count)
-    for i in range(count):
-
-        # Calculates the angle for each asteroid around the circle in a full 360 degree circle (2pi radains)
-        theta = 2.0 * math.pi * (i / count)
-        x = cx + r * math.cos(theta)
-        y = cy + r * math.sin(theta)
-
-        # adds asteroid to the list, its postion, size, angle, and speed
-        ast_states.append({
-            'position': (x, y),
-            'size': int(size_class),
-            'angle': 0.0,
-            'speed': 0.0,
-        })
-
-    # Returns scenario name, map size, passes the asteroid list, ship state, how long the round lasted, turns off ammo count
-    return Scenario(
+    # Evenly spaced ring of stationary asteroids around the center
+    return gen.generate_scenario(
         name="Donut Ring",
         map_size=map_size,
-        num_asteroids=0,
-        asteroid_states=ast_states,
+        positions=lambda rng: gen.ring_positions(count, (cx, cy), r),
+        velocity=gen.static_field(),
+        sizes=gen.fixed_size(size_class),
         ship_states=[ship],
+        seed=None,
+        rng=_scenario_rng(seed),
         time_limit=time_limit,
-        ammo_limit_multiplier=0,
-        stop_if_no_ammo=False
     )
 
 # -----------------------------------------------------
@@ -404,42 +328,26 @@ def donut_ring_closing(map_size=(1200, 900), *,
                        start_radius_ratio=0.45,
                        size_class=3,
                        inward_speed=60.0,
-                       time_limit=80):
+                       time_limit=80,
+                       seed=None):
 
     W, H = map_size
     cx, cy = W * 0.5, H * 0.5
 
     ship = {'position': (cx, cy), 'angle': 0, 'lives': 3, 'team': 1, 'mines_remaining': 3}
 
-    # Convert radius ratio to actual pixels
+    # Ring at the start radius, every asteroid heading straight for the center
     r = min(W, H) * start_radius_ratio
-    ast_states = []
-
-    # Build the closing ring
-    for i in range(count):
-        theta = 2.0 * math.pi * (i / count)
-        x = cx + r * math.cos(theta)
-        y = cy + r * math.sin(theta)
-
-        # Heading that points directly toward the center from (x, y)
-        heading_deg = math.degrees(math.atan2(cy - y, cx - x))
-
-        ast_states.append({
-            'position': (x, y),
-            'size': int(size_class),
-            'angle': float(heading_deg),
-            'speed': float(inward_speed)
-        })
-
-    return Scenario(
+    return gen.generate_scenario(
         name="Donut Ring (Closing In, Large Asteroids)",
         map_size=map_size,
-        num_asteroids=0,
-        asteroid_states=ast_states,
+        positions=lambda rng: gen.ring_positions(count, (cx, cy), r),
+        velocity=gen.radial_field((cx, cy), inward_speed),
+        sizes=gen.fixed_size(size_class),
         ship_states=[ship],
+        seed=None,
+        rng=_scenario_rng(seed),
         time_limit=time_limit,
-        ammo_limit_multiplier=0,
-        stop_if_no_ammo=False
     )
 
 # ----------------------------------------------------------------
@@ -458,62 +366,37 @@ def rotating_cross(map_size=(1400, 1000), *,
     # Player far left
     ship = {'position': (W * 0.10, cy), 'angle': 0, 'lives': 3, 'team': 1, 'mines_remaining': 3}
 
-    ast_states = []
-
-    # Angular speed in radians/sec; sign controls direction
-    omega = math.radians(omega_deg_per_s) * (-1.0 if clockwise else 1.0)
-
-    # Compute maximum extents from center to each edge along cardinal directions
-    r_right = W - cx     # center to right edge along +X
-    r_left  = cx         # center to left edge  along -X
-    r_up    = cy         # center to top edge   along -Y
-    r_down  = H - cy     # center to bottom edge along +Y
-
     # Lines defined by base angle and max radius to edge in that direction
     arms = [
-        (0.0,              r_right),  # right
-        (math.pi,          r_left),   # left
-        (math.pi / 2.0,    r_down),   # down (screen y+)
-        (3.0 * math.pi/2., r_up),     # up   (screen y-)
+        (0.0,              W - cx),  # right
+        (math.pi,          cx),      # left
+        (math.pi / 2.0,    H - cy),  # down (screen y+)
+        (3.0 * math.pi/2., cy),      # up   (screen y-)
     ]
 
-    # Build each arm from center (r=0) to the specific edge radius
+    # Each arm runs from the center (r=0) to the edge in its direction
+    positions = []
     for phi, r_max in arms:
-        for i in range(arm_density + 1):
-            t = i / max(1, arm_density)
-            r = t * r_max
+        positions += gen.line_positions(arm_density + 1, (cx, cy), (cx + r_max * math.cos(phi), cy + r_max * math.sin(phi)))
 
-            # Position along the line
-            x = cx + r * math.cos(phi)
-            y = cy + r * math.sin(phi)
+    # Tangential speed so all radii share the same angular rate, except the outermost tip at the edge,
+    # slowed down to keep it attached
+    spin = gen.tangential_field((cx, cy), angular_speed_deg=omega_deg_per_s, clockwise=clockwise)
+    tip = gen.tangential_field((cx, cy), angular_speed_deg=omega_deg_per_s * tip_speed_scale, clockwise=clockwise)
+    velocity = ([spin] * arm_density + [tip]) * len(arms)
 
-            # Tangent direction = line angle ± 90°
-            heading = phi + (math.pi / 2.0) * (-1.0 if clockwise else 1.0)
-            heading_deg = float(math.degrees(heading))
+    # Sizes restart the cycle on every arm
+    sizes = [size_cycle[i % len(size_cycle)] for i in range(arm_density + 1)]
 
-            # Tangential speed so all radis share the same angular rate
-            v = abs(omega) * r
-
-            # For the outermost tip at the edge, slow speed to keep it attached
-            if i == arm_density:
-                v *= float(tip_speed_scale)
-
-            ast_states.append({
-                'position': (x, y),
-                'size': int(size_cycle[i % len(size_cycle)]),
-                'angle': heading_deg,
-                'speed': float(v)
-            })
-
-    return Scenario(
+    return gen.generate_scenario(
         name=f"Cross (Rotating Look, {'CW' if clockwise else 'CCW'})",
         map_size=map_size,
-        num_asteroids=0,
-        asteroid_states=ast_states,
+        positions=lambda rng: positions,
+        velocity=velocity,
+        sizes=gen.size_cycle(sizes),
         ship_states=[ship],
-        time_limit=time_limit, 
-        ammo_limit_multiplier=0,
-        stop_if_no_ammo=False
+        seed=None,
+        time_limit=time_limit,
     )
 
 
@@ -539,7 +422,6 @@ def moving_maze_right(map_size=(1800, 1000), *,
     - size_cycle: mix rock sizes for visual walls
     """
     W, H = map_size
-    cx, cy = W * 0.5, H * 0.5
 
     # Ship starts near left edge inside the corridor, pointing right
     ship = {'position': (W * 0.10, H * 0.50), 'angle': 0, 'lives': 99, 'team': 1, 'mines_remaining': 3}
@@ -552,42 +434,93 @@ def moving_maze_right(map_size=(1800, 1000), *,
         # sine that completes `waves` wiggles from left to right
         return H * 0.5 + A * math.sin(2.0 * math.pi * waves * (x / max(1.0, W)))
 
-    # Build a grid of candidate asteroid positions, skip any that fall inside the corridor
-    usable_w = W - 2 * margin
-    usable_h = H - 2 * margin
-    dx = usable_w / max(1, cols - 1)
-    dy = usable_h / max(1, rows - 1)
-
-    ast_states = []
-    idx = 0
-    for r in range(rows):
-        y = margin + r * dy
-        for c in range(cols):
-            x = margin + c * dx
+    # A grid of candidate asteroid positions, skipping any that fall inside the corridor
+    dx = (W - 2 * margin) / max(1, cols - 1)
 
+    def maze(rng):
+        positions = []
+        for i, (x, y) in enumerate(gen.grid_positions(rows, cols, map_size, margin)):
             # Keep a gap where the safe corridor runs
-            y_c = corridor_center_y(x)
-            if abs(y - y_c) <= corridor_half:
-                continue  # leave space for the tunnel
+            if abs(y - corridor_center_y(x)) <= corridor_half:
+                continue
 
             # Stagger every other row a bit for a tighter maze feel
-            x_spawn = x + (dx * 0.35 if (r % 2 == 1) else 0.0)
+            positions.append((x + (dx * 0.35 if (i // cols) % 2 == 1 else 0.0), y))
+        return positions
 
-            ast_states.append({
-                'position': (x_spawn, y),
-                'size': int(size_cycle[idx % len(size_cycle)]),
-                'angle': 0.0,           # move to the right
-                'speed': float(speed)
-            })
-            idx += 1
-
-    return Scenario(
+    return gen.generate_scenario(
         name="Moving Maze (Rightward Tunnel)",
         map_size=map_size,
-        num_asteroids=0,
-        asteroid_states=ast_states,
+        positions=maze,
+        velocity=gen.uniform_field(0.0, speed),
+        sizes=gen.size_cycle(size_cycle),
         ship_states=[ship],
+        seed=None,
         time_limit=time_limit,
-        ammo_limit_multiplier=0,
-        stop_if_no_ammo=False
-    )
\ No newline at end of file
+    )
+
+# ----------------------------------------------------------------
+# Four corner assault: a cluster in each corner closing on the ship
+# ----------------------------------------------------------------
+def four_corner(map_size=(1200, 900), *,
+                cluster_size=10,
+                corner_margin=80,
+                size_class=2,
+                speed=0.0,
+                time_limit=70,
+                seed=None):
+
+    W, H = map_size
+    cx, cy = W * 0.5, H * 0.5
+
+    ship = {
+        'position': (cx, cy),
+        'angle': 0,
+        'lives': 3,
+        'team': 1,
+        'mines_remaining': 0
+    }
+
+    # Corner spawn positions
+    corners = [
+        (corner_margin, corner_margin),               # Top-left
+        (W - corner_margin, corner_margin),           # Top-right
+        (corner_margin, H - corner_margin),           # Bottom-left
+        (W - corner_margin, H - corner_margin)        # Bottom-right
+    ]
+
+    # Random clusters in each corner, aimed at the center
+    return gen.generate_scenario(
+        name="Four Corner Assault",
+        map_size=map_size,
+        positions=lambda rng: gen.cluster_positions(cluster_size, corners, 40, rng),
+        velocity=gen.radial_field((cx, cy), speed),
+        sizes=gen.fixed_size(size_class),
+        ship_states=[ship],
+        seed=None,
+        rng=_scenario_rng(seed),
+        time_limit=time_limit,
+    )
+
+
+# ----------------------------------------------------------------
+# Stress presets from kesslergame.scenario_generator, for load tests
+# ----------------------------------------------------------------
+def stress_1k(seed=0):
+    return gen.preset("stress_1k", seed=seed)
+
+
+def stress_5k(seed=0):
+    return gen.preset("stress_5k", seed=seed)
+
+
+def stress_20k(seed=0):
+    return gen.preset("stress_20k", seed=seed)
+
+
+def ffa_8(seed=0):
+    return gen.preset("ffa_8", seed=seed)
+
+
+def ffa_32(seed=0):
+    return gen.preset("ffa_32", seed=seed)
@@ -28,6 +28,10 @@ def trap(x, a, b, c, d):# trapezoidal membership function
 def wrap180(d):
     return (d + 180.0) % 360.0 - 180.0
 
+# direction from point a to point b, in degrees like the ship heading (0 = +x, counterclockwise)
+def angle_between(a, b):
+    return math.degrees(math.atan2(b[1] - a[1], b[0] - a[0]))
+
 
 
 
@@ -0,0 +1,61 @@
+import argparse, os, time
+import numpy as np
+import torch
+
+from nf_infer import NFPolicy
+
+"""
+Per-frame latency of NFController's policy evaluation with batch size 1:
+the torch path (fill a tensor, act_maneuver_tensor + act_combat_tensor) against the frozen
+NumPy path (fill an array, FrozenPolicy.act_maneuver + act_combat).
+
+    python bench_nf_policy.py
+    python bench_nf_policy.py --frames 20000 --threads 1
+"""
+
+
+def time_per_call(fn, inputs):
+    for x in inputs[:100]:  # warm-up
+        fn(x)
+    start = time.perf_counter()
+    for x in inputs:
+        fn(x)
+    return (time.perf_counter() - start) / len(inputs) * 1e6
+
+
+if __name__ == "__main__":
+    arguments = argparse.ArgumentParser()
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    arguments.add_argument("--maneuver", default=os.path.join(base_dir, "models", "maneuver.pt"))
+    arguments.add_argument("--combat", default=os.path.join(base_dir, "models", "combat.pt"))
+    arguments.add_argument("--frames", type=int, default=5000)
+    arguments.add_argument("--threads", type=int, default=None, help="torch.set_num_threads, default: torch's choice")
+    args = arguments.parse_args()
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    maneuver = NFPolicy(args.maneuver, device="cpu")
+    combat = NFPolicy(args.combat, device="cpu")
+    frozen_maneuver, frozen_combat = maneuver.freeze(), combat.freeze()
+
+    rng = np.random.default_rng(0)
+    n = len(maneuver.feature_cols)
+    contexts = [[float(v) for v in row] for row in rng.normal(size=(args.frames, n)) * 100.0]
+
+    buffer = torch.zeros((1, n))
+    def torch_path(ctx):
+        for i, v in enumerate(ctx):
+            buffer[0, i] = v
+        return maneuver.act_maneuver_tensor(buffer) + combat.act_combat_tensor(buffer, thresh=0.5)
+
+    array = np.empty(n)
+    def frozen_path(ctx):
+        array[:] = ctx
+        return frozen_maneuver.act_maneuver(array) + frozen_combat.act_combat(array, thresh=0.5)
+
+    mismatches = sum(np.abs(np.subtract(torch_path(c), frozen_path(c), dtype=float)).max() > 1e-3 for c in contexts)
+    t_torch = time_per_call(torch_path, contexts)
+    t_frozen = time_per_call(frozen_path, contexts)
+    print(f"torch path:  {t_torch:8.1f} us/frame")
+    print(f"frozen path: {t_frozen:8.1f} us/frame  ({t_torch / t_frozen:.1f}x faster)")
+    print(f"actions differing by more than 1e-3: {mismatches}/{len(contexts)}")
@@ -0,0 +1,69 @@
+import argparse, json, resource, subprocess, sys, time
+import torch
+
+from sugeno_nn import SugenoNet
+
+"""
+CPU benchmark of SugenoNet rule strengths: the original product path (log_space=False) against
+the fused log-space path (log_space=True).
+
+Each case runs in a fresh subprocess so peak memory (ru_maxrss growth over the model setup) is
+per case. Step time is one forward + backward + Adam step, median over --steps.
+
+    python bench_rule_layer.py
+    python bench_rule_layer.py --batches 64 1024 --configs 6x3 8x3 --rule_base grid
+"""
+
+
+def run_case(num_inputs, num_mfs, batch, log_space, rule_base, steps):
+    torch.manual_seed(0)
+    torch.set_num_threads(1)
+    model = SugenoNet(num_inputs, num_mfs, 1, rule_base=rule_base, log_space=log_space)
+    opt = torch.optim.Adam(model.parameters(), lr=0.01)
+    x = torch.randn(batch, num_inputs)
+    y = torch.randn(batch)
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    times = []
+    for _ in range(steps + 2):
+        start = time.perf_counter()
+        loss = ((model(x).squeeze(1) - y) ** 2).mean()
+        opt.zero_grad()
+        loss.backward()
+        opt.step()
+        times.append(time.perf_counter() - start)
+    times = sorted(times[2:])  # drop warm-up steps
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base_rss
+    return {"step_ms": 1000 * times[len(times) // 2], "peak_mb": peak_kb / 1024, "rules": model.num_rules,
+            "finite": bool(torch.isfinite(loss).item())}
+
+
+if __name__ == "__main__":
+    arguments = argparse.ArgumentParser()
+    arguments.add_argument("--batches", type=int, nargs="+", default=[64, 512, 4096])
+    arguments.add_argument("--configs", nargs="+", default=["4x3", "6x3", "8x3"], help="inputs x MFs")
+    arguments.add_argument("--rule_base", choices=["grid", "sparse", "hierarchical"], default="grid")
+    arguments.add_argument("--steps", type=int, default=10)
+    arguments.add_argument("--case", default=None, help=argparse.SUPPRESS)  # internal: run one case, print JSON
+    args = arguments.parse_args()
+
+    if args.case:
+        n, m, b, log_space = json.loads(args.case)
+        print(json.dumps(run_case(n, m, b, log_space, args.rule_base, args.steps)))
+        sys.exit(0)
+
+    print(f"{'inputs x mfs':>12} {'rules':>6} {'batch':>6} | {'product ms':>10} {'MB':>7} | {'log ms':>8} {'MB':>7} | speedup")
+    for config in args.configs:
+        n, m = (int(v) for v in config.split("x"))
+        for b in args.batches:
+            results = {}
+            for log_space in (False, True):
+                out = subprocess.run([sys.executable, __file__, "--case", json.dumps([n, m, b, log_space]),
+                                      "--rule_base", args.rule_base, "--steps", str(args.steps)],
+                                     capture_output=True, text=True, check=True)
+                results[log_space] = json.loads(out.stdout.strip().splitlines()[-1])
+            lin, log = results[False], results[True]
+            flag = "" if lin["finite"] else "  (product path not finite)"
+            print(f"{config:>12} {lin['rules']:>6} {b:>6} | {lin['step_ms']:>10.2f} {lin['peak_mb']:>7.1f} | "
+                  f"{log['step_ms']:>8.2f} {log['peak_mb']:>7.1f} | {lin['step_ms'] / log['step_ms']:.2f}x{flag}")
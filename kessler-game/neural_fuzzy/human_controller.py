@@ -3,33 +3,18 @@
 
 from data_log import Logger, FEATURES
 from util import wrap180, triag, intercept_point
+from perception import perceive
 import math
 from kesslergame import KesslerController
 from pynput import keyboard, mouse
 
-def find_closest_threat(asteroids, ship_pos):
-    closest_dist = float('inf')
-    closest_asteroid = None
-    
-    for asteroid in asteroids:
-        ax, ay = asteroid.position
-        distance = math.hypot(ax - ship_pos[0], ay - ship_pos[1])
-        if distance < closest_dist:
-            closest_dist = distance
-            closest_asteroid = asteroid
-    
-    return closest_asteroid, closest_dist
-
-
-
 def calculate_context(ship_state, game_state):
     #used for BOTH human logging and NF controller.
 
-    sx, sy = ship_state.position
     heading = getattr(ship_state, "heading", getattr(ship_state, "angle", 0.0))
 
-    asteroids = getattr(game_state, "asteroids", [])
-    if not asteroids:
+    p = perceive(ship_state, game_state)
+    if not p.num_asteroids:
         return {
             "dist": 0.0,
             "ttc": 0.0,
@@ -41,21 +26,19 @@ def calculate_context(ship_state, game_state):
             "threat_angle": 0.0,
         }
 
-    closest, dist = find_closest_threat(asteroids, (sx, sy))  # find closest asteroid
-    ax, ay = closest.position
-    avx, avy = getattr(closest, "velocity", (0.0, 0.0))
-    svx, svy = getattr(ship_state, "velocity", (0.0, 0.0))
+    i = p.closest_index  # closest asteroid
+    dist = float(p.dist[i])
+    dx, dy = float(p.rel[i, 0]), float(p.rel[i, 1])
 
-    rel_vx, rel_vy = avx - svx, avy - svy
-    approach_speed = (rel_vx * (ax - sx) + rel_vy * (ay - sy)) / max(dist, 1.0)
+    approach_speed = float(p.range_rate[i])
 
     ttc = dist / max(abs(approach_speed), 1e-6)
 
     # Same as you used during logging: everything in degrees, wrapped with wrap180
-    threat_angle_deg = math.degrees(math.atan2(ay - sy, ax - sx))
+    threat_angle_deg = math.degrees(math.atan2(dy, dx))
     heading_err = wrap180(threat_angle_deg - heading)
 
-    density = len(asteroids) / 10.0
+    density = p.num_asteroids / 10.0
 
     return {
         "dist": dist,
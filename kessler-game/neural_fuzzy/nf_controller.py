@@ -1,30 +1,17 @@
 import os
 import math
 from util import wrap180
+from perception import perceive
 from nf_infer import NFPolicy
+import numpy as np
 import torch
 from data_log import Logger, FEATURES, TARGET
 
 
-def find_closest_threat(asteroids, ship_pos):
-    closest_dist = float('inf')
-    closest_asteroid = None
-    
-    for asteroid in asteroids:
-        ax, ay = asteroid.position
-        distance = math.hypot(ax - ship_pos[0], ay - ship_pos[1])
-        if distance < closest_dist:
-            closest_dist = distance
-            closest_asteroid = asteroid
-    
-    return closest_asteroid, closest_dist
-
-
 def calculate_context(ship_state, game_state):
-    sx, sy = ship_state.position
     heading = ship_state.heading
-    asteroids = getattr(game_state, "asteroids", [])
-    if not asteroids:
+    p = perceive(ship_state, game_state)  # shared with anything else looking at this ship this frame
+    if not p.num_asteroids:
         return {
             "dist": 1000.0,
             "ttc": 100.0,
@@ -36,16 +23,14 @@ def calculate_context(ship_state, game_state):
             "threat_angle": 0.0
         }
 
-    closest, dist = find_closest_threat(asteroids, (sx, sy))
-    ax, ay = closest.position
-    avx, avy = getattr(closest, "velocity", (0.0, 0.0))
-    svx, svy = getattr(ship_state, "velocity", (0.0, 0.0))
-    rel_vx, rel_vy = avx - svx, avy - svy
-    approach_speed = (rel_vx * (ax - sx) + rel_vy * (ay - sy)) / max(dist, 1)
+    i = p.closest_index
+    dist = float(p.dist[i])
+    dx, dy = float(p.rel[i, 0]), float(p.rel[i, 1])
+    approach_speed = float(p.range_rate[i])
 
     ttc = dist / max(abs(approach_speed), 1e-6)
-    heading_err = wrap180(math.degrees(math.atan2(ay - sy, ax - sx)) - heading)
-    density = len(asteroids) / 10.0
+    heading_err = wrap180(math.degrees(math.atan2(dy, dx)) - heading)
+    density = p.num_asteroids / 10.0
 
     return {
         "dist": dist,
@@ -55,56 +40,185 @@ def calculate_context(ship_state, game_state):
         "ammo": getattr(ship_state, "ammo", 0),
         "mines": getattr(ship_state, "mines", 0),
         "threat_density": density,
-        "threat_angle": math.degrees(math.atan2(ay - sy, ax - sx))
+        "threat_angle": math.degrees(math.atan2(dy, dx))
     }
 
 
+def load_policies(frozen=True, model_paths=None):
+    """
+    Load the NF bundles from models/: a joint bundle (all.pt) if there is one, else maneuver.pt and combat.pt.
+    model_paths ({"all"|"maneuver"|"combat": path}) swaps in other bundles, e.g. sweep candidates; with it,
+    models/all.pt is only used if given. Returns (torch policies, evaluators, feature names); evaluators
+    are the frozen NumPy copies when frozen.
+    """
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    model_dir = os.path.join(base_dir, "models")
+    paths = {"maneuver": os.path.join(model_dir, "maneuver.pt"),
+             "combat": os.path.join(model_dir, "combat.pt"),
+             "all": os.path.join(model_dir, "all.pt") if not model_paths else None}
+    paths.update(model_paths or {})
+    maneuver_path, combat_path, joint_path = paths["maneuver"], paths["combat"], paths["all"]
+
+    # Frozen evaluation is CPU-only, so don't put the bundles on a GPU just to copy them back
+    device = "cpu" if frozen else None
+
+    # A joint bundle (nf_train --task all) gives all four actions from one forward pass
+    joint_nf = NFPolicy(joint_path, device) if joint_path and os.path.exists(joint_path) else None
+    maneuver_nf = joint_nf or NFPolicy(maneuver_path, device)
+
+    combat_nf = None
+    if joint_nf is None:
+        if os.path.exists(combat_path):
+            combat_nf = NFPolicy(combat_path, device)
+        else:
+            print("Combat model not found. Combat disabled.")
+
+    feature_names = maneuver_nf.feature_cols or [
+        "dist","ttc","heading_err","approach_speed",
+        "ammo","mines","threat_density","threat_angle"
+    ]
+    policies = (joint_nf, maneuver_nf, combat_nf)
+    evaluators = [p.freeze() if frozen else p for p in (joint_nf or maneuver_nf, combat_nf) if p is not None]
+    return policies, evaluators, feature_names
+
+
+def act_batch(evaluators, X, thresh=0.5):
+    #(thrust, turn_rate, fire, drop_mine) per row of X, one forward per net for all rows
+    if len(evaluators) == 1:  # joint bundle, or maneuver only
+        return evaluators[0].act_batch(X, thresh=thresh)
+    maneuver = evaluators[0].act_maneuver_batch(X)
+    combat = evaluators[1].act_combat_batch(X, thresh=thresh)
+    return [m + c for m, c in zip(maneuver, combat)]
+
+
+def clamp_to_ship(ship_state, thrust, turn_rate):
+    if hasattr(ship_state, "thrust_range"):
+        lo, hi = ship_state.thrust_range
+        thrust = max(lo, min(hi, thrust))
+    if hasattr(ship_state, "turn_rate_range"):
+        lo, hi = ship_state.turn_rate_range
+        turn_rate = max(lo, min(hi, turn_rate))
+    return thrust, turn_rate
+
+
+def _log_path():
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "model_out.csv")
+
+
 class NFController:
     name = "NFController"
-    def __init__(self):
+    def __init__(self, frozen=True, model_paths=None, log=True):
+        #frozen: evaluate with the NumPy export of the bundles (nf_frozen.py) instead of torch, much lower per-frame latency
+        #model_paths: other bundles than models/*.pt (see load_policies); log=False skips data/model_out.csv
         self.input_buffer = None
 
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        model_dir = os.path.join(base_dir, "models")
-        maneuver_path = os.path.join(model_dir, "maneuver.pt")
-        combat_path   = os.path.join(model_dir, "combat.pt")
+        self.logger = Logger(_log_path(), FEATURES, TARGET) if log else None
+        (self.joint_nf, self.maneuver_nf, self.combat_nf), evaluators, self.feature_names = load_policies(frozen, model_paths)
 
-        log_path = os.path.join(base_dir, "data", "model_out.csv")
-        self.logger = Logger(log_path, FEATURES, TARGET)
-        self.maneuver_nf = NFPolicy(maneuver_path)
+        self.frozen = None
+        if frozen:
+            self.frozen = evaluators
+            self.input_buffer = np.empty(len(self.feature_names))
 
-        self.combat_nf = None
-        if os.path.exists(combat_path):
-            self.combat_nf = NFPolicy(combat_path)
+    def actions(self, ship_state, game_state):
+        ctx = calculate_context(ship_state, game_state)
+        if self.frozen is not None:
+            thrust, turn_rate, fire, drop_mine = self._frozen_actions(ctx)
         else:
-            print("Combat model not found. Combat disabled.")
+            thrust, turn_rate, fire, drop_mine = self._torch_actions(ctx)
 
-        self.feature_names = self.maneuver_nf.feature_cols or [
-            "dist","ttc","heading_err","approach_speed",
-            "ammo","mines","threat_density","threat_angle"
-        ]
+        if self.logger is not None:
+            self.logger.log(ctx, [thrust, turn_rate])
 
-    def actions(self, ship_state, game_state):
-        ctx = calculate_context(ship_state, game_state)
+        thrust, turn_rate = clamp_to_ship(ship_state, thrust, turn_rate)
+        return thrust, turn_rate, fire, drop_mine
+
+    def _frozen_actions(self, ctx):
+        x = self.input_buffer
+        for i, k in enumerate(self.feature_names):
+            x[i] = ctx[k]
+        if len(self.frozen) == 1:  # joint bundle, or maneuver only
+            thrust, turn_rate, fire, drop_mine = self.frozen[0].act(x, thresh=0.5)
+        else:
+            thrust, turn_rate = self.frozen[0].act_maneuver(x)
+            fire, drop_mine = self.frozen[1].act_combat(x, thresh=0.5)
+        return thrust, turn_rate, fire, drop_mine
+
+    def _torch_actions(self, ctx):
         if self.input_buffer is None:
             device = self.maneuver_nf.device
             self.input_buffer = torch.zeros((1, len(self.feature_names)), device=device)
         for i, k in enumerate(self.feature_names):
             self.input_buffer[0, i] = float(ctx[k])
-        thrust, turn_rate = self.maneuver_nf.act_maneuver_tensor(self.input_buffer)
-
-        if self.combat_nf is not None:
-            fire, drop_mine = self.combat_nf.act_combat_tensor(self.input_buffer, thresh=0.5)
+        if self.joint_nf is not None:
+            thrust, turn_rate, fire, drop_mine = self.joint_nf.act_tensor(self.input_buffer, thresh=0.5)
         else:
-            fire, drop_mine = False, False
+            thrust, turn_rate = self.maneuver_nf.act_maneuver_tensor(self.input_buffer)
+
+            if self.combat_nf is not None:
+                fire, drop_mine = self.combat_nf.act_combat_tensor(self.input_buffer, thresh=0.5)
+            else:
+                fire, drop_mine = False, False
+        return thrust, turn_rate, fire, drop_mine
+
+
+class NFFleet:
+    """
+    One set of NF models driving several ships in the same game. The game asks each ship's controller
+    in turn, so the first controller called in a frame builds the context of every fleet ship from
+    game_state.ships and evaluates them all as one batch; the rest just read their row.
+
+        fleet = NFFleet()
+        controllers = [fleet.controller() for _ in range(num_ships)]
+    """
+
+    def __init__(self, frozen=True, thresh=0.5, model_paths=None, log=True):
+        self.logger = Logger(_log_path(), FEATURES, TARGET) if log else None
+        _, self.evaluators, self.feature_names = load_policies(frozen, model_paths)
+        self.thresh = thresh
+        self.members = []
+        self._frame = None
+        self._actions = {}
+
+    def controller(self):
+        member = NFFleetShip(self)
+        self.members.append(member)
+        return member
+
+    def _evaluate(self, ctxs):
+        X = np.array([[ctx[k] for k in self.feature_names] for ctx in ctxs], dtype=np.float64)
+        return act_batch(self.evaluators, X, self.thresh)
+
+    def _step(self, game_state):
+        self._frame = game_state.frame
+        ids = {m.ship_id for m in self.members}
+        ships = [s for s in game_state.ships if s.id in ids]
+        ctxs = [calculate_context(s, game_state) for s in ships]
+        actions = self._evaluate(ctxs) if ctxs else []
+        self._actions = {s.id: (ctx, a) for s, ctx, a in zip(ships, ctxs, actions)}
+
+    def act(self, ship_state, game_state):
+        if game_state.frame != self._frame:
+            self._step(game_state)
+        cached = self._actions.pop(ship_state.id, None)
+        if cached is None:  # not in game_state.ships this frame, evaluate on its own
+            ctx = calculate_context(ship_state, game_state)
+            cached = (ctx, self._evaluate([ctx])[0])
+        ctx, (thrust, turn_rate, fire, drop_mine) = cached
+
+        if self.logger is not None:
+            self.logger.log(ctx, [thrust, turn_rate])
+
+        thrust, turn_rate = clamp_to_ship(ship_state, thrust, turn_rate)
+        return thrust, turn_rate, fire, drop_mine
+
+
+class NFFleetShip:
+    name = "NFFleetShip"
+
+    def __init__(self, fleet):
+        self.fleet = fleet
+        self.ship_id = 0
 
-        self.logger.log(ctx, [thrust, turn_rate])
-
-        if hasattr(ship_state, "thrust_range"):
-            lo, hi = ship_state.thrust_range
-            thrust = max(lo, min(hi, thrust))
-        if hasattr(ship_state, "turn_rate_range"):
-            lo, hi = ship_state.turn_rate_range
-            turn_rate = max(lo, min(hi, turn_rate))
-
-        return thrust, turn_rate, fire, drop_mine
\ No newline at end of file
+    def actions(self, ship_state, game_state):
+        return self.fleet.act(ship_state, game_state)
@@ -0,0 +1,434 @@
+import argparse, csv, glob, json, os, re
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+"""
+Columnar store for demonstration data (human sessions, controller logs).
+
+Layout of a store directory:
+    meta.json           columns, chunk list, per-session metadata
+    chunk_000000.npy    float32 (rows, columns) block, features then targets
+    chunk_000001.npy    ...
+
+Each source file (a player_*_maneuver.csv, a Logger .npy chunk dir, ...) is one session
+and becomes one or more chunks of at most chunk_rows rows, so chunks never mix sessions.
+Chunks are opened with mmap_mode='r', so reading a batch only pages in that chunk.
+
+Usage:
+    python nf_dataset.py ingest --store data/maneuver_store ../examples/data_human/*_maneuver.csv
+    python nf_dataset.py info --store data/maneuver_store
+
+    store = DatasetStore("data/maneuver_store")
+    stats = store.stats(subset="train")
+    for X, Y in store.batches(batch_size=64, mu=stats.mean, sd=stats.std, subset="train"):
+        ...
+
+RunningStats keeps per-feature count/mean/M2 (Welford, merged with Chan's parallel formula),
+min/max and a fixed-size uniform row sample for quantiles. Stats of separate chunks or worker
+processes merge exactly for the moments, so nothing ever needs the whole dataset in memory.
+"""
+
+TARGET_SETS = {
+    "maneuver": ["thrust", "turn_rate"],
+    "combat": ["fire", "drop_mine"],
+}
+
+# Columns that describe the session rather than the sample; kept in meta.json, not in the chunks
+META_COLUMNS = {"session_id", "scenario"}
+
+META_FILE = "meta.json"
+SESSION_RE = re.compile(r"(\d{8}-\d{6})")
+
+
+def task_for_columns(columns):
+    for task, targets in TARGET_SETS.items():
+        if all(t in columns for t in targets):
+            return task
+    raise ValueError(f"Can't tell the task from columns {columns}, expected one of {TARGET_SETS}")
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan  # blank cells (missing features) become NaN
+
+
+def _read_csv(path, chunk_rows, skip=0):
+    #Yields (columns, meta values of the first row, float32 block) without loading the whole file
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        keep = [i for i, c in enumerate(header) if c not in META_COLUMNS]
+        meta_idx = {c: i for i, c in enumerate(header) if c in META_COLUMNS}
+        columns = [header[i] for i in keep]
+        block = np.empty((chunk_rows, len(keep)), dtype=np.float32)
+        n = 0
+        meta = None
+        for row in reader:
+            if not row:
+                continue
+            if meta is None:
+                meta = {c: row[i] for c, i in meta_idx.items() if i < len(row)}
+            if skip:
+                skip -= 1
+                continue
+            block[n] = [_to_float(row[i]) if i < len(row) else np.nan for i in keep]
+            n += 1
+            if n == chunk_rows:
+                yield columns, meta, block
+                block = np.empty_like(block)
+                n = 0
+        if n:
+            yield columns, meta or {}, block[:n]
+
+
+def _read_npy_dir(path, chunk_rows, skip=0):
+    #Structured-array chunks written by data_log.Logger(formats="npy")
+    for chunk_path in sorted(glob.glob(os.path.join(path, "chunk_*.npy"))):
+        arr = np.load(chunk_path)
+        columns = [c for c in arr.dtype.names if c not in META_COLUMNS]
+        meta = {c: str(arr[c][0]) for c in arr.dtype.names if c in META_COLUMNS and len(arr)}
+        if skip >= len(arr):
+            skip -= len(arr)
+            continue
+        block = np.stack([arr[c].astype(np.float32) for c in columns], axis=1)[skip:]
+        skip = 0
+        for start in range(0, len(block), chunk_rows):
+            yield columns, meta, block[start:start + chunk_rows]
+
+
+QUANTILES = [0.001, 0.005, 0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99, 0.995, 0.999]
+
+
+class RunningStats:
+    def __init__(self, num_features, sample_size=65536, seed=0):
+        self.num_features = num_features
+        self.sample_size = sample_size
+        self.n = np.zeros(num_features)          # per feature, NaNs (missing values) are not counted
+        self.mean = np.zeros(num_features)
+        self.m2 = np.zeros(num_features)         # sum of squared deviations from the mean
+        self.min = np.full(num_features, np.inf)
+        self.max = np.full(num_features, -np.inf)
+        # Bottom-k sample: every row gets a uniform random key and the k smallest keys are kept,
+        # which stays a uniform sample when two samples are merged
+        self.sample_keys = np.empty(0)
+        self.sample = np.empty((0, num_features), dtype=np.float32)
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if len(X) == 0:
+            return self
+        valid = ~np.isnan(X)
+        n_b = valid.sum(axis=0).astype(np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_b = np.where(n_b > 0, np.nansum(X, axis=0) / np.maximum(n_b, 1), 0.0)
+        m2_b = np.nansum((X - mean_b) ** 2, axis=0)
+        self._merge_moments(n_b, mean_b, m2_b)
+        if valid.any():
+            self.min = np.fmin(self.min, np.nanmin(np.where(valid, X, np.inf), axis=0))
+            self.max = np.fmax(self.max, np.nanmax(np.where(valid, X, -np.inf), axis=0))
+        self._merge_sample(self._rng.random(len(X)), X.astype(np.float32))
+        return self
+
+    def _merge_moments(self, n_b, mean_b, m2_b):
+        # Chan et al.: combine (n, mean, M2) of two disjoint sets
+        n = self.n + n_b
+        safe_n = np.where(n > 0, n, 1.0)
+        delta = mean_b - self.mean
+        self.mean = self.mean + delta * n_b / safe_n
+        self.m2 = self.m2 + m2_b + delta ** 2 * self.n * n_b / safe_n
+        self.n = n
+
+    def _merge_sample(self, keys, rows):
+        keys = np.concatenate([self.sample_keys, keys])
+        rows = np.concatenate([self.sample, rows])
+        if len(keys) > self.sample_size:
+            keep = np.argpartition(keys, self.sample_size)[:self.sample_size]
+            keys, rows = keys[keep], rows[keep]
+        self.sample_keys, self.sample = keys, rows
+
+    def merge(self, other):
+        self._merge_moments(other.n, other.mean, other.m2)
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+        self._merge_sample(other.sample_keys, other.sample)
+        return self
+
+    @property
+    def count(self):
+        return int(self.n.max()) if self.num_features else 0
+
+    @property
+    def var(self):
+        return self.m2 / np.where(self.n > 0, self.n, 1.0)  # population variance, like X.std()
+
+    @property
+    def std(self):
+        return np.sqrt(self.var)
+
+    def quantiles(self, qs=QUANTILES):
+        #(len(qs), F), estimated from the row sample
+        if len(self.sample) == 0:
+            return np.full((len(qs), self.num_features), np.nan)
+        return np.nanquantile(self.sample.astype(np.float64), qs, axis=0)
+
+    def clip_range(self, lo=0.005, hi=0.995):
+        #Per-feature [lo, hi] quantiles, used to clip outliers before normalizing
+        q = self.quantiles([lo, hi])
+        return q[0], q[1]
+
+    def to_dict(self, qs=QUANTILES):
+        #JSON/torch.save friendly summary for the model bundle
+        return {
+            "count": self.n.tolist(),
+            "mean": self.mean.tolist(),
+            "std": self.std.tolist(),
+            "min": self.min.tolist(),
+            "max": self.max.tolist(),
+            "quantiles": {str(q): v.tolist() for q, v in zip(qs, self.quantiles(qs))},
+        }
+
+
+def _chunk_stats(store, i, subset, val_frac, seed, clip, sample_size):
+    #One chunk's RunningStats; module level so worker processes can run it (they get the store path)
+    if not isinstance(store, DatasetStore):
+        store = DatasetStore(store)
+    X, _ = next(store.iter_chunks(subset, val_frac, seed, order=[i]))
+    if clip is not None:
+        X = np.clip(X, clip[0], clip[1])
+    return RunningStats(X.shape[1], sample_size, seed=(seed, i)).update(X)
+
+
+class DatasetStore:
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as f:
+            self.meta = json.load(f)
+        self.target_cols = self.meta["target_cols"]
+        self._set_columns(self.meta["columns"])
+        self._mmaps = {}
+
+    def _set_columns(self, columns):
+        #columns is None for a new store until the first file is ingested
+        self.columns = self.meta["columns"] = columns
+        self.feature_cols = [c for c in columns or [] if c not in self.target_cols]
+        self._feature_idx = [columns.index(c) for c in self.feature_cols]
+        self._target_idx = [columns.index(c) for c in self.target_cols] if columns else []
+
+    @staticmethod
+    def create(path, task, columns=None):
+        #Empty store; columns are fixed by the first ingested file when not given
+        os.makedirs(path, exist_ok=True)
+        meta = {"task": task, "columns": columns, "target_cols": TARGET_SETS[task],
+                "chunks": [], "sessions": {}, "sources": {}}
+        with open(os.path.join(path, META_FILE), "w") as f:
+            json.dump(meta, f, indent=1)
+        return DatasetStore(path)
+
+    @staticmethod
+    def open_or_create(path, task=None):
+        if os.path.exists(os.path.join(path, META_FILE)):
+            return DatasetStore(path)
+        return DatasetStore.create(path, task)
+
+    @property
+    def task(self):
+        return self.meta["task"]
+
+    @property
+    def num_rows(self):
+        return sum(c["rows"] for c in self.meta["chunks"])
+
+    @property
+    def sessions(self):
+        return self.meta["sessions"]
+
+    def __len__(self):
+        return self.num_rows
+
+    def chunk(self, i):
+        #(rows, columns) float32, memory-mapped
+        if i not in self._mmaps:
+            self._mmaps[i] = np.load(os.path.join(self.path, self.meta["chunks"][i]["file"]), mmap_mode="r")
+        return self._mmaps[i]
+
+    def chunk_ids(self, sessions=None):
+        return [i for i, c in enumerate(self.meta["chunks"]) if sessions is None or c["session"] in sessions]
+
+    def _subset_mask(self, i, rows, subset, val_frac, seed):
+        #Row-level train/val split that is stable across epochs and runs: one seeded draw per chunk
+        if subset is None:
+            return None
+        draw = np.random.default_rng((seed, i)).random(rows)
+        return draw >= val_frac if subset == "train" else draw < val_frac
+
+    def count(self, subset=None, val_frac=0.1, seed=0, sessions=None):
+        total = 0
+        for i in self.chunk_ids(sessions):
+            rows = self.meta["chunks"][i]["rows"]
+            mask = self._subset_mask(i, rows, subset, val_frac, seed)
+            total += rows if mask is None else int(mask.sum())
+        return total
+
+    def iter_chunks(self, subset=None, val_frac=0.1, seed=0, sessions=None, order=None):
+        #Yields (X, Y) per chunk, float32 copies of only the selected rows
+        for i in (order if order is not None else self.chunk_ids(sessions)):
+            data = self.chunk(i)
+            mask = self._subset_mask(i, len(data), subset, val_frac, seed)
+            if mask is not None:
+                data = data[mask]
+            yield (np.asarray(data[:, self._feature_idx], dtype=np.float32),
+                   np.asarray(data[:, self._target_idx], dtype=np.float32))
+
+    def batches(self, batch_size=64, mu=None, sd=None, shuffle=True, subset=None, val_frac=0.1, seed=0,
+                sessions=None, transform=None, clip=None):
+        #Re-iterable; each pass is one epoch. clip=(lo, hi) clips features before normalizing
+        return _Batches(self, batch_size, mu, sd, shuffle, subset, val_frac, seed, sessions, transform, clip)
+
+    def stats(self, subset=None, val_frac=0.1, seed=0, sessions=None, clip=None, workers=0, sample_size=65536):
+        #Streaming per-feature stats over the selected rows, one chunk at a time, optionally in worker processes
+        ids = self.chunk_ids(sessions)
+        total = RunningStats(len(self.feature_cols), sample_size, seed)
+        args = [(self.path, i, subset, val_frac, seed, clip, sample_size) for i in ids]
+        if workers and workers > 1 and len(ids) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for part in pool.map(_chunk_stats, *zip(*args)):
+                    total.merge(part)
+        else:
+            for a in args:
+                total.merge(_chunk_stats(self, *a[1:]))
+        return total
+
+    def ingest(self, source, chunk_rows=65536, session=None, scenario=None):
+        #Add one CSV file or Logger npy dir as a session. Unchanged sources are skipped, and sources
+        #that grew since the last ingest (loggers append) only get their new rows added.
+        stat = os.stat(source)
+        key = os.path.abspath(source)
+        seen = self.meta["sources"].get(key)
+        if seen is not None and seen["size"] == stat.st_size and seen["mtime"] == stat.st_mtime:
+            return 0
+        skip = seen["rows"] if seen is not None else 0
+
+        reader = _read_npy_dir if os.path.isdir(source) else _read_csv
+        added = 0
+        session_id = session
+        for columns, meta, block in reader(source, chunk_rows, skip):
+            if self.columns is None:
+                self._set_columns(columns)
+            elif columns != self.columns:
+                raise ValueError(f"{source} has columns {columns}, store has {self.columns}")
+            if session_id is None:
+                found = SESSION_RE.search(os.path.basename(source.rstrip(os.sep)))
+                session_id = meta.get("session_id") or (found.group(1) if found else os.path.basename(source))
+            name = f"chunk_{len(self.meta['chunks']):06d}.npy"
+            np.save(os.path.join(self.path, name), np.ascontiguousarray(block, dtype=np.float32))
+            self.meta["chunks"].append({"file": name, "rows": int(len(block)), "session": session_id})
+            info = self.meta["sessions"].setdefault(session_id, {"rows": 0, "sources": [], "scenario": None})
+            info["rows"] += int(len(block))
+            if source not in info["sources"]:
+                info["sources"].append(source)
+            info["scenario"] = scenario or meta.get("scenario") or info["scenario"]
+            added += len(block)
+
+        self.meta["sources"][key] = {"size": stat.st_size, "mtime": stat.st_mtime, "rows": skip + added}
+        self.save_meta()
+        return added
+
+    def save_meta(self):
+        tmp = os.path.join(self.path, META_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.meta, f, indent=1)
+        os.replace(tmp, os.path.join(self.path, META_FILE))
+
+
+class _Batches:
+    def __init__(self, store, batch_size, mu, sd, shuffle, subset, val_frac, seed, sessions, transform, clip):
+        self.store = store
+        self.clip = None if clip is None else (np.asarray(clip[0], dtype=np.float32), np.asarray(clip[1], dtype=np.float32))
+        self.batch_size = batch_size
+        self.mu = None if mu is None else np.asarray(mu, dtype=np.float32)
+        self.sd = None if sd is None else np.asarray(sd, dtype=np.float32)
+        self.shuffle = shuffle
+        self.subset = subset
+        self.val_frac = val_frac
+        self.seed = seed
+        self.sessions = sessions
+        self.transform = transform
+        self.epoch = 0
+
+    def __len__(self):
+        return -(-self.store.count(self.subset, self.val_frac, self.seed, self.sessions) // self.batch_size)
+
+    def __iter__(self):
+        #Shuffles chunk order and rows within each chunk; only one chunk plus a partial batch is in memory.
+        #Leftover rows are carried into the next chunk, so every batch but the last is full.
+        rng = np.random.default_rng((self.seed, self.epoch))
+        self.epoch += 1
+        order = self.store.chunk_ids(self.sessions)
+        if self.shuffle:
+            rng.shuffle(order)
+        carry_x = carry_y = None
+        for X, Y in self.store.iter_chunks(self.subset, self.val_frac, self.seed, order=order):
+            if self.shuffle:
+                perm = rng.permutation(len(X))
+                X, Y = X[perm], Y[perm]
+            if carry_x is not None:
+                X, Y = np.concatenate([carry_x, X]), np.concatenate([carry_y, Y])
+            full = len(X) - len(X) % self.batch_size
+            for start in range(0, full, self.batch_size):
+                yield self._out(X[start:start + self.batch_size], Y[start:start + self.batch_size])
+            carry_x, carry_y = (X[full:], Y[full:]) if full < len(X) else (None, None)
+        if carry_x is not None:
+            yield self._out(carry_x, carry_y)
+
+    def _out(self, xb, yb):
+        if self.clip is not None:
+            xb = np.clip(xb, self.clip[0], self.clip[1])
+        if self.mu is not None and self.sd is not None:
+            xb = np.nan_to_num((xb - self.mu) / self.sd, nan=0.0)  # missing features sit at the mean
+        if self.transform is not None:
+            return self.transform(xb), self.transform(yb)
+        return xb, yb
+
+
+def ingest(store_path, sources, task=None, chunk_rows=65536, scenario=None):
+    sources = [s for pattern in sources for s in (sorted(glob.glob(pattern)) or [pattern])]
+    if task is None and not os.path.exists(os.path.join(store_path, META_FILE)):
+        with open(sources[0], newline="") as f:
+            task = task_for_columns(next(csv.reader(f)))
+    store = DatasetStore.open_or_create(store_path, task)
+    total = 0
+    for source in sources:
+        added = store.ingest(source, chunk_rows=chunk_rows, scenario=scenario)
+        print(f"{source}: {'skipped (already ingested)' if added == 0 else f'{added} rows'}")
+        total += added
+    return store, total
+
+
+if __name__ == "__main__":
+    arguments = argparse.ArgumentParser()
+    sub = arguments.add_subparsers(dest="cmd", required=True)
+    ing = sub.add_parser("ingest")
+    ing.add_argument("--store", required=True)
+    ing.add_argument("--task", choices=list(TARGET_SETS), default=None)
+    ing.add_argument("--chunk_rows", type=int, default=65536)
+    ing.add_argument("--scenario", default=None)
+    ing.add_argument("sources", nargs="+")
+    info = sub.add_parser("info")
+    info.add_argument("--store", required=True)
+    args = arguments.parse_args()
+
+    if args.cmd == "ingest":
+        store, total = ingest(args.store, args.sources, args.task, args.chunk_rows, args.scenario)
+        print(f"Added {total} rows, store now has {store.num_rows} rows in {len(store.meta['chunks'])} chunks")
+    else:
+        store = DatasetStore(args.store)
+        print(f"task={store.task} rows={store.num_rows} chunks={len(store.meta['chunks'])}")
+        print(f"features={store.feature_cols}")
+        print(f"targets={store.target_cols}")
+        for sid, s in sorted(store.sessions.items()):
+            print(f"  {sid}: {s['rows']} rows, scenario={s['scenario']}")
@@ -0,0 +1,134 @@
+import argparse, csv, os, random, time
+from concurrent.futures import ProcessPoolExecutor
+
+import torch
+from kesslergame import KesslerGame, GraphicsType
+
+import scenarios as sc
+from nf_controller import NFController
+
+"""
+Closed-loop evaluation of NF bundles: play each candidate headlessly through a fixed scenario
+suite and rank by how it plays, not by its val loss on logged frames.
+
+A candidate is one bundle file. Its "task" picks what it replaces: a maneuver bundle flies with
+models/combat.pt, a combat bundle with models/maneuver.pt, an all bundle on its own. Every
+(candidate, scenario) game is one job for a pool of worker processes, each limited to one torch
+thread, so a suite of N scenarios x K candidates spreads over all cores.
+
+    python nf_eval.py sweeps/maneuver_*/trial_*.pt models/maneuver.pt
+    python nf_eval.py cand.pt --suite stock_scenario asteroid_rain --time_limit 30 --out eval.csv
+
+score = asteroids hit - death_penalty * deaths, summed over the suite. Accuracy and mean
+controller eval time (ms per frame) are reported alongside.
+"""
+
+
+# Scenarios from scenarios.py with fixed asteroid layouts (or a fixed seed), so reruns are comparable
+SUITE = [
+    "stock_scenario",
+    "vertical_wall_left",
+    "crossing_lanes",
+    "asteroid_rain",
+    "giants_with_kamikaze",
+    "donut_ring",
+    "spiral_arms",
+]
+
+GAME_SETTINGS = {
+    "graphics_type": GraphicsType.NoGraphics,
+    "perf_tracker": True,  # controller eval times
+    "prints_on": False,
+    "random_ast_splits": False,
+}
+
+_controllers = {}  # per worker: candidate path -> NFController
+
+
+def _worker_init():
+    torch.set_num_threads(1)
+
+
+def bundle_task(path):
+    return torch.load(path, map_location="cpu").get("task", "maneuver")
+
+
+def _controller(path):
+    if path not in _controllers:
+        task = bundle_task(path)
+        _controllers[path] = NFController(frozen=True, model_paths={task: path}, log=False)
+    return _controllers[path]
+
+
+def play(path, scenario_name, time_limit=None, seed=0):
+    #One headless game of a candidate bundle; returns the ship team's totals
+    random.seed(seed)
+    scenario = getattr(sc, scenario_name)()
+    if time_limit:
+        scenario.time_limit = time_limit
+    controller = _controller(path)
+    start = time.perf_counter()
+    score, _ = KesslerGame(GAME_SETTINGS).run(scenario, [controller])
+    team = score.teams[0]
+    # The game appends the ship's running controller time every frame, so the last entry is the total
+    return {"asteroids_hit": team.asteroids_hit, "deaths": team.deaths, "shots_fired": team.shots_fired,
+            "bullets_hit": team.bullets_hit, "eval_seconds": team.eval_times[-1] if team.eval_times else 0.0,
+            "frames": len(team.eval_times),
+            "wall_seconds": time.perf_counter() - start}
+
+
+def evaluate(candidates, suite=SUITE, workers=None, time_limit=None, seed=0, death_penalty=10.0):
+    #Rows for each candidate, best score first
+    candidates = [os.path.abspath(c) for c in candidates]
+    jobs = [(c, name) for c in candidates for name in suite]
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_worker_init) as pool:
+        futures = [pool.submit(play, c, name, time_limit, seed) for c, name in jobs]
+        games = [f.result() for f in futures]
+
+    rows = []
+    for c in candidates:
+        played = [g for (cand, _), g in zip(jobs, games) if cand == c]
+        totals = {k: sum(g[k] for g in played) for k in played[0]}
+        rows.append({
+            "bundle": c,
+            "score": totals["asteroids_hit"] - death_penalty * totals["deaths"],
+            "asteroids_hit": totals["asteroids_hit"],
+            "deaths": totals["deaths"],
+            "accuracy": totals["bullets_hit"] / totals["shots_fired"] if totals["shots_fired"] else 0.0,
+            "eval_ms": 1000 * totals["eval_seconds"] / max(totals["frames"], 1),
+            "wall_seconds": totals["wall_seconds"],
+        })
+    return sorted(rows, key=lambda r: -r["score"])
+
+
+def print_table(rows):
+    print(f"{'rank':>4} {'score':>8} {'hit':>5} {'deaths':>6} {'acc':>6} {'eval ms':>8}  bundle")
+    for i, r in enumerate(rows, start=1):
+        print(f"{i:>4} {r['score']:>8.1f} {r['asteroids_hit']:>5} {r['deaths']:>6} {r['accuracy']:>6.3f} "
+              f"{r['eval_ms']:>8.3f}  {r['bundle']}")
+
+
+def write_table(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    arguments = argparse.ArgumentParser()
+    arguments.add_argument("bundles", nargs="+")
+    arguments.add_argument("--suite", nargs="+", default=SUITE, help="scenario functions from scenarios.py")
+    arguments.add_argument("--workers", type=int, default=None, help="game worker processes (default: all cores)")
+    arguments.add_argument("--time_limit", type=float, default=None, help="override every scenario's time limit (s)")
+    arguments.add_argument("--seed", type=int, default=0)
+    arguments.add_argument("--death_penalty", type=float, default=10.0)
+    arguments.add_argument("--out", default=None, help="write the ranking as CSV")
+    args = arguments.parse_args()
+
+    start = time.perf_counter()
+    rows = evaluate(args.bundles, args.suite, args.workers, args.time_limit, args.seed, args.death_penalty)
+    print_table(rows)
+    print(f"{len(rows)} bundles x {len(args.suite)} scenarios in {time.perf_counter() - start:.1f}s")
+    if args.out:
+        write_table(args.out, rows)
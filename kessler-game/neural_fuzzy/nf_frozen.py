@@ -0,0 +1,202 @@
+import numpy as np
+
+from nf_infer import NFPolicy, MANEUVER_HEADS, COMBAT_HEADS, maneuver_tuples, combat_tuples
+
+"""
+Frozen NumPy evaluator for trained NFPolicy bundles.
+
+A SugenoNet forward for one sample is a handful of tiny tensor ops, so at 30 Hz with batch size 1
+the time goes to torch dispatch, tensor construction and .item() syncs, not math. Freezing copies
+the trained parameters into float64 NumPy arrays once and folds the input normalization in:
+    Gaussian MF on (x - mu) / sd with center c, width s  ==  MF on x with center mu + sd*c, width sd*s
+    consequent a . (x - mu) / sd + b                     ==  (a / sd) . x + (b - a . mu / sd)
+so evaluation works on raw features. Everything runs on the CPU, independent of CUDA.
+
+    policy = FrozenPolicy.load("models/maneuver.pt")   # or NFPolicy(...).freeze()
+    thrust, turn = policy.act_maneuver(features)       # features: sequence of floats in feature_cols order
+
+Outputs match NFPolicy up to float32 vs float64 rounding. bench_nf_policy.py compares latency.
+"""
+
+
+_FLOAT32_LOG_MIN = float(np.log(np.float64(np.finfo(np.float32).smallest_subnormal)))
+
+
+def _np(t):
+    return t.detach().cpu().double().numpy()
+
+
+def _fold_mfs(mfs, mu, sd):
+    #Raw-space (centers, sigmas), each (n_inputs, num_mfs)
+    c = np.stack([_np(mf.centers) for mf in mfs])
+    s = np.exp(np.stack([_np(mf.log_sigmas) for mf in mfs]))
+    return mu[:, None] + sd[:, None] * c, sd[:, None] * s
+
+
+def _fold_consequents(layer, mu, sd):
+    #(num_outputs, num_rules, n_inputs) slopes and (num_outputs, num_rules) intercepts on raw inputs
+    c = _np(layer.consequents)
+    if c.ndim == 2:
+        c = c[None]
+    slopes = c[..., :-1] / sd
+    return slopes, c[..., -1] - (slopes * mu).sum(axis=-1)
+
+
+def _grid_matrix(rule_layer):
+    return _np(rule_layer.rule_matrix)
+
+
+class _FrozenStage:
+    """MF layer + rule layer + Sugeno layer on n inputs, parameters folded to raw input space."""
+
+    def __init__(self, mfs, rule_layer, sugeno_layer, mu, sd, log_space):
+        self.centers, self.sigmas = _fold_mfs(mfs, mu, sd)
+        self.slopes, self.intercepts = _fold_consequents(sugeno_layer, mu, sd)
+        self.log_space = log_space
+        if hasattr(rule_layer, "logits"):  # SparseRuleLayer
+            self.rule_matrix = None
+            logits = _np(rule_layer.logits)
+            select = np.exp(logits - logits.max(axis=-1, keepdims=True))
+            self.select = select / select.sum(axis=-1, keepdims=True)  # (num_rules, n_inputs, num_mfs + 1)
+        else:
+            self.rule_matrix = _grid_matrix(rule_layer)  # (n_inputs * num_mfs, num_rules)
+
+    def log_strengths(self, x):
+        log_mf = -0.5 * ((x[:, :, None] - self.centers) / self.sigmas) ** 2  # (B, n, M)
+        if self.rule_matrix is not None:
+            return log_mf.reshape(len(x), -1) @ self.rule_matrix
+        log_mf = np.concatenate([log_mf, np.zeros(log_mf.shape[:2] + (1,))], axis=-1)
+        shift = log_mf.max(axis=-1, keepdims=True)
+        mix = np.einsum("bnm,rnm->brn", np.exp(log_mf - shift), self.select)
+        return (np.log(np.maximum(mix, np.finfo(float).tiny)) + shift[:, None, :, 0]).sum(axis=-1)
+
+    def __call__(self, x):
+        #x: (B, n) raw inputs -> (B, num_outputs)
+        log_w = self.log_strengths(x)
+        rule_out = np.einsum("bf,orf->bor", x, self.slopes) + self.intercepts  # (B, O, R)
+        if self.log_space:
+            w = np.exp(log_w - log_w.max(axis=1, keepdims=True))
+            w /= w.sum(axis=1, keepdims=True)
+            return (w[:, None, :] * rule_out).sum(axis=-1)
+        # The product path runs in float32 in torch, where strengths below its smallest subnormal are exactly 0
+        # (and an all-zero output skips the thrust MIN_FWD snap), so mirror that underflow
+        w = np.where(log_w < _FLOAT32_LOG_MIN, 0.0, np.exp(log_w))
+        return (w[:, None, :] * rule_out).sum(axis=-1) / (w.sum(axis=1)[:, None] + 1e-6)
+
+
+class FrozenSugeno:
+    """NumPy copy of a trained SugenoNet (any rule base) with normalization and clipping built in."""
+
+    def __init__(self, model, mu=None, sd=None, clip=None):
+        num_inputs = model.cascade.num_inputs if model.rule_base == "hierarchical" else len(model.mf_layers)
+        mu = np.zeros(num_inputs) if mu is None else np.asarray(mu, dtype=np.float64)
+        sd = np.ones(num_inputs) if sd is None else np.asarray(sd, dtype=np.float64)
+        self.clip = None if clip is None else (np.asarray(clip[0], dtype=np.float64), np.asarray(clip[1], dtype=np.float64))
+        self.num_outputs = model.num_outputs
+
+        if model.rule_base == "hierarchical":
+            cascade = model.cascade
+            self.stages = []
+            for k, (mfs, rules, sugeno) in enumerate(zip(cascade.mf_layers, cascade.rule_layers, cascade.sugeno_layers)):
+                if k == 0:
+                    stage_mu, stage_sd = mu[:len(mfs)], sd[:len(mfs)]
+                else:  # the previous stage's output is not normalized, only x(k+1) is
+                    stage_mu, stage_sd = np.array([0.0, mu[k + 1]]), np.array([1.0, sd[k + 1]])
+                self.stages.append(_FrozenStage(mfs, rules, sugeno, stage_mu, stage_sd, cascade.log_space))
+        else:
+            self.stages = [_FrozenStage(model.mf_layers, model.rule_layer, model.sugeno_layer, mu, sd, model.log_space)]
+
+    def evaluate(self, x):
+        #x: (B, num_inputs) or (num_inputs,) raw features -> (B, num_outputs) or (num_outputs,)
+        x = np.asarray(x, dtype=np.float64)
+        single = x.ndim == 1
+        if single:
+            x = x[None]
+        if self.clip is not None:
+            x = np.clip(x, self.clip[0], self.clip[1])
+        first = self.stages[0]
+        y = first(x[:, :first.centers.shape[0]])
+        for k, stage in enumerate(self.stages[1:], start=1):  # hierarchical cascade
+            y = stage(np.stack([y[:, 0], x[:, k + 1]], axis=1))
+        return y[0] if single else y
+
+
+class FrozenPolicy:
+    """Drop-in for NFPolicy's act_* methods on plain sequences / NumPy arrays of raw features."""
+
+    def __init__(self, policy):
+        self.feature_cols = policy.feature_cols
+        self.heads = {}  # name -> (FrozenSugeno, output column); heads of one shared net share the FrozenSugeno
+        frozen = {}
+        for name, (model, _, _) in policy.models.items():
+            if id(model) not in frozen:
+                mu, sd = policy._norm.get(name, (None, None))
+                clip = policy.clips.get(name)
+                frozen[id(model)] = FrozenSugeno(
+                    model,
+                    None if mu is None else mu.cpu().numpy(),
+                    None if sd is None else sd.cpu().numpy(),
+                    None if clip is None else (clip[0].cpu().numpy(), clip[1].cpu().numpy()))
+            self.heads[name] = (frozen[id(model)], policy.output_index[name])
+
+    @staticmethod
+    def load(model_path):
+        return NFPolicy(model_path, device="cpu").freeze()
+
+    def raw_outputs(self, x, keys):
+        out = {}
+        done = {}
+        for key in keys:
+            if key not in self.heads:
+                continue
+            net, col = self.heads[key]
+            if id(net) not in done:
+                done[id(net)] = net.evaluate(x)
+            out[key] = float(done[id(net)][col])
+        return out
+
+    def raw_outputs_batch(self, X, keys):
+        #(N,) raw output array of each available head for (N, F) raw features
+        out = {}
+        done = {}
+        for key in keys:
+            if key not in self.heads:
+                continue
+            net, col = self.heads[key]
+            if id(net) not in done:
+                done[id(net)] = net.evaluate(np.asarray(X, dtype=np.float64).reshape(len(X), -1))
+            out[key] = done[id(net)][:, col]
+        return out
+
+    @staticmethod
+    def _maneuver(raw):
+        thrust = NFPolicy._post_thrust(raw["thrust"]) if "thrust" in raw else 0.0
+        turn = NFPolicy._post_turn(raw["turn_rate"]) if "turn_rate" in raw else 0.0
+        return float(thrust), float(turn)
+
+    @staticmethod
+    def _combat(raw, thresh):
+        fire = NFPolicy._post_trigger(raw["fire"], thresh) if "fire" in raw else False
+        mine = NFPolicy._post_trigger(raw["drop_mine"], thresh) if "drop_mine" in raw else False
+        return bool(fire), bool(mine)
+
+    def act_maneuver(self, x):
+        return self._maneuver(self.raw_outputs(x, MANEUVER_HEADS))
+
+    def act_combat(self, x, thresh=0.5):
+        return self._combat(self.raw_outputs(x, COMBAT_HEADS), thresh)
+
+    def act(self, x, thresh=0.5):
+        #All four actions, one evaluation per distinct net
+        raw = self.raw_outputs(x, MANEUVER_HEADS + COMBAT_HEADS)
+        return self._maneuver(raw) + self._combat(raw, thresh)
+
+    def act_maneuver_batch(self, X):
+        return maneuver_tuples(self.raw_outputs_batch(X, MANEUVER_HEADS), len(X))
+
+    def act_combat_batch(self, X, thresh=0.5):
+        return combat_tuples(self.raw_outputs_batch(X, COMBAT_HEADS), len(X), thresh)
+
+    def act_batch(self, X, thresh=0.5):
+        raw = self.raw_outputs_batch(X, MANEUVER_HEADS + COMBAT_HEADS)
+        return [m + c for m, c in zip(maneuver_tuples(raw, len(X)), combat_tuples(raw, len(X), thresh))]
@@ -3,25 +3,78 @@ import torch
 import numpy as np
 from sugeno_nn import SugenoNet
 
+MANEUVER_HEADS = ("thrust", "turn_rate")
+COMBAT_HEADS = ("fire", "drop_mine")
+
+# Action post-processing of the raw head outputs
+THRUST_GAIN = 1.5
+MIN_FWD = 0.4
+MIN_BACK = 0.4
+TURN_GAIN = 1.2
+
+
+def _build_model(info, num_outputs=1):
+    return SugenoNet(num_inputs=int(info["num_inputs"]),
+                     num_mfs=int(info["num_mfs"]),
+                     num_outputs=num_outputs,
+                     rule_base=info.get("rule_base", "grid"),
+                     num_rules=info.get("num_rules"),
+                     log_space=info.get("log_space", False))
+
+
 class NFPolicy:
-    def __init__(self, model_path: str):
-        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    def __init__(self, model_path: str, device=None):
+        device = torch.device(device) if device is not None else torch.device("cuda" if torch.cuda.is_available() else "cpu")
         bundle = torch.load(model_path, map_location=device)
 
         self.device = device
-        self.models = {}
+        self.models = {}        # output name -> (model, mu, sd)
+        self.output_index = {}  # output name -> column of its model's output
         self.feature_cols = None
-        for name, info in bundle["heads"].items():
-            model = SugenoNet(num_inputs=int(info["num_inputs"]),
-                              num_mfs=int(info["num_mfs"]),
-                              num_outputs=1)
+        self.clips = {}
+        self._norm = {}         # output name -> (mu, sd) tensors, built once
+
+        heads = [(name, info, 1, [name]) for name, info in bundle.get("heads", {}).items()]
+        if "shared" in bundle:  # one multi-head net for every output (nf_train --joint)
+            info = bundle["shared"]
+            heads.append((None, info, len(info["outputs"]), info["outputs"]))
+        for _, info, num_outputs, names in heads:
+            model = _build_model(info, num_outputs).to(device)
+            model.device = device
             model.load_state_dict(info["state_dict"]); model.eval()
-            self.models[name] = (model, info.get("mu"), info.get("sd"))
+            for i, name in enumerate(names):
+                self.models[name] = (model, info.get("mu"), info.get("sd"))
+                self.output_index[name] = i
+                if info.get("clip") is not None:  # bundles trained with --robust
+                    lo, hi = info["clip"]
+                    self.clips[name] = (torch.tensor(lo, dtype=torch.float32, device=device),
+                                        torch.tensor(hi, dtype=torch.float32, device=device))
+                if info.get("mu") is not None and info.get("sd") is not None:
+                    mu_t = torch.tensor(info["mu"], dtype=torch.float32, device=device)
+                    sd_t = torch.tensor(info["sd"], dtype=torch.float32, device=device)
+                    # Separate maneuver heads always replaced sd <= 1e-6, separate combat heads only sd < 1e-6
+                    if name in COMBAT_HEADS and num_outputs == 1:
+                        sd_t[sd_t < 1e-6] = 1.0
+                    else:
+                        sd_t[sd_t <= 1e-6] = 1.0
+                    self._norm[name] = (mu_t, sd_t)
             self.feature_cols = self.feature_cols or info.get("feature_cols")
 
+    def freeze(self):
+        #NumPy evaluator with normalization folded in, for low-latency single-sample control (nf_frozen.py)
+        from nf_frozen import FrozenPolicy
+        return FrozenPolicy(self)
 
-    def prep(self, x_list, mu, sd):
+    def _clip_tensor(self, key, xb):
+        if key not in self.clips:
+            return xb
+        lo, hi = self.clips[key]
+        return torch.maximum(torch.minimum(xb, hi), lo)
+
+    def prep(self, x_list, mu, sd, clip=None):
         x = np.array(x_list, dtype=np.float32)
+        if clip is not None:
+            x = np.clip(x, clip[0].cpu().numpy(), clip[1].cpu().numpy())
         if mu is not None and sd is not None:
             mu = np.array(mu, dtype=np.float32)
             sd = np.array(sd, dtype=np.float32)
@@ -32,102 +85,127 @@ class NFPolicy:
 
     def run_model(self, key, x_list, post=None):
         model, mu, sd = self.models[key]
-        xb = self.prep(x_list, mu, sd)
+        xb = self.prep(x_list, mu, sd, self.clips.get(key))
         with torch.no_grad():
-            y = model(xb).squeeze().item()
+            y = model(xb)[0, self.output_index[key]].item()
         if post == "sigmoid":
             return 1.0 / (1.0 + np.exp(-y))
         if post == "tanh":
             e2y = np.exp(2*y); return (e2y - 1) / (e2y + 1)
         return y
 
-    def act_maneuver_tensor(self, xb):
-        has_t = "thrust" in self.models
-        has_r = "turn_rate" in self.models
-        thrust, turn = 0.0, 0.0
-
+    def _forward(self, xb, keys):
+        #(N,) raw output tensor of each available head in keys; heads sharing a net share one forward pass
+        out = {}
         with torch.no_grad():
-            if has_t:
-                model, mu, sd = self.models["thrust"]
-                if mu is not None and sd is not None:
-                    mu_t = torch.tensor(mu, dtype=torch.float32, device=self.device)
-                    sd_t = torch.tensor(sd, dtype=torch.float32, device=self.device)
-                    sd_t[sd_t <= 1e-6] = 1.0
-                    xb_norm = (xb - mu_t) / sd_t
-                else:
-                    xb_norm = xb
-                y_t = model(xb_norm).squeeze().item()
-                thrust_norm = np.tanh(y_t)
-
-                GAIN = 1.5
-                MIN_FWD = 0.4
-                MIN_BACK = 0.4
-
-                thrust_norm *= GAIN
-                thrust_norm = max(-1.0, min(1.0, thrust_norm))
-
-                if 0.0 < thrust_norm < MIN_FWD:
-                    thrust_norm = MIN_FWD
-                elif -MIN_BACK < thrust_norm < 0.0:
-                    thrust_norm = -MIN_BACK
-
-                thrust = thrust_norm * 150.0
-
-            if has_r:
-                model, mu, sd = self.models["turn_rate"]
-                if mu is not None and sd is not None:
-                    mu_t = torch.tensor(mu, dtype=torch.float32, device=self.device)
-                    sd_t = torch.tensor(sd, dtype=torch.float32, device=self.device)
-                    sd_t[sd_t <= 1e-6] = 1.0
-                    xb_norm = (xb - mu_t) / sd_t
-                else:
-                    xb_norm = xb
-
-                y_r = model(xb_norm).squeeze().item()
-
-                TURN_GAIN = 1.2
-                y_r = max(-3.0, min(3.0, y_r * TURN_GAIN))
-
-                turn_norm = np.tanh(y_r)
-                turn = turn_norm * 180.0
+            for key in keys:
+                if key not in self.models or key in out:
+                    continue
+                model = self.models[key][0]
+                xb_norm = self._clip_tensor(key, xb)
+                if key in self._norm:
+                    mu_t, sd_t = self._norm[key]
+                    xb_norm = (xb_norm - mu_t) / sd_t
+                y = model(xb_norm)
+                for other in keys:
+                    if other in self.models and self.models[other][0] is model:
+                        out[other] = y[:, self.output_index[other]]
+        return out
+
+    def raw_outputs(self, xb, keys):
+        #Raw (pre-squash) output of each available head in keys for a (1, F) input
+        return {key: y[0].item() for key, y in self._forward(xb, keys).items()}
+
+    def raw_outputs_batch(self, X, keys):
+        #Same for an (N, F) array or tensor of raw features, as (N,) float64 arrays
+        xb = torch.as_tensor(np.asarray(X, dtype=np.float32) if not torch.is_tensor(X) else X,
+                             dtype=torch.float32, device=self.device)
+        return {key: y.cpu().double().numpy() for key, y in self._forward(xb, keys).items()}
+
+    @staticmethod
+    def _post_thrust(y_t):
+        thrust_norm = np.tanh(y_t)
+
+        thrust_norm *= THRUST_GAIN
+        thrust_norm = max(-1.0, min(1.0, thrust_norm))
+
+        if 0.0 < thrust_norm < MIN_FWD:
+            thrust_norm = MIN_FWD
+        elif -MIN_BACK < thrust_norm < 0.0:
+            thrust_norm = -MIN_BACK
+
+        return thrust_norm * 150.0
+
+    @staticmethod
+    def _post_turn(y_r):
+        y_r = max(-3.0, min(3.0, y_r * TURN_GAIN))
+
+        turn_norm = np.tanh(y_r)
+        return turn_norm * 180.0
+
+    @staticmethod
+    def _post_trigger(logit, thresh):
+        return (1 / (1 + np.exp(-logit))) >= thresh
+
+    @staticmethod
+    def _post_thrust_batch(y_t):
+        thrust_norm = np.clip(np.tanh(y_t) * THRUST_GAIN, -1.0, 1.0)
+        thrust_norm = np.where((thrust_norm > 0.0) & (thrust_norm < MIN_FWD), MIN_FWD, thrust_norm)
+        thrust_norm = np.where((thrust_norm < 0.0) & (thrust_norm > -MIN_BACK), -MIN_BACK, thrust_norm)
+        return thrust_norm * 150.0
+
+    @staticmethod
+    def _post_turn_batch(y_r):
+        return np.tanh(np.clip(y_r * TURN_GAIN, -3.0, 3.0)) * 180.0
+
+    @staticmethod
+    def _post_trigger_batch(logit, thresh):
+        return (1 / (1 + np.exp(-logit))) >= thresh
 
+    def act_maneuver_tensor(self, xb):
+        raw = self.raw_outputs(xb, MANEUVER_HEADS)
+        thrust = self._post_thrust(raw["thrust"]) if "thrust" in raw else 0.0
+        turn = self._post_turn(raw["turn_rate"]) if "turn_rate" in raw else 0.0
         return float(thrust), float(turn)
 
 
     def act_combat_tensor(self, xb, thresh=0.5):
-        has_f = "fire" in self.models
-        has_m = "drop_mine" in self.models
-        with torch.no_grad():
-            if has_f:
-                model, mu, sd = self.models["fire"]
-
-                if mu is not None and sd is not None:
-                    mu_t = torch.tensor(mu, dtype=torch.float32, device=self.device)
-                    sd_t = torch.tensor(sd, dtype=torch.float32, device=self.device)
-                    sd_t[sd_t < 1e-6] = 1.0
-                    xb_norm = (xb - mu_t) / sd_t
-                else:
-                    xb_norm = xb
-
-                logit_f = model(xb_norm).squeeze().item()
-                fire = (1 / (1 + np.exp(-logit_f))) >= thresh
-            else:
-                fire = False
-
-            if has_m:
-                model, mu, sd = self.models["drop_mine"]
-
-                if mu is not None and sd is not None:
-                    mu_t = torch.tensor(mu, dtype=torch.float32, device=self.device)
-                    sd_t = torch.tensor(sd, dtype=torch.float32, device=self.device)
-                    sd_t[sd_t < 1e-6] = 1.0
-                    xb_norm = (xb - mu_t) / sd_t
-                else:
-                    xb_norm = xb
-
-                logit_m = model(xb_norm).squeeze().item()
-                mine = (1 / (1 + np.exp(-logit_m))) >= thresh
-            else:
-                mine = False
-
-        return bool(fire), bool(mine)
\ No newline at end of file
+        raw = self.raw_outputs(xb, COMBAT_HEADS)
+        fire = self._post_trigger(raw["fire"], thresh) if "fire" in raw else False
+        mine = self._post_trigger(raw["drop_mine"], thresh) if "drop_mine" in raw else False
+        return bool(fire), bool(mine)
+
+    def act_tensor(self, xb, thresh=0.5):
+        #All four actions; one forward pass for a joint bundle (nf_train --task all)
+        raw = self.raw_outputs(xb, MANEUVER_HEADS + COMBAT_HEADS)
+        thrust = self._post_thrust(raw["thrust"]) if "thrust" in raw else 0.0
+        turn = self._post_turn(raw["turn_rate"]) if "turn_rate" in raw else 0.0
+        fire = self._post_trigger(raw["fire"], thresh) if "fire" in raw else False
+        mine = self._post_trigger(raw["drop_mine"], thresh) if "drop_mine" in raw else False
+        return float(thrust), float(turn), bool(fire), bool(mine)
+
+    # Batched versions: X is (N, F) raw features (one row per ship / env), one forward per net for all rows
+
+    def act_maneuver_batch(self, X):
+        return maneuver_tuples(self.raw_outputs_batch(X, MANEUVER_HEADS), len(X))
+
+    def act_combat_batch(self, X, thresh=0.5):
+        return combat_tuples(self.raw_outputs_batch(X, COMBAT_HEADS), len(X), thresh)
+
+    def act_batch(self, X, thresh=0.5):
+        raw = self.raw_outputs_batch(X, MANEUVER_HEADS + COMBAT_HEADS)
+        return [m + c for m, c in zip(maneuver_tuples(raw, len(X)), combat_tuples(raw, len(X), thresh))]
+
+
+def maneuver_tuples(raw, n):
+    #Vectorized thrust/turn post-processing of raw head outputs -> n (thrust, turn_rate) tuples
+    thrust = NFPolicy._post_thrust_batch(raw["thrust"]) if "thrust" in raw else np.zeros(n)
+    turn = NFPolicy._post_turn_batch(raw["turn_rate"]) if "turn_rate" in raw else np.zeros(n)
+    return list(zip(thrust.tolist(), turn.tolist()))
+
+
+def combat_tuples(raw, n, thresh=0.5):
+    #n (fire, drop_mine) tuples
+    fire = NFPolicy._post_trigger_batch(raw["fire"], thresh) if "fire" in raw else np.zeros(n, dtype=bool)
+    mine = NFPolicy._post_trigger_batch(raw["drop_mine"], thresh) if "drop_mine" in raw else np.zeros(n, dtype=bool)
+    return list(zip(fire.tolist(), mine.tolist()))
@@ -0,0 +1,190 @@
+import argparse, csv, itertools, json, os, random, shutil, subprocess, sys, time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from nf_dataset import DatasetStore, ingest
+
+"""
+Hyperparameter sweep for nf_train.py.
+
+Every trial is its own nf_train.py process, limited to --threads torch/BLAS threads, and at most
+--workers trials run at once. The training data is ingested once into a columnar store
+(nf_dataset.py) whose chunks the trials open with mmap, so the OS page cache holds one copy
+of the data no matter how many trials read it. A trial with --patience stops as soon as its
+val loss stalls and its slot goes to the next trial.
+
+    python nf_sweep.py --task maneuver --num_mfs 2 3 --lr 0.01 0.003 --rule_base grid sparse
+    python nf_sweep.py --task combat --search random --trials 20 --workers 4 --install
+
+Output directory (--out, default sweeps/<task>_<time>):
+    store/            the ingested training data, unless --store is given
+    results.csv       one row per trial: parameters, total/per-net val loss, epochs, seconds, status
+    trial_XXX.log     nf_train output
+    trial_XXX.pt      bundles of the --keep best trials
+    eval.csv          in-game ranking of those bundles (--eval, see nf_eval.py)
+    best.pt           copy of the best bundle (--install also copies it to models/<task>.pt)
+
+With --eval the kept bundles play the nf_eval.py scenario suite and best.pt is the top in-game
+score instead of the lowest val loss.
+"""
+
+
+# Swept nf_train options; each takes a list on the command line
+SWEEP_PARAMS = {
+    "num_mfs": int,
+    "lr": float,
+    "batch_size": int,
+    "rule_base": str,
+    "num_rules": int,
+    "joint": int,
+    "robust": int,
+}
+FLAGS = {"joint", "robust"}  # 0/1 values that map to store_true options
+RESULT_COLS = ["trial", "status", "total_val_loss", "val_loss", "epochs", "seconds"]
+
+
+def trial_configs(grid, search="grid", trials=None, seed=0):
+    configs = []
+    for values in itertools.product(*grid.values()):
+        config = dict(zip(grid.keys(), values))
+        if config.get("rule_base") != "sparse":
+            config["num_rules"] = None  # only sparse rule bases take a rule count
+        if config not in configs:
+            configs.append(config)
+    if search == "random":
+        random.Random(seed).shuffle(configs)
+        configs = configs[:trials]
+    return configs
+
+
+def train_command(task, store, config, epochs, patience, threads, seed, model_out, results_json):
+    cmd = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "nf_train.py"),
+           "--task", task, "--store", store, "--epochs", str(epochs), "--patience", str(patience),
+           "--threads", str(threads), "--seed", str(seed),
+           "--model_out", model_out, "--results_json", results_json]
+    for key, value in config.items():
+        if value is None:
+            continue
+        if key in FLAGS:
+            cmd += [f"--{key}"] if value else []
+        else:
+            cmd += [f"--{key}", str(value)]
+    return cmd
+
+
+def run_trial(trial, cmd, out_dir, threads):
+    # Cap the BLAS/OpenMP pools too, otherwise every trial spawns one thread per core
+    env = dict(os.environ, OMP_NUM_THREADS=str(threads), MKL_NUM_THREADS=str(threads),
+               OPENBLAS_NUM_THREADS=str(threads))
+    log_path = os.path.join(out_dir, f"trial_{trial:03d}.log")
+    results_json = cmd[cmd.index("--results_json") + 1]
+    start = time.time()
+    with open(log_path, "w") as log:
+        code = subprocess.run(cmd, stdout=log, stderr=subprocess.STDOUT, env=env).returncode
+    if code != 0 or not os.path.exists(results_json):
+        return {"status": f"failed ({code})", "seconds": time.time() - start}
+    with open(results_json) as f:
+        result = json.load(f)
+    os.remove(results_json)
+    result["status"] = "ok"
+    return result
+
+
+def write_results(path, rows, param_names):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_COLS[:2] + param_names + RESULT_COLS[2:])
+        writer.writeheader()
+        for row in sorted(rows, key=lambda r: r.get("total_val_loss", float("inf"))):
+            writer.writerow(row)
+
+
+if __name__ == "__main__":
+    arguments = argparse.ArgumentParser()
+    arguments.add_argument("--task", choices=["maneuver", "combat"], required=True)
+    arguments.add_argument("--store", default=None, help="dataset store to train on (default: ingest data/<task>.csv into <out>/store)")
+    arguments.add_argument("--out", default=None)
+    arguments.add_argument("--search", choices=["grid", "random"], default="grid")
+    arguments.add_argument("--trials", type=int, default=10, help="configs sampled from the grid for --search random")
+    arguments.add_argument("--workers", type=int, default=None, help="concurrent trials (default cpus // threads)")
+    arguments.add_argument("--threads", type=int, default=1, help="torch/BLAS threads per trial")
+    arguments.add_argument("--epochs", type=int, default=200)
+    arguments.add_argument("--patience", type=int, default=20, help="nf_train early stopping; 0 runs every trial to --epochs")
+    arguments.add_argument("--seed", type=int, default=0)
+    arguments.add_argument("--keep", type=int, default=3, help="keep the bundles of this many best trials")
+    arguments.add_argument("--install", action="store_true", help="copy the best bundle to models/<task>.pt")
+    arguments.add_argument("--eval", action="store_true", help="rank the kept bundles in game (nf_eval.py) and pick best.pt by score")
+    arguments.add_argument("--eval_time_limit", type=float, default=None, help="per-scenario time limit for --eval")
+    arguments.add_argument("--num_mfs", type=int, nargs="+", default=[2, 3])
+    arguments.add_argument("--lr", type=float, nargs="+", default=[0.01, 0.003])
+    arguments.add_argument("--batch_size", type=int, nargs="+", default=[64])
+    arguments.add_argument("--rule_base", nargs="+", choices=["grid", "sparse", "hierarchical"], default=["grid"])
+    arguments.add_argument("--num_rules", type=int, nargs="+", default=[None], help="only used with --rule_base sparse")
+    arguments.add_argument("--joint", type=int, nargs="+", choices=[0, 1], default=[0])
+    arguments.add_argument("--robust", type=int, nargs="+", choices=[0, 1], default=[0])
+    args = arguments.parse_args()
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    out_dir = os.path.abspath(args.out or os.path.join(base_dir, "sweeps", f"{args.task}_{time.strftime('%Y%m%d-%H%M%S')}"))
+    os.makedirs(out_dir, exist_ok=True)
+
+    # Ingest the CSV once; every trial memory-maps the same chunks
+    if args.store:
+        store_path = os.path.abspath(args.store)
+    else:
+        store_path = os.path.join(out_dir, "store")
+        ingest(store_path, [os.path.join(base_dir, "data", f"{args.task}.csv")], task=args.task)
+    store = DatasetStore(store_path)
+    print(f"Training data: {store_path} ({store.num_rows} rows)")
+
+    grid = {name: getattr(args, name) for name in SWEEP_PARAMS}
+    configs = trial_configs(grid, args.search, args.trials, args.seed)
+    workers = args.workers or max(1, (os.cpu_count() or 1) // args.threads)
+    print(f"{len(configs)} trials, {workers} at a time, {args.threads} thread(s) each")
+
+    rows = []
+    results_path = os.path.join(out_dir, "results.csv")
+    param_names = list(SWEEP_PARAMS)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for trial, config in enumerate(configs):
+            model_out = os.path.join(out_dir, f"trial_{trial:03d}.pt")
+            cmd = train_command(args.task, store_path, config, args.epochs, args.patience, args.threads,
+                                args.seed, model_out, os.path.join(out_dir, f"trial_{trial:03d}.json"))
+            futures[pool.submit(run_trial, trial, cmd, out_dir, args.threads)] = (trial, config)
+
+        for future in as_completed(futures):
+            trial, config = futures[future]
+            result = future.result()
+            row = dict(config, trial=trial, status=result["status"], seconds=round(result["seconds"], 1))
+            if result["status"] == "ok":
+                row.update(total_val_loss=result["total_val_loss"],
+                           val_loss=json.dumps(result["val_loss"]), epochs=json.dumps(result["epochs"]))
+            rows.append(row)
+            write_results(results_path, rows, param_names)  # rewritten after every trial, so a partial sweep is usable
+            print(f"trial {trial:03d} {result['status']}: {row.get('total_val_loss', float('nan')):.6f} "
+                  f"({row['seconds']}s) {config}")
+
+    ranked = sorted((r for r in rows if r["status"] == "ok"), key=lambda r: r["total_val_loss"])
+    for r in ranked[args.keep:]:
+        os.remove(os.path.join(out_dir, f"trial_{r['trial']:03d}.pt"))
+    if not ranked:
+        raise SystemExit(f"No trial finished, see the logs in {out_dir}")
+
+    best = ranked[0]
+    if args.eval:
+        from nf_eval import evaluate, print_table, write_table
+        kept = {os.path.join(out_dir, f"trial_{r['trial']:03d}.pt"): r for r in ranked[:args.keep]}
+        print(f"\nPlaying the {len(kept)} best bundles through the scenario suite")
+        eval_rows = evaluate(list(kept), workers=args.workers, time_limit=args.eval_time_limit, seed=args.seed)
+        print_table(eval_rows)
+        write_table(os.path.join(out_dir, "eval.csv"), eval_rows)
+        best = kept[eval_rows[0]["bundle"]]
+    best_path = os.path.join(out_dir, "best.pt")
+    shutil.copyfile(os.path.join(out_dir, f"trial_{best['trial']:03d}.pt"), best_path)
+    print(f"\nBest trial {best['trial']:03d}: val loss {best['total_val_loss']:.6f}, "
+          f"{ {k: best[k] for k in param_names if best[k] is not None} }")
+    print(f"Results in {results_path}, best bundle {best_path}")
+    if args.install:
+        # A joint bundle is still one task's outputs, so it replaces models/<task>.pt
+        target = os.path.join(base_dir, "models", f"{args.task}.pt")
+        shutil.copyfile(best_path, target)
+        print(f"Installed as {target}")
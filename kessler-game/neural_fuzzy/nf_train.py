@@ -3,9 +3,10 @@ import pandas as pd
 import torch
 import torch.nn as nn
 from torch.utils.data import DataLoader, TensorDataset, random_split
-import argparse,os,json
+import argparse,os,json,time
 
 from sugeno_nn import GaussianMF, SugenoNet,RuleLayer
+from nf_dataset import DatasetStore, RunningStats
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 os.chdir(script_dir)
@@ -19,14 +20,34 @@ Saves the trained models as a bundle for later inference.
 
 # CLI stuff
 arguments = argparse.ArgumentParser()
-arguments.add_argument("--task", choices=["maneuver", "combat"], required=True)
+arguments.add_argument("--task", choices=["maneuver", "combat", "all"], required=True, help="all = maneuver + combat outputs, always --joint")
 arguments.add_argument("--num_mfs", type=int, default=2)
 arguments.add_argument("--epochs", type=int, default=200)
 arguments.add_argument("--batch_size", type=int, default=64)
 arguments.add_argument("--lr", type=float, default=0.01)
 arguments.add_argument("--val_frac", type=float, default=0.1)
+arguments.add_argument("--store", default=None, help="columnar dataset dir from nf_dataset.py; streams batches instead of loading one CSV")
+arguments.add_argument("--robust", action="store_true", help="clip features to their 0.5%%/99.5%% quantiles before normalizing")
+arguments.add_argument("--rule_base", choices=["grid", "sparse", "hierarchical"], default="grid", help="grid has num_mfs^num_inputs rules; sparse/hierarchical scale polynomially")
+arguments.add_argument("--num_rules", type=int, default=None, help="rule count for --rule_base sparse (default 2*inputs*mfs)")
+arguments.add_argument("--cluster_init", action="store_true", help="initialize sparse rules by k-means on the training features")
+arguments.add_argument("--linear_space", action="store_true", help="use the original product/ratio rule strengths instead of log space")
+arguments.add_argument("--joint", action="store_true", help="one multi-head SugenoNet with shared MF/rule layers instead of one net per output")
+arguments.add_argument("--workers", type=int, default=0, help="worker processes for the --store statistics pass")
+arguments.add_argument("--patience", type=int, default=0, help="stop a net after this many epochs without a better val loss (0 = run all epochs)")
+arguments.add_argument("--threads", type=int, default=0, help="torch intra-op threads (0 = torch default)")
+arguments.add_argument("--seed", type=int, default=None)
+arguments.add_argument("--model_out", default=None, help="bundle path (default models/<task>.pt)")
+arguments.add_argument("--results_json", default=None, help="write best val losses / epochs run here (used by nf_sweep.py)")
 args = arguments.parse_args()
 
+if args.threads:
+    torch.set_num_threads(args.threads)
+if args.seed is not None:
+    torch.manual_seed(args.seed)
+    np.random.seed(args.seed)
+start_time = time.time()
+
 
 #FOlders and paths
 base_dir = os.path.dirname(os.path.abspath(__file__))
@@ -37,62 +58,121 @@ os.makedirs(model_dir, exist_ok=True)
 
 if args.task == "maneuver":
     args.csv = os.path.join(data_dir, "maneuver.csv")
-    args.model_out = os.path.join(model_dir, "maneuver.pt")
-else:
+    args.model_out = args.model_out or os.path.join(model_dir, "maneuver.pt")
+elif args.task == "combat":
     args.csv = os.path.join(data_dir, "combat.csv")
-    args.model_out = os.path.join(model_dir, "combat.pt")
-
-# Load dataset
-df = pd.read_csv(args.csv)
-print(f"Loaded dataset from {args.csv} with shape {df.shape}")
+    args.model_out = args.model_out or os.path.join(model_dir, "combat.pt")
+else:
+    # Both loggers write one row per frame, so the two CSVs line up row by row
+    args.csv = [os.path.join(data_dir, "maneuver.csv"), os.path.join(data_dir, "combat.csv")]
+    args.model_out = args.model_out or os.path.join(model_dir, "all.pt")
+    args.joint = True
 
 # point the script at the right CSV depending on --task ag
+loss_fns = {'thrust': nn.MSELoss(), 'turn_rate': nn.MSELoss(),
+            'fire': nn.BCEWithLogitsLoss(), 'drop_mine': nn.BCEWithLogitsLoss()}
 if args.task == "maneuver":
     output_cols = ['thrust', 'turn_rate']
-    loss_fn = nn.MSELoss()
-else:
+elif args.task == "combat":
     output_cols = ['fire', 'drop_mine']
-    loss_fn = nn.BCEWithLogitsLoss()
-
-feature_cols = [c for c in df.columns if c not in output_cols]
-
-X = df[feature_cols].values.astype("float32")
-Y = df[output_cols].values.astype("float32")
-
-# Normalize inputs
-mu = X.mean(axis=0)
-sd = X.std(axis=0) + 1e-6
-X = (X - mu) / sd
-
-# Convert to tensors (basically multi dimension array)
-X_tensor = torch.tensor(X, dtype=torch.float32)
-Y_tensor = torch.tensor(Y, dtype=torch.float32)
-
-dataset = TensorDataset(X_tensor, Y_tensor)
-n_total = len(dataset)
-n_val = int(n_total * args.val_frac)
-n_train = n_total - n_val
-train_ds, val_ds = random_split(dataset, [n_train, n_val])
-
-train_loader = DataLoader(train_ds, batch_size=args.batch_size, shuffle=True)
-val_loader = DataLoader(val_ds, batch_size=args.batch_size, shuffle=False)
-
-num_inputs = X.shape[1]
+else:
+    output_cols = ['thrust', 'turn_rate', 'fire', 'drop_mine']
+
+if args.store and args.task == "all":
+    raise SystemExit("--task all reads the paired maneuver/combat CSVs; train --store data per task with --joint")
+if args.store:
+    # Stream mini-batches from the chunked store; only one chunk is in memory at a time
+    store = DatasetStore(args.store)
+    if store.target_cols != output_cols:
+        raise SystemExit(f"Store {args.store} holds {store.task} data, not {args.task}")
+    print(f"Opened dataset store {args.store} with {store.num_rows} rows in {len(store.meta['chunks'])} chunks")
+    feature_cols = store.feature_cols
+
+    # Normalization stats over the training rows, streamed one chunk at a time
+    stats = store.stats(subset="train", val_frac=args.val_frac, workers=args.workers)
+    clip = stats.clip_range() if args.robust else None
+    norm_stats = store.stats(subset="train", val_frac=args.val_frac, workers=args.workers, clip=clip) if args.robust else stats
+    mu = norm_stats.mean.astype("float32")
+    sd = (norm_stats.std + 1e-6).astype("float32")
+
+    train_loader = store.batches(args.batch_size, mu, sd, shuffle=True, subset="train", val_frac=args.val_frac, transform=torch.from_numpy, clip=clip)
+    val_loader = store.batches(args.batch_size, mu, sd, shuffle=False, subset="val", val_frac=args.val_frac, transform=torch.from_numpy, clip=clip)
+    n_train = store.count("train", args.val_frac)
+    n_val = store.count("val", args.val_frac)
+    num_inputs = len(feature_cols)
+else:
+    # Load dataset
+    if args.task == "all":
+        man, com = pd.read_csv(args.csv[0]), pd.read_csv(args.csv[1])
+        shared_cols = [c for c in man.columns if c in com.columns]
+        if len(man) != len(com) or not man[shared_cols].equals(com[shared_cols]):
+            raise SystemExit(f"{args.csv[0]} and {args.csv[1]} are not row-aligned, can't train all outputs jointly")
+        df = pd.concat([man, com[['fire', 'drop_mine']]], axis=1)
+    else:
+        df = pd.read_csv(args.csv)
+    print(f"Loaded dataset from {args.csv} with shape {df.shape}")
+
+    feature_cols = [c for c in df.columns if c not in output_cols]
+
+    X = df[feature_cols].values.astype("float32")
+    Y = df[output_cols].values.astype("float32")
+
+    # Normalize inputs
+    stats = RunningStats(X.shape[1]).update(X)
+    clip = stats.clip_range() if args.robust else None
+    if args.robust:
+        X = np.clip(X, clip[0].astype("float32"), clip[1].astype("float32"))
+        norm_stats = RunningStats(X.shape[1]).update(X)
+    else:
+        norm_stats = stats
+    mu = norm_stats.mean.astype("float32")
+    sd = (norm_stats.std + 1e-6).astype("float32")
+    X = (X - mu) / sd
+
+    # Convert to tensors (basically multi dimension array)
+    X_tensor = torch.tensor(X, dtype=torch.float32)
+    Y_tensor = torch.tensor(Y, dtype=torch.float32)
+
+    dataset = TensorDataset(X_tensor, Y_tensor)
+    n_total = len(dataset)
+    n_val = int(n_total * args.val_frac)
+    n_train = n_total - n_val
+    train_ds, val_ds = random_split(dataset, [n_train, n_val])
+
+    train_loader = DataLoader(train_ds, batch_size=args.batch_size, shuffle=True)
+    val_loader = DataLoader(val_ds, batch_size=args.batch_size, shuffle=False)
+
+    num_inputs = X.shape[1]
 
 
 bundle = {"task": args.task, "heads": {}}
+results = {"val_loss": {}, "epochs": {}}
 
-for output_idx, output_name in enumerate(output_cols):
+# Each group is trained as one net: a group per output, or one shared multi-head group with --joint
+groups = [output_cols] if args.joint else [[c] for c in output_cols]
+
+for group in groups:
     print(f"\n{'='*60}") #Fancy
-    print(f"Training model for: {output_name}")
+    print(f"Training model for: {', '.join(group)}")
     print(f"{'='*60}") #More fanciness
-    
-    # Create a new model for this output
-    model = SugenoNet(num_inputs=num_inputs, num_mfs=args.num_mfs, num_outputs=1)
+    output_idx = [output_cols.index(c) for c in group]
+
+    def group_loss(pred, yb):
+        # Sum of each output's own loss (MSE for maneuver, BCE for combat)
+        return sum(loss_fns[c](pred[:, j], yb[:, i]) for j, (c, i) in enumerate(zip(group, output_idx)))
+
+    # Create a new model for this output (or all outputs, sharing MF and rule layers)
+    model = SugenoNet(num_inputs=num_inputs, num_mfs=args.num_mfs, num_outputs=len(group),
+                      rule_base=args.rule_base, num_rules=args.num_rules, log_space=not args.linear_space)
+    if args.cluster_init and args.rule_base == "sparse":
+        # Cluster the stats row sample, normalized the same way as the training batches
+        sample = stats.sample if clip is None else np.clip(stats.sample, clip[0], clip[1])
+        model.init_rules_from_data((sample - mu) / sd)
     opt = torch.optim.Adam(model.parameters(), lr=args.lr)
     
     best_val_loss = float("inf")
     best_state = None
+    best_epoch = 0
     
     for epoch in range(1, args.epochs + 1):
         model.train()
@@ -100,8 +180,8 @@ for output_idx, output_name in enumerate(output_cols):
         for xb, yb in train_loader:
             yb = yb.to(model.device)
             xb = xb.to(model.device)
-            pred = model(xb).squeeze(1)
-            loss = loss_fn(pred, yb[:, output_idx])
+            pred = model(xb)
+            loss = group_loss(pred, yb)
             opt.zero_grad()
             loss.backward()
             opt.step()
@@ -115,8 +195,8 @@ for output_idx, output_name in enumerate(output_cols):
             for xb, yb in val_loader:
                 yb = yb.to(model.device)
                 xb = xb.to(model.device)
-                pred = model(xb).squeeze(1)
-                loss = loss_fn(pred, yb[:, output_idx])
+                pred = model(xb)
+                loss = group_loss(pred, yb)
                 total_val += loss.item() * xb.size(0)
         avg_val = total_val / n_val
 
@@ -127,22 +207,43 @@ for output_idx, output_name in enumerate(output_cols):
         if avg_val < best_val_loss:
             best_val_loss = avg_val
             best_state = {k: v.detach().cpu() for k, v in model.state_dict().items()}
+            best_epoch = epoch
+        elif args.patience and epoch - best_epoch >= args.patience:
+            print(f"[{epoch:03d}] No improvement for {args.patience} epochs, stopping")
+            break
     
-    print(f"Best validation loss for {output_name}: {best_val_loss:.6f}")
+    print(f"Best validation loss for {', '.join(group)}: {best_val_loss:.6f}")
+    results["val_loss"][", ".join(group)] = best_val_loss
+    results["epochs"][", ".join(group)] = epoch
     
-    # Add to bundle
-    bundle["heads"][output_name] = {
+    info = {
         "state_dict": best_state, #The trained parameters
         "feature_cols": feature_cols,#The features used
         "mu": mu.tolist(),#The means for normalization
         "sd": sd.tolist(),#The stddevs for normalization
+        "clip": [clip[0].tolist(), clip[1].tolist()] if clip is not None else None,#Clip range applied before normalizing (--robust)
+        "stats": stats.to_dict(),#Count/mean/std/min/max/quantiles of the raw training features
         "num_inputs": int(num_inputs),# of input features
-        "num_mfs": int(args.num_mfs)# of MFs per input
+        "num_mfs": int(args.num_mfs),# of MFs per input
+        "rule_base": args.rule_base,#grid / sparse / hierarchical
+        "num_rules": int(model.num_rules),
+        "log_space": not args.linear_space
     }
+    # Add to bundle
+    if args.joint:
+        bundle["shared"] = dict(info, outputs=list(group))#one net, output column i is outputs[i]
+    else:
+        bundle["heads"][group[0]] = info
 
 # Save the complete bundle with all trained models
 torch.save(bundle, args.model_out)
 print(f"\n{'='*60}")#Fancy
 print(f"Saved complete model bundle to {args.model_out}")
-print(f"Contains models for: {list(bundle['heads'].keys())}")
-print(f"{'='*60}")
\ No newline at end of file
+print(f"Contains models for: {bundle['shared']['outputs'] if args.joint else list(bundle['heads'].keys())}")
+print(f"{'='*60}")
+
+if args.results_json:
+    results.update(total_val_loss=sum(results["val_loss"].values()), seconds=time.time() - start_time,
+                   model_out=args.model_out, num_rules=int(model.num_rules))
+    with open(args.results_json, "w") as f:
+        json.dump(results, f, indent=2)
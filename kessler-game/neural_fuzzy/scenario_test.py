@@ -14,6 +14,8 @@ from human_xbox_controller import HumanXboxController
 #SCENARIOa = sc.giants_with_kamikaze()
 #SCENARIO = sc.donut_ring_closing()
 #SCENARIO = sc.moving_maze_right()
+#SCENARIO = sc.stress_1k()
+#SCENARIO = sc.ffa_8()
 SCENARIO = sc.four_corner()
 game_settings = {
     'perf_tracker': True,
@@ -9,8 +9,26 @@ Gaussian Membership Function Layer:
 
 RuleLayer:
     Purpose: To compute the firing strength of fuzzy rules based on the membership degrees from the MF layer.
+    Full grid: one rule per combination of MFs, num_mfs ** num_inputs rules.
+SparseRuleLayer:
+    Purpose: A fixed number of learned rules. Each rule softly picks one MF (or "don't care") per input,
+    so cost is num_rules * num_inputs * num_mfs instead of exponential. Can be initialized by clustering data.
+HierarchicalFIS:
+    Purpose: A cascade of 2-input Sugeno systems, stage k combines the previous stage's output with input k+1,
+    (num_inputs - 1) * num_mfs ** 2 rules in total.
 Sugeno Layer: tweak the sigma and the center values
 
+SugenoNet(rule_base="grid" | "sparse" | "hierarchical") picks the rule structure.
+SugenoNet(num_outputs > 1) is multi-head: MF and rule layers are shared, each output has its own consequent
+matrix, so one forward pass gives every output.
+
+Log space (SugenoNet(log_space=True), the default for new models):
+    Gaussian memberships are kept as log-memberships -0.5 * ((x - c) / s)^2, a rule's log strength is a sum
+    instead of a product (one matmul with a 0/1 rule matrix, no (B, rules, inputs) tensor), and the Sugeno
+    layer normalizes with softmax/logsumexp. Nothing underflows when many inputs are far from every MF.
+    log_space=False keeps the original product path, which older model bundles were trained with.
+    bench_rule_layer.py compares the two.
+
     
 
 """
@@ -40,6 +58,9 @@ class GaussianMF(nn.Module):
         mu = torch.exp(-0.5 * ((x - c) / s) ** 2)
         return mu 
 
+    def log_forward(self, x):
+        return -0.5 * ((x.unsqueeze(1) - self.centers.unsqueeze(0)) / self.log_sigmas.exp().unsqueeze(0)) ** 2
+
 
 
 
@@ -52,6 +73,12 @@ class RuleLayer(nn.Module):#vectorized rule layer
             # Keep as buffer so it moves with model.to(device)
             self.register_buffer('rule_indices', 
                 torch.tensor(list(itertools.product(range(num_mfs), repeat=num_input))))
+            # (num_input * num_mfs, num_rules) 0/1 matrix, column r marks the MFs rule r uses.
+            # Derived from rule_indices, so not saved in the state dict (old bundles still load)
+            onehot = torch.zeros(num_input * num_mfs, self.num_rules)
+            flat = self.rule_indices + torch.arange(num_input).unsqueeze(0) * num_mfs
+            onehot.scatter_(0, flat.T, 1.0)
+            self.register_buffer('rule_matrix', onehot, persistent=False)
 
 
     def forward(self, mf_outputs):
@@ -65,16 +92,94 @@ class RuleLayer(nn.Module):#vectorized rule layer
         rule_strengths = gathered.prod(dim=-1)  # (B, num_rules)
         return rule_strengths
 
+    def log_forward(self, log_mf):
+        # log_mf: (B, num_input, num_mfs) -> (B, num_rules) log strengths, one matmul
+        return log_mf.reshape(log_mf.shape[0], -1) @ self.rule_matrix
+
     
 
+class SparseRuleLayer(nn.Module):
+    def __init__(self, num_input, num_mfs, num_rules):
+        super().__init__()
+        self.num_input = num_input
+        self.num_mfs = num_mfs
+        self.num_rules = num_rules
+        # Per rule and input: logits over the num_mfs MFs plus a last "don't care" slot (membership 1)
+        self.logits = nn.Parameter(0.1 * torch.randn(num_rules, num_input, num_mfs + 1))
+
+    def forward(self, mf_outputs):
+        mf_stack = torch.stack(mf_outputs, dim=1)  # (B, num_input, num_mfs)
+        ones = mf_stack.new_ones(mf_stack.shape[0], self.num_input, 1)
+        mf_ext = torch.cat([mf_stack, ones], dim=-1)  # (B, num_input, num_mfs + 1)
+        select = torch.softmax(self.logits, dim=-1)  # (num_rules, num_input, num_mfs + 1)
+        per_input = torch.einsum("bnm,rnm->brn", mf_ext, select)  # (B, num_rules, num_input)
+        return per_input.prod(dim=-1)  # (B, num_rules)
+
+    def log_forward(self, log_mf):
+        # log_mf: (B, num_input, num_mfs). The per-input mixture is a logsumexp over MFs (+ "don't care" = log 1)
+        zeros = log_mf.new_zeros(log_mf.shape[0], self.num_input, 1)
+        log_mf_ext = torch.cat([log_mf, zeros], dim=-1)  # (B, num_input, num_mfs + 1)
+        log_select = torch.log_softmax(self.logits, dim=-1)  # (num_rules, num_input, num_mfs + 1)
+        # max-shifted so the mixture is a plain einsum of values in [0, 1]
+        shift = log_mf_ext.max(dim=-1, keepdim=True).values  # (B, num_input, 1)
+        mix = torch.einsum("bnm,rnm->brn", (log_mf_ext - shift).exp(), log_select.exp())
+        return (mix.clamp_min(torch.finfo(mix.dtype).tiny).log() + shift.squeeze(-1).unsqueeze(1)).sum(dim=-1)
+
+    def rule_indices(self):
+        #Readable rule base: MF index per (rule, input), -1 = input not used by the rule
+        idx = self.logits.argmax(dim=-1)
+        return torch.where(idx == self.num_mfs, torch.full_like(idx, -1), idx)
+
+    def set_rules(self, indices, confidence=4.0):
+        #indices: (num_rules, num_input) MF index per rule and input (-1 = don't care)
+        indices = torch.as_tensor(indices, dtype=torch.long, device=self.logits.device)
+        indices = torch.where(indices < 0, torch.full_like(indices, self.num_mfs), indices)
+        with torch.no_grad():
+            self.logits.zero_()
+            self.logits.scatter_(-1, indices.unsqueeze(-1), confidence)
+
+
+class HierarchicalFIS(nn.Module):
+    def __init__(self, num_inputs, num_mfs, log_space=True, num_outputs=1):
+        super().__init__()
+        self.num_inputs = num_inputs
+        self.num_mfs = num_mfs
+        self.log_space = log_space
+        # Stage 0 takes x0 (and x1); stage k takes the output of stage k-1 and x(k+1)
+        stage_inputs = [min(2, num_inputs)] + [2] * max(0, num_inputs - 2)
+        self.mf_layers = nn.ModuleList([
+            nn.ModuleList([GaussianMF(f"stage{k}_input_{i}", num_mfs) for i in range(n)])
+            for k, n in enumerate(stage_inputs)])
+        self.rule_layers = nn.ModuleList([RuleLayer(n, num_mfs) for n in stage_inputs])
+        # Intermediate stages have one output feeding the next stage; the last one has all outputs
+        self.sugeno_layers = nn.ModuleList([SugenoLayer(num_mfs ** n, n, num_outputs if k == len(stage_inputs) - 1 else 1)
+                                            for k, n in enumerate(stage_inputs)])
+        self.num_rules = sum(num_mfs ** n for n in stage_inputs)
+
+    def forward(self, x):
+        y = None
+        for k, (mfs, rules, sugeno) in enumerate(zip(self.mf_layers, self.rule_layers, self.sugeno_layers)):
+            stage_x = x[:, :len(mfs)] if k == 0 else torch.stack([y, x[:, k + 1]], dim=1)
+            if self.log_space:
+                log_mf = torch.stack([mf.log_forward(stage_x[:, i]) for i, mf in enumerate(mfs)], dim=1)
+                y = sugeno.log_forward(rules.log_forward(log_mf), stage_x)
+            else:
+                mf_outputs = [mf(stage_x[:, i]) for i, mf in enumerate(mfs)]
+                y = sugeno(rules(mf_outputs), stage_x)
+        return y  # (B,) or (B, num_outputs)
+
+
 class SugenoLayer(nn.Module):
-    def __init__(self, num_rules, num_inputs):
+    def __init__(self, num_rules, num_inputs, num_outputs=1):
         super().__init__()
         self.num_rules = num_rules
         self.num_inputs = num_inputs
+        self.num_outputs = num_outputs
 
         #Consequent parameters: each rule has a linear function of inputs + bias
-        self.consequents = nn.Parameter(torch.randn(num_rules, num_inputs + 1)) #+1 for bias term
+        #(num_rules, num_inputs + 1) for one output, (num_outputs, num_rules, num_inputs + 1) for several
+        shape = (num_rules, num_inputs + 1) if num_outputs == 1 else (num_outputs, num_rules, num_inputs + 1)
+        self.consequents = nn.Parameter(torch.randn(*shape)) #+1 for bias term
 
 
 
@@ -82,6 +187,10 @@ class SugenoLayer(nn.Module):
     #inputs: (batch_size, num_inputs)
     def forward(self, rule_strengths, inputs):
         batch_size = inputs.shape[0]
+        if self.num_outputs > 1:
+            rule_outputs = self.rule_outputs(inputs) #(batch_size, num_outputs, num_rules)
+            weighted_outputs = rule_strengths.unsqueeze(1) * rule_outputs
+            return weighted_outputs.sum(dim=-1) / (rule_strengths.sum(dim=1, keepdim=True) + 1e-6) #(batch_size, num_outputs)
 
         #bias term to inputs
         inputs_with_bias = torch.cat([inputs, torch.ones(batch_size, 1, device=inputs.device)], dim=1) #(batch_size, num_inputs + 1)
@@ -94,24 +203,107 @@ class SugenoLayer(nn.Module):
         output = torch.sum(weighted_outputs, dim=1) / (torch.sum(rule_strengths, dim=1) + 1e-6) #(batch_size,)
 
         return output
+
+    #log_strengths: (batch_size, num_rules) log firing strengths
+    def log_forward(self, log_strengths, inputs):
+        rule_outputs = self.rule_outputs(inputs) #(batch_size, num_rules) or (batch_size, num_outputs, num_rules)
+        weights = torch.softmax(log_strengths, dim=1) #normalized strengths, exp(log_w - logsumexp(log_w))
+        if self.num_outputs > 1:
+            weights = weights.unsqueeze(1)
+        return (weights * rule_outputs).sum(dim=-1) #(batch_size,) or (batch_size, num_outputs)
+
+    def rule_outputs(self, inputs):
+        #Linear consequent of every rule (and output) at the given inputs
+        c = self.consequents
+        if self.num_outputs == 1:
+            return inputs @ c[:, :-1].T + c[:, -1] #(batch_size, num_rules)
+        return torch.einsum("bf,orf->bor", inputs, c[..., :-1]) + c[..., -1] #(batch_size, num_outputs, num_rules)
     
 
+RULE_BASES = ("grid", "sparse", "hierarchical")
+
+
 class SugenoNet(nn.Module):
-    def __init__(self, num_inputs, num_mfs, num_outputs):
+    def __init__(self, num_inputs, num_mfs, num_outputs, rule_base="grid", num_rules=None, log_space=True):
         super().__init__()
+        if rule_base not in RULE_BASES:
+            raise ValueError(f"Unknown rule_base '{rule_base}', use one of {RULE_BASES}")
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        #module lists for MF layers
-        self.mf_layers = nn.ModuleList([GaussianMF(f"input_{i}", num_mfs) for i in range(num_inputs)])
-        
-        
-        self.rule_layer = RuleLayer(num_inputs, num_mfs)#number of rules = num_mfs^num_inputs
-        self.sugeno_layer = SugenoLayer(num_rules=num_mfs ** num_inputs, num_inputs=num_inputs)
+        self.rule_base = rule_base
+        self.log_space = log_space
+        self.num_outputs = num_outputs
+
+        if rule_base == "hierarchical":
+            self.cascade = HierarchicalFIS(num_inputs, num_mfs, log_space, num_outputs)
+            self.num_rules = self.cascade.num_rules
+        else:
+            #module lists for MF layers
+            self.mf_layers = nn.ModuleList([GaussianMF(f"input_{i}", num_mfs) for i in range(num_inputs)])
+            if rule_base == "grid":
+                self.num_rules = num_mfs ** num_inputs
+                self.rule_layer = RuleLayer(num_inputs, num_mfs)#number of rules = num_mfs^num_inputs
+            else:
+                self.num_rules = int(num_rules) if num_rules else 2 * num_inputs * num_mfs
+                self.rule_layer = SparseRuleLayer(num_inputs, num_mfs, self.num_rules)
+            self.sugeno_layer = SugenoLayer(num_rules=self.num_rules, num_inputs=num_inputs, num_outputs=num_outputs)
         self.to(self.device)
-        print(f"device: {self.device}")
+        print(f"device: {self.device}, rule base: {rule_base} ({self.num_rules} rules)")
 
 
     def forward(self, x):
-        mf_outputs = [mf(x[:, i]) for i, mf in enumerate(self.mf_layers)]#get MF outputs for each input
-        rule_strengths = self.rule_layer(mf_outputs)#get rule strengths
-        y = self.sugeno_layer(rule_strengths, x)#get final output
-        return y.unsqueeze(1)  #(batch_size, 1)
+        if self.rule_base == "hierarchical":
+            y = self.cascade(x)
+        elif self.log_space:
+            log_strengths = self.rule_layer.log_forward(self.log_memberships(x))
+            y = self.sugeno_layer.log_forward(log_strengths, x)
+        else:
+            mf_outputs = [mf(x[:, i]) for i, mf in enumerate(self.mf_layers)]#get MF outputs for each input
+            rule_strengths = self.rule_layer(mf_outputs)#get rule strengths
+            y = self.sugeno_layer(rule_strengths, x)#get final output
+        return y.unsqueeze(1) if self.num_outputs == 1 else y  #(batch_size, num_outputs)
+
+
+    def log_memberships(self, x):
+        #(B, num_inputs, num_mfs) log-memberships of every input in one expression
+        c = torch.stack([mf.centers for mf in self.mf_layers])  # (num_inputs, num_mfs)
+        s = torch.stack([mf.log_sigmas for mf in self.mf_layers]).exp()
+        return -0.5 * ((x.unsqueeze(-1) - c) / s) ** 2
+
+
+    def init_rules_from_data(self, x, y=None, iters=25, seed=0):
+        """
+        Clustering-initialized rules (sparse rule base only): k-means on normalized inputs with one cluster
+        per rule, each rule takes the MF nearest to its cluster center on every input. If targets y are
+        given, each rule's consequent starts as the mean target of its cluster.
+        """
+        if self.rule_base != "sparse":
+            raise ValueError("init_rules_from_data needs rule_base='sparse'")
+        x = torch.as_tensor(x, dtype=torch.float32, device=self.device)
+        keep = ~torch.isnan(x).any(dim=1)
+        x = x[keep]
+        if len(x) == 0:
+            return
+        gen = torch.Generator(device="cpu").manual_seed(seed)
+        centers = x[torch.randint(len(x), (self.num_rules,), generator=gen).to(x.device)].clone()
+        for _ in range(iters):
+            assign = torch.cdist(x, centers).argmin(dim=1)
+            for r in range(self.num_rules):
+                members = x[assign == r]
+                if len(members):
+                    centers[r] = members.mean(dim=0)
+        with torch.no_grad():
+            mf_centers = torch.stack([mf.centers for mf in self.mf_layers])  # (num_inputs, num_mfs)
+            indices = (centers.unsqueeze(-1) - mf_centers.unsqueeze(0)).abs().argmin(dim=-1)  # (num_rules, num_inputs)
+            self.rule_layer.set_rules(indices)
+            if y is not None:
+                y = torch.as_tensor(y, dtype=torch.float32, device=self.device).reshape(len(keep), -1)[keep]  # (N, num_outputs)
+                assign = torch.cdist(x, centers).argmin(dim=1)
+                c = self.sugeno_layer.consequents
+                c.zero_()
+                for r in range(self.num_rules):
+                    if (assign == r).any():
+                        mean = y[assign == r].mean(dim=0)
+                        if self.num_outputs == 1:
+                            c[r, -1] = mean[0]
+                        else:
+                            c[:, r, -1] = mean
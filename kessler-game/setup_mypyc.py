@@ -32,9 +32,13 @@ mypyc_modules = [
 #    "src/kesslergame/controller.py", DO NOT compile the controller.py, because adding the ship_id attribute from the derived class gets really messy and buggy
 #    "src/kesslergame/controller_gamepad.py",
     "src/kesslergame/kessler_game.py",
+    "src/kesslergame/lookahead.py",
     "src/kesslergame/scenario.py",
+    "src/kesslergame/compiled_scenario.py",
+    "src/kesslergame/scenario_generator.py",
     "src/kesslergame/score.py",
     "src/kesslergame/settings_dicts.py",
+    "src/kesslergame/spatial_index.py",
     "src/kesslergame/ship.py",
     "src/kesslergame/state_models.py",
     "src/kesslergame/team.py",
@@ -43,6 +47,7 @@ mypyc_modules = [
     "src/kesslergame/graphics/graphics_plt.py",
     "src/kesslergame/graphics/graphics_tk.py",
     "src/kesslergame/graphics/graphics_ue.py",
+    "src/kesslergame/graphics/graphics_video.py",
     "src/kesslergame/__init__.py",
     "src/kesslergame/graphics/__init__.py",
 ]
@@ -8,10 +8,12 @@ from .kessler_game import KesslerGame, TrainerEnvironment
 from .controller import KesslerController
 from .controller_gamepad import GamepadController
 from .scenario import Scenario
+from .compiled_scenario import CompiledScenario
+from .lookahead import Lookahead, Rollout
 from .score import Score
 from .graphics import GraphicsType, KesslerGraphics
 from ._version import __version__
 
 
-__all__ = ['KesslerGame', 'TrainerEnvironment', 'KesslerController', 'Scenario', 'Score', 'GraphicsType',
-           'KesslerGraphics', 'GamepadController']
+__all__ = ['KesslerGame', 'TrainerEnvironment', 'KesslerController', 'Scenario', 'CompiledScenario', 'Score', 'GraphicsType',
+           'KesslerGraphics', 'GamepadController', 'Lookahead', 'Rollout']
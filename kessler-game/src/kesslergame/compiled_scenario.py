@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+from __future__ import annotations
+
+import hashlib
+import json
+import random
+import struct
+import sys
+from array import array
+from math import inf, isinf
+from typing import Any
+
+from .ship import Ship
+from .asteroid import Asteroid
+from .scenario import Scenario
+
+FORMAT_VERSION = 1
+BINARY_MAGIC = b'KSCN'
+# Columns of the asteroid array, one row of float64 per asteroid
+ASTEROID_FIELDS = ('x', 'y', 'vx', 'vy', 'speed', 'angle', 'turnrate', 'size')
+NUM_ASTEROID_FIELDS = len(ASTEROID_FIELDS)
+
+
+class CompiledScenario(Scenario):
+    def __init__(self, header: dict[str, Any], asteroid_data: bytes) -> None:
+        """
+        Immutable, fully resolved initial state of a Scenario. Asteroid positions, velocities and display spin are
+        generated and nudged once, and the random module's state after generation is recorded, so asteroids() and
+        ships() rebuild identical objects without regenerating anything, and seeded games play out exactly like the
+        source Scenario.
+
+        Build one with Scenario.compile() or CompiledScenario.load(), rather than calling this directly.
+
+        :param header: JSON-compatible description of everything except the asteroid array
+        :param asteroid_data: Native float64 bytes of the asteroid array, with NUM_ASTEROID_FIELDS values per asteroid
+        """
+        if header.get('format') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compiled scenario format {header.get('format')}, expected {FORMAT_VERSION}")
+        if len(asteroid_data) % (8 * NUM_ASTEROID_FIELDS) != 0:
+            raise ValueError("Asteroid data length is not a whole number of asteroid records")
+
+        self._header: dict[str, Any] = header
+        self._asteroid_data: bytes = bytes(asteroid_data)
+        self._asteroid_rows: tuple[tuple[float, ...], ...] = self._unpack_rows(self._asteroid_data)
+        rng_state = header.get('rng_state')
+        self._rng_state: tuple[Any, ...] | None = (rng_state[0], tuple(rng_state[1]), rng_state[2]) if rng_state is not None else None
+
+        time_limit = header['time_limit']
+        super().__init__(
+            name=header['name'],
+            asteroid_states=[{'position': (row[0], row[1]), 'size': int(row[7])} for row in self._asteroid_rows],
+            ship_states=[dict(state) for state in header['ships']],
+            map_size=(int(header['map_size'][0]), int(header['map_size'][1])),
+            seed=header['seed'],
+            time_limit=inf if time_limit is None else float(time_limit),
+            ammo_limit_multiplier=float(header['ammo_limit_multiplier']),
+            stop_if_no_ammo=bool(header['stop_if_no_ammo']),
+        )
+        self._max_asteroids: int = sum([Scenario.count_asteroids(int(row[7])) for row in self._asteroid_rows])
+        self._bullet_limit: int = super().bullet_limit
+        self._content_hash: str = self._compute_hash()
+
+    @staticmethod
+    def _unpack_rows(asteroid_data: bytes) -> tuple[tuple[float, ...], ...]:
+        values = array('d')
+        values.frombytes(asteroid_data)
+        return tuple(tuple(values[i:i + NUM_ASTEROID_FIELDS]) for i in range(0, len(values), NUM_ASTEROID_FIELDS))
+
+    @classmethod
+    def from_scenario(cls, scenario: Scenario) -> CompiledScenario:
+        """
+        Resolve every random and nudged value of a Scenario into a compiled scenario
+        """
+        if isinstance(scenario, CompiledScenario):
+            return scenario
+        asteroids = scenario.asteroids()
+        rng_state = random.getstate() if scenario.seed is not None else None
+        values = array('d')
+        for asteroid in asteroids:
+            values.extend((asteroid.x, asteroid.y, asteroid.vx, asteroid.vy, asteroid.speed, asteroid.angle, asteroid.turnrate, float(asteroid.size)))
+
+        header: dict[str, Any] = {
+            'format': FORMAT_VERSION,
+            'name': scenario.name,
+            'map_size': [scenario.map_size[0], scenario.map_size[1]],
+            'seed': scenario.seed,
+            'time_limit': None if isinf(scenario.time_limit) else scenario.time_limit,
+            'ammo_limit_multiplier': scenario._ammo_limit_multiplier,
+            'stop_if_no_ammo': scenario.stop_if_no_ammo,
+            'ships': [_json_ready(state) for state in scenario.ship_states],
+            'rng_state': [rng_state[0], list(rng_state[1]), rng_state[2]] if rng_state is not None else None,
+        }
+        return cls(header, values.tobytes())
+
+    @property
+    def content_hash(self) -> str:
+        """
+        SHA-256 of the canonical header and asteroid array, identical for the JSON and binary forms
+        """
+        return self._content_hash
+
+    def _compute_hash(self) -> str:
+        digest = hashlib.sha256()
+        digest.update(json.dumps(self._header, sort_keys=True, separators=(',', ':')).encode('utf-8'))
+        digest.update(self._little_endian_data())
+        return digest.hexdigest()
+
+    def _little_endian_data(self) -> bytes:
+        if sys.byteorder == 'little':
+            return self._asteroid_data
+        values = array('d')
+        values.frombytes(self._asteroid_data)
+        values.byteswap()
+        return values.tobytes()
+
+    @property
+    def is_random(self) -> bool:
+        return False
+
+    @property
+    def max_asteroids(self) -> int:
+        return self._max_asteroids
+
+    @property
+    def bullet_limit(self) -> int:
+        return self._bullet_limit
+
+    def compile(self) -> CompiledScenario:
+        return self
+
+    def asteroids(self) -> list[Asteroid]:
+        """
+        Rebuild the compiled asteroids, leaving the random module in the same state as generating them would
+        """
+        asteroids = list()
+        for x, y, vx, vy, speed, angle, turnrate, size in self._asteroid_rows:
+            asteroid = Asteroid(position=(x, y), speed=0.0, angle=0.0, size=int(size))
+            asteroid.vx, asteroid.vy = vx, vy
+            asteroid.speed = speed
+            asteroid.angle = angle
+            asteroid.turnrate = turnrate
+            asteroid._state[2] = vx
+            asteroid._state[3] = vy
+            asteroids.append(asteroid)
+
+        if self._rng_state is not None:
+            random.setstate(self._rng_state)
+        return asteroids
+
+    def ships(self) -> list[Ship]:
+        return [Ship(idx + 1, bullets_remaining=self._bullet_limit, **_ship_kwargs(ship_state)) for idx, ship_state in enumerate(self._header['ships'])]
+
+    def to_json(self) -> str:
+        """
+        Serialize to a self-contained JSON document, with the asteroid array stored column by column
+        """
+        columns = {field: [row[idx] for row in self._asteroid_rows] for idx, field in enumerate(ASTEROID_FIELDS)}
+        return json.dumps({**self._header, 'content_hash': self._content_hash, 'asteroids': columns})
+
+    @classmethod
+    def from_json(cls, text: str) -> CompiledScenario:
+        data = json.loads(text)
+        columns = data.pop('asteroids')
+        expected_hash = data.pop('content_hash', None)
+        values = array('d')
+        for row in zip(*[columns[field] for field in ASTEROID_FIELDS]):
+            values.extend(row)
+        compiled = cls(data, values.tobytes())
+        _check_hash(compiled, expected_hash)
+        return compiled
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize to the binary form: magic, little-endian header length, JSON header, then the float64 asteroid array
+        """
+        header = json.dumps({**self._header, 'content_hash': self._content_hash}).encode('utf-8')
+        return BINARY_MAGIC + struct.pack('<I', len(header)) + header + self._little_endian_data()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> CompiledScenario:
+        if data[:4] != BINARY_MAGIC:
+            raise ValueError("Not a compiled scenario: bad magic bytes")
+        (header_len,) = struct.unpack('<I', data[4:8])
+        header = json.loads(data[8:8 + header_len].decode('utf-8'))
+        expected_hash = header.pop('content_hash', None)
+        values = array('d')
+        values.frombytes(data[8 + header_len:])
+        if sys.byteorder == 'big':
+            values.byteswap()
+        compiled = cls(header, values.tobytes())
+        _check_hash(compiled, expected_hash)
+        return compiled
+
+    def save(self, path: str) -> None:
+        """
+        Write the scenario to disk, as JSON if the path ends in .json and in the binary form otherwise
+        """
+        if path.endswith('.json'):
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self.to_json())
+        else:
+            with open(path, 'wb') as f:
+                f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> CompiledScenario:
+        with open(path, 'rb') as f:
+            data = f.read()
+        if data[:4] == BINARY_MAGIC:
+            return cls.from_bytes(data)
+        return cls.from_json(data.decode('utf-8'))
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Pickle through the binary form, so sending a compiled scenario to worker processes stays cheap
+        return (CompiledScenario.from_bytes, (self.to_bytes(),))
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, CompiledScenario) and other.content_hash == self.content_hash
+
+    def __hash__(self) -> int:
+        return hash(self._content_hash)
+
+
+def _json_ready(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {str(key): _json_ready(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_ready(item) for item in value]
+    return value
+
+
+def _ship_kwargs(ship_state: dict[str, Any]) -> dict[str, Any]:
+    kwargs = dict(ship_state)
+    if 'position' in kwargs:
+        kwargs['position'] = tuple(kwargs['position'])
+    return kwargs
+
+
+def _check_hash(compiled: CompiledScenario, expected_hash: str | None) -> None:
+    if expected_hash is not None and expected_hash != compiled.content_hash:
+        raise ValueError(f"Compiled scenario content hash mismatch: expected {expected_hash}, got {compiled.content_hash}")
@@ -20,6 +20,15 @@ class KesslerController:
 
         raise NotImplementedError('Your derived KesslerController must include an actions method for control input.')
 
+    async def actions_async(self, ship_state: ShipState, game_state: GameState) -> tuple[float, float, bool, bool]:
+        """
+        Asynchronous version of actions, used instead of it when the game runs with async_controllers. Override it
+        for controllers that wait on I/O, such as a model server, so all ships' decisions are awaited concurrently.
+        By default it calls actions.
+        """
+
+        return self.actions(ship_state, game_state)
+
 
     # Property to store the ID for the ship this controller is attached to during a scenario
     @property
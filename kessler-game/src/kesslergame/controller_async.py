@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from typing import TYPE_CHECKING
+
+from .state_models import GameState, ShipState
+
+if TYPE_CHECKING:
+    from .controller import KesslerController
+
+Action = tuple[float, float, bool, bool]
+Decisions = tuple[dict[int, Action], dict[int, float]]
+
+
+async def _cancel_tasks() -> None:
+    tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _shutdown(loop: asyncio.AbstractEventLoop, thread: threading.Thread) -> None:
+    if loop.is_closed():
+        return
+    if thread.is_alive():
+        asyncio.run_coroutine_threadsafe(_cancel_tasks(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+    loop.run_until_complete(loop.shutdown_asyncgens())
+    loop.close()
+
+
+class AsyncControllerRunner:
+    def __init__(self, controllers: list[KesslerController]) -> None:
+        """
+        Gathers the decisions of all ships' controllers concurrently on an asyncio event loop.
+
+        The loop runs in a background thread for the whole game, so a batch of decisions can be submitted
+        and left running while the game thread steps the physics: controllers that await I/O (a model server,
+        out-of-process inference) make progress in the meantime. Every controller's actions_async is awaited,
+        which falls back to its synchronous actions method, so plain controllers can take part too.
+
+        Controllers share this loop for the whole game, so asyncio resources they keep between frames
+        (sessions, connections) should be created from inside actions_async.
+
+        :param controllers: One controller per ship, with ship_id already assigned
+        """
+        self._controllers = controllers
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="kessler-controllers", daemon=True)
+        self._thread.start()
+        # Stop the loop even if the game ends with an exception
+        self._finalizer = weakref.finalize(self, _shutdown, self._loop, self._thread)
+
+    async def _decide(self, idx: int, ship_state: ShipState, game_state: GameState) -> tuple[int, Action, float]:
+        start = time.perf_counter()
+        action = await self._controllers[idx].actions_async(ship_state, game_state)
+        return idx, action, time.perf_counter() - start
+
+    async def _gather(self, requests: dict[int, tuple[ShipState, GameState]]) -> Decisions:
+        results = await asyncio.gather(*(self._decide(idx, ship_state, game_state)
+                                         for idx, (ship_state, game_state) in requests.items()))
+        return {idx: action for idx, action, _ in results}, {idx: elapsed for idx, _, elapsed in results}
+
+    def submit(self, requests: dict[int, tuple[ShipState, GameState]]) -> Future[Decisions]:
+        """
+        Start deciding one frame for the ships in requests ({controller index: (ship_state, game_state)}).
+        The future resolves to the actions and the seconds each controller took, and raises the first
+        exception a controller raised. The states must not change until it resolves.
+        """
+        return asyncio.run_coroutine_threadsafe(self._gather(requests), self._loop)
+
+    def close(self) -> None:
+        self._finalizer()
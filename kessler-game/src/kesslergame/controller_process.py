@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+from __future__ import annotations
+
+import multiprocessing
+import time
+import traceback
+import weakref
+from array import array
+from itertools import chain
+from multiprocessing.connection import Connection, wait
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, TYPE_CHECKING
+
+from .state_models import GameState, ShipState, ShipDataList, AsteroidDataList, BulletDataList, MineDataList
+
+if TYPE_CHECKING:
+    from .controller import KesslerController
+
+# Row widths of the game state lists, and the columns that are ints/bools rather than floats
+SHIP_FIELDS = 13      # x, y, vx, vy, speed, heading, mass, radius, id, team, is_respawning, lives_remaining, deaths
+ASTEROID_FIELDS = 7   # x, y, vx, vy, size, mass, radius
+BULLET_FIELDS = 9     # x, y, vx, vy, tail_dx, tail_dy, heading, mass, length
+MINE_FIELDS = 5       # x, y, mass, fuse_time, remaining_time
+_SHIP_INT_COLUMNS = (8, 9, 11, 12)
+_SHIP_BOOL_COLUMNS = (10,)
+_ASTEROID_INT_COLUMNS = (4,)
+# Shared block header: [frame the data belongs to, n_ships, n_asteroids, n_bullets, n_mines]
+_HEADER = 5
+
+Action = tuple[float, float, bool, bool]
+IDLE_ACTION: Action = (0.0, 0.0, False, False)
+
+
+def _rows(values: array, start: int, count: int, width: int, int_columns: tuple[int, ...] = (), bool_columns: tuple[int, ...] = ()) -> list[list[Any]]:
+    rows: list[list[Any]] = [values[i:i + width].tolist() for i in range(start, start + count * width, width)]
+    for row in rows:
+        for c in int_columns:
+            row[c] = int(row[c])
+        for c in bool_columns:
+            row[c] = bool(row[c])
+    return rows
+
+
+def _worker_main(conn: Connection, controller: KesslerController, settings: dict[str, Any]) -> None:
+    # Runs one controller in its own process. Each message asks for the actions of one frame,
+    # whose game state is in the shared block. Frames that arrive while the controller is busy
+    # are dropped except the newest, as the game has already used the fallback for them.
+    shm: SharedMemory | None = None
+    try:
+        while True:
+            msg = conn.recv()
+            while msg is not None and conn.poll():
+                msg = conn.recv()
+            if msg is None:
+                break
+            frame, sim_time, shm_name, own_state = msg
+            if shm is None or shm.name != shm_name:
+                if shm is not None:
+                    shm.close()
+                    shm = None
+                try:
+                    shm = SharedMemory(name=shm_name)
+                except FileNotFoundError:
+                    continue  # The game already moved to a bigger block, so this frame is long gone
+
+            # Seqlock read: the header must name this frame before and after the copy, or the game
+            # has started writing a newer frame and this one is already too late
+            buf = shm.buf
+            assert buf is not None
+            header = buf[:_HEADER * 8].cast('d')
+            if int(header[0]) != frame:
+                header.release()
+                continue
+            n_ships, n_ast, n_bul, n_mines = (int(v) for v in header[1:_HEADER])
+            size = _HEADER + n_ships * SHIP_FIELDS + n_ast * ASTEROID_FIELDS + n_bul * BULLET_FIELDS + n_mines * MINE_FIELDS
+            values = array('d')
+            values.frombytes(buf[:size * 8])
+            still_valid = int(header[0]) == frame
+            header.release()
+            if not still_valid:
+                continue
+
+            offset = _HEADER
+            ships = _rows(values, offset, n_ships, SHIP_FIELDS, _SHIP_INT_COLUMNS, _SHIP_BOOL_COLUMNS)
+            offset += n_ships * SHIP_FIELDS
+            asteroids = _rows(values, offset, n_ast, ASTEROID_FIELDS, _ASTEROID_INT_COLUMNS)
+            offset += n_ast * ASTEROID_FIELDS
+            bullets = _rows(values, offset, n_bul, BULLET_FIELDS)
+            offset += n_bul * BULLET_FIELDS
+            mines = _rows(values, offset, n_mines, MINE_FIELDS)
+            game_state = GameState(ships=ships, asteroids=asteroids, bullets=bullets, mines=mines,
+                                   time=sim_time, frame=frame, **settings)
+            try:
+                actions = controller.actions(ShipState(own_state), game_state)
+            except Exception:
+                conn.send(('error', frame, traceback.format_exc()))
+                break
+            conn.send(('ok', frame, actions))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        if shm is not None:
+            shm.close()
+        conn.close()
+
+
+def _shutdown(processes: list[multiprocessing.process.BaseProcess], conns: list[Connection], blocks: list[SharedMemory]) -> None:
+    for conn in conns:
+        try:
+            conn.send(None)
+        except (OSError, ValueError):
+            pass
+    for process in processes:
+        process.join(timeout=1.0)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+    for conn in conns:
+        conn.close()
+    for shm in blocks:
+        shm.close()
+        shm.unlink()
+    blocks.clear()
+
+
+class ControllerPool:
+    def __init__(self, controllers: list[KesslerController], game_settings: dict[str, Any],
+                 time_budget: float | None = None, fallback: Action | str = IDLE_ACTION) -> None:
+        """
+        Runs each ship's controller in its own worker process for one game.
+
+        Every frame, the game state is written once into a shared memory block that all workers read,
+        each worker is sent its own ship state, and the controllers compute their actions at the same
+        time. Results are collected until time_budget seconds after they were sent; a controller that is
+        late (or still busy with an earlier frame) gets the fallback action for this frame instead.
+
+        Controllers are copied into their workers, so state they keep between frames lives there, not in
+        the objects passed to the game.
+
+        :param controllers: One controller per ship, with ship_id already assigned
+        :param game_settings: The GameState arguments that are fixed for the game (map_size, time_limit,
+            delta_time, frame_rate, random_asteroid_splits, competition_safe_mode)
+        :param time_budget: Seconds each controller has per frame, or None to always wait for it
+        :param fallback: Action used on an overrun, or "repeat" for the ship's previous action
+        """
+        if isinstance(fallback, str) and fallback != "repeat":
+            raise ValueError(f"Unknown controller fallback {fallback!r}, use an action tuple or 'repeat'")
+        self.time_budget = time_budget
+        self.fallback = fallback
+        self.overruns: list[int] = [0] * len(controllers)
+        self._last_actions: list[Action] = [IDLE_ACTION] * len(controllers)
+        self._values = array('d')
+        self._blocks: list[SharedMemory] = []
+        self._allocate(64 * 1024)
+
+        ctx = multiprocessing.get_context()
+        self._conns: list[Connection] = []
+        self._processes: list[multiprocessing.process.BaseProcess] = []
+        for controller in controllers:
+            parent_conn, child_conn = ctx.Pipe()
+            process = ctx.Process(target=_worker_main, args=(child_conn, controller, game_settings), daemon=True,
+                                  name=f"kessler-controller-{controller.ship_id}")
+            process.start()
+            child_conn.close()
+            self._conns.append(parent_conn)
+            self._processes.append(process)
+        # Stop the workers and free the shared block even if the game ends with an exception
+        self._finalizer = weakref.finalize(self, _shutdown, self._processes, self._conns, self._blocks)
+
+    def _allocate(self, size: int) -> None:
+        # Grow into a new block; workers switch over when a message names it
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+        self._blocks[:] = [SharedMemory(create=True, size=size)]
+
+    def _write(self, frame: int, ships: list[ShipDataList], asteroids: list[AsteroidDataList],
+               bullets: list[BulletDataList], mines: list[MineDataList]) -> SharedMemory:
+        values = self._values
+        del values[:]
+        values.extend((-1.0, len(ships), len(asteroids), len(bullets), len(mines)))
+        values.extend(chain.from_iterable(ships))
+        values.extend(chain.from_iterable(asteroids))
+        values.extend(chain.from_iterable(bullets))
+        values.extend(chain.from_iterable(mines))
+        data = values.tobytes()
+        if len(data) > self._blocks[0].size:
+            self._allocate(2 * len(data))
+        shm = self._blocks[0]
+        buf = shm.buf
+        assert buf is not None
+        header = buf[:8].cast('d')
+        header[0] = -1.0  # Readers of an older frame see the block as being rewritten
+        buf[8:len(data)] = data[8:]
+        header[0] = float(frame)
+        header.release()
+        return shm
+
+    def step(self, frame: int, sim_time: float, own_states: dict[int, ShipDataList], ships: list[ShipDataList],
+             asteroids: list[AsteroidDataList], bullets: list[BulletDataList], mines: list[MineDataList]) -> tuple[dict[int, Action], dict[int, float]]:
+        """
+        Actions of one frame for the ships in own_states ({controller index: ship ownstate}), and how long
+        each took to arrive (the whole budget for an overrun).
+        """
+        shm = self._write(frame, ships, asteroids, bullets, mines)
+        sent = time.perf_counter()
+        pending: dict[Connection, int] = {}
+        for idx, own_state in own_states.items():
+            self._conns[idx].send((frame, sim_time, shm.name, own_state))
+            pending[self._conns[idx]] = idx
+
+        actions: dict[int, Action] = {}
+        elapsed: dict[int, float] = {}
+        deadline = None if self.time_budget is None else sent + self.time_budget
+        while pending:
+            timeout = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            ready = wait(list(pending), timeout)
+            if not ready:
+                break
+            for conn in ready:
+                assert isinstance(conn, Connection)
+                idx = pending[conn]
+                try:
+                    kind, result_frame, payload = conn.recv()
+                except EOFError:
+                    raise RuntimeError(f"Controller {idx} worker process exited unexpectedly") from None
+                if kind == 'error':
+                    raise RuntimeError(f"Controller {idx} raised an exception in its worker process:\n{payload}")
+                if result_frame != frame:
+                    continue  # A late answer to an earlier frame
+                actions[idx] = payload
+                elapsed[idx] = time.perf_counter() - sent
+                del pending[conn]
+
+        for idx in pending.values():
+            self.overruns[idx] += 1
+            actions[idx] = self._last_actions[idx] if isinstance(self.fallback, str) else self.fallback
+            elapsed[idx] = time.perf_counter() - sent
+        for idx, action in actions.items():
+            self._last_actions[idx] = action
+        return actions, elapsed
+
+    def close(self) -> None:
+        self._finalizer()
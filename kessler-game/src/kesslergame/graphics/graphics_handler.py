@@ -7,8 +7,9 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 from enum import Enum
 
+from .graphics_base import KesslerGraphics
+
 if TYPE_CHECKING:
-    from .graphics_base import KesslerGraphics
     from ..scenario import Scenario
     from ..ship import Ship
     from ..asteroid import Asteroid
@@ -24,10 +25,12 @@ class GraphicsType(Enum):
     Tkinter = 2
     Pyplot = 3
     Custom = 4
+    Video = 5
 
 
 class GraphicsHandler:
-    def __init__(self, type: GraphicsType = GraphicsType.NoGraphics, scenario: Scenario | None = None, UI_settings: UISettingsDict | None = None, graphics_obj: KesslerGraphics | None = None) -> None:
+    def __init__(self, type: GraphicsType = GraphicsType.NoGraphics, scenario: Scenario | None = None, UI_settings: UISettingsDict | None = None, graphics_obj: KesslerGraphics | None = None,
+                 frequency: float = 30.0, video_output_path: str = "kessler_game.mp4", video_frame_skip: int = 1) -> None:
         """
         Create a graphics handler utilizing the assigned graphics engine defined from GraphicsType
         """
@@ -50,6 +53,9 @@ class GraphicsHandler:
                 case GraphicsType.Pyplot:
                     from .graphics_plt import GraphicsPLT
                     self.graphics = GraphicsPLT()
+                case GraphicsType.Video:
+                    from .graphics_video import GraphicsVideo
+                    self.graphics = GraphicsVideo(output_path=video_output_path, UI_settings=UI_settings, frame_skip=video_frame_skip, frequency=frequency)
                 case GraphicsType.Custom:
                     #if graphics_obj is None:
                     raise ValueError('"graphics_obj" must be defined in settings when using GraphicsType.Custom')
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+import os
+import shutil
+import subprocess
+from math import cos, sin, radians
+from typing import IO
+
+from PIL import Image, ImageDraw, ImageFont
+
+from .graphics_base import KesslerGraphics
+from ..ship import Ship
+from ..asteroid import Asteroid
+from ..bullet import Bullet
+from ..mines import Mine
+from ..score import Score
+from ..scenario import Scenario
+from ..team import Team
+from ..settings_dicts import UISettingsDict
+
+VIDEO_EXTENSIONS = ('.mp4', '.mkv', '.webm', '.avi', '.mov', '.gif')
+TEAM_COLORS = [(0, 200, 80), (255, 140, 0), (80, 160, 255), (230, 60, 200), (240, 230, 70), (0, 220, 220)]
+
+
+class GraphicsVideo(KesslerGraphics):
+    def __init__(self,
+                 output_path: str = "kessler_game.mp4",
+                 UI_settings: UISettingsDict | None = None,
+                 frame_skip: int = 1,
+                 fps: float | None = None,
+                 frequency: float = 30.0,
+                 ffmpeg_path: str = "ffmpeg",
+                 ffmpeg_args: list[str] | None = None) -> None:
+        """
+        Headless renderer that rasterizes frames offscreen with Pillow, and either pipes them into an ffmpeg subprocess
+        (if output_path has a video extension) or writes numbered PNGs into the output_path directory.
+
+        No display or Tk is needed, and nothing is opened until start(), so instances can be built in a parent process
+        and passed to ProcessPoolExecutor workers.
+
+        The video plays in real time at frequency / frame_skip fps, where frequency is the game's update rate, unless fps is given.
+        """
+        UI_settings = {} if UI_settings is None else UI_settings
+        self.show_ships = UI_settings.get('ships', True)
+        self.show_lives = UI_settings.get('lives_remaining', True)
+        self.show_accuracy = UI_settings.get('accuracy', True)
+        self.show_asteroids_hit = UI_settings.get('asteroids_hit', True)
+        self.show_shots_fired = UI_settings.get('shots_fired', False)
+        self.show_bullets_remaining = UI_settings.get('bullets_remaining', True)
+        self.show_mines_remaining = UI_settings.get('mines_remaining', True)
+        self.show_controller_name = UI_settings.get('controller_name', True)
+        self.scale = float(UI_settings.get('scale', 1.0))
+
+        self.output_path = output_path
+        self.frame_skip = max(1, int(frame_skip))
+        self.fps = fps if fps is not None else frequency / self.frame_skip
+        self.ffmpeg_path = ffmpeg_path
+        self.ffmpeg_args = ffmpeg_args if ffmpeg_args is not None else ['-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-preset', 'veryfast']
+        self.to_video = os.path.splitext(output_path)[1].lower() in VIDEO_EXTENSIONS
+
+        self._encoder: subprocess.Popen[bytes] | None = None
+        self._update_count = 0
+        self.frames_written = 0
+
+    def start(self, scenario: Scenario) -> None:
+        self.game_width = round(scenario.map_size[0] * self.scale)
+        self.game_height = round(scenario.map_size[1] * self.scale)
+        self.max_time = scenario.time_limit
+        self.score_width = round(385 * self.scale)
+        # Most encoders require even frame dimensions
+        self.window_width = self.game_width + self.score_width
+        self.window_width += self.window_width % 2
+        self.window_height = self.game_height + self.game_height % 2
+
+        self.time_font = self._load_font(round(20 * self.scale))
+        self.team_font = self._load_font(round(16 * self.scale))
+        self.id_font = self._load_font(round(15 * self.scale))
+
+        self._update_count = 0
+        self.frames_written = 0
+
+        if self.to_video:
+            ffmpeg = shutil.which(self.ffmpeg_path)
+            if ffmpeg is None:
+                raise RuntimeError(f'Video encoder "{self.ffmpeg_path}" was not found. Install ffmpeg, or pass a directory as output_path to write PNG frames instead')
+            out_dir = os.path.dirname(os.path.abspath(self.output_path))
+            os.makedirs(out_dir, exist_ok=True)
+            cmd = [ffmpeg, '-y', '-loglevel', 'error',
+                   '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+                   '-s', f'{self.window_width}x{self.window_height}', '-r', f'{self.fps:g}',
+                   '-i', '-', *self.ffmpeg_args, self.output_path]
+            self._encoder = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        else:
+            os.makedirs(self.output_path, exist_ok=True)
+
+    def update(self, score: Score, ships: list[Ship], asteroids: list[Asteroid], bullets: list[Bullet], mines: list[Mine]) -> None:
+        self._update_count += 1
+        if (self._update_count - 1) % self.frame_skip != 0:
+            return
+
+        self.image = Image.new('RGB', (self.window_width, self.window_height), (0, 0, 0))
+        self.draw = ImageDraw.Draw(self.image)
+
+        # Same draw order as the Tkinter renderer
+        self.plot_shields(ships)
+        self.plot_ships(ships)
+        self.plot_bullets(bullets)
+        self.plot_asteroids(asteroids)
+        self.plot_mines(mines)
+        self.update_score(score, ships)
+
+        self.write_frame(self.image)
+
+    def write_frame(self, image: Image.Image) -> None:
+        """
+        Send a finished frame to the encoder, or save it into the frame directory
+        """
+        if self._encoder is not None:
+            stdin: IO[bytes] | None = self._encoder.stdin
+            assert stdin is not None
+            try:
+                stdin.write(image.tobytes())
+            except BrokenPipeError:
+                raise RuntimeError(f'Video encoder exited early: {self._encoder_errors()}')
+        else:
+            image.save(os.path.join(self.output_path, f'frame_{self.frames_written:06d}.png'))
+        self.frames_written += 1
+
+    def close(self) -> None:
+        if self._encoder is not None:
+            encoder = self._encoder
+            self._encoder = None
+            if encoder.stdin is not None:
+                try:
+                    encoder.stdin.close()
+                except BrokenPipeError:
+                    pass
+            errors = encoder.stderr.read().decode(errors='replace') if encoder.stderr is not None else ''
+            if encoder.wait() != 0:
+                raise RuntimeError(f'Video encoder failed with exit code {encoder.returncode}: {errors.strip()}')
+
+    def _encoder_errors(self) -> str:
+        if self._encoder is None or self._encoder.stderr is None:
+            return ''
+        self._encoder.wait()
+        return self._encoder.stderr.read().decode(errors='replace').strip()
+
+    @staticmethod
+    def _load_font(size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+        for name in ("DejaVuSansMono.ttf", "cour.ttf", "Courier New.ttf"):
+            try:
+                return ImageFont.truetype(name, size)
+            except OSError:
+                continue
+        return ImageFont.load_default()
+
+    def _box(self, x: float, y: float, r: float) -> tuple[float, float, float, float]:
+        """
+        Bounding box of a circle in image coordinates, with the y axis flipped
+        """
+        return ((x - r) * self.scale, self.game_height - (y + r) * self.scale,
+                (x + r) * self.scale, self.game_height - (y - r) * self.scale)
+
+    def update_score(self, score: Score, ships: list[Ship]) -> None:
+        x_offset = round(5 * self.scale)
+        y_offset = round(5 * self.scale)
+        half_width = self.window_width - self.score_width / 2
+
+        self.draw.rectangle((self.game_width, 0, self.window_width - 1, self.game_height - 1), outline="white", fill="black")
+        self.draw.line((half_width, 0, half_width, self.game_height), fill="white")
+
+        time_text = "Time: " + f'{score.sim_time:.2f}' + " / " + str(self.max_time) + " sec"
+        self.draw.text((round(10 * self.scale), round(10 * self.scale)), time_text, fill="white", font=self.time_font)
+
+        team_num = 0
+        output_location_y = 0
+        max_lines = 0
+        for team in score.teams:
+            title = team.team_name + "\n"
+            ships_text = "_________\n"
+            if self.show_ships:
+                for ship in ships:
+                    if ship.team == team.team_id:
+                        ships_text += ("Ship " + str(ship.id))
+                        if self.show_controller_name and ship.controller is not None:
+                            ships_text += ": " + '\n' + str(ship.controller.name)
+                        ships_text += '\n'
+            score_board = title + ships_text + self.format_ui(team)
+
+            if (team_num % 2) == 0:
+                output_location_x = int(self.game_width + x_offset)
+                output_location_y = output_location_y + (round(17 * self.scale) * max_lines) + y_offset
+                line_y = output_location_y - round(10 * self.scale)
+                self.draw.line((self.game_width, line_y, self.window_width, line_y), fill="white")
+                max_lines = score_board.count("\n")
+            else:
+                output_location_x = int(half_width + x_offset)
+                max_lines = max(max_lines, score_board.count("\n"))
+
+            self.draw.multiline_text((output_location_x, output_location_y), score_board, fill="white", font=self.team_font)
+            team_num += 1
+
+    def format_ui(self, team: Team) -> str:
+        team_info = "_________\n"
+        if self.show_lives:
+            team_info += "Lives: " + str(team.lives_remaining) + "\n"
+        if self.show_accuracy:
+            team_info += "Accuracy: " + str(round(team.accuracy * 100, 1)) + "\n"
+        if self.show_asteroids_hit:
+            team_info += "Asteroids Hit: " + str(team.asteroids_hit) + "\n"
+        if self.show_shots_fired:
+            team_info += "Shots Fired: " + str(team.shots_fired) + "\n"
+        if self.show_bullets_remaining:
+            team_info += "Bullets Left: " + str(team.bullets_remaining) + "\n"
+        if self.show_mines_remaining:
+            team_info += "Mines Left: " + str(team.mines_remaining) + "\n"
+        return team_info
+
+    def plot_ships(self, ships: list[Ship]) -> None:
+        """
+        Plots each ship as a team-colored triangle pointing along its heading, since sprites are not needed offscreen
+        """
+        for ship in ships:
+            if ship.alive:
+                x, y = ship.position
+                r = ship.radius * 0.9
+                points = []
+                for offset, length in ((0.0, r), (140.0, r), (180.0, r * 0.4), (220.0, r)):
+                    angle = radians(ship.heading + offset)
+                    points.append(((x + length * cos(angle)) * self.scale, self.game_height - (y + length * sin(angle)) * self.scale))
+                self.draw.polygon(points, fill=TEAM_COLORS[(ship.team - 1) % len(TEAM_COLORS)])
+                self.draw.text(((x + ship.radius) * self.scale, self.game_height - (y + ship.radius) * self.scale),
+                               str(ship.id), fill="white", font=self.id_font)
+
+    def plot_shields(self, ships: list[Ship]) -> None:
+        """
+        Plots each ship's shield ring, colored by respawn time remaining
+        """
+        for ship in ships:
+            if ship.alive:
+                full_invincibility_duration = 3.0
+                respawn_scaler = max(min(ship.respawn_time_left / full_invincibility_duration, 1.0), 0.0)
+                r = int(120 + (respawn_scaler * (255 - 120)))
+                g = int(200 + (respawn_scaler * (0 - 200)))
+                b = int(255 + (respawn_scaler * (0 - 255)))
+                self.draw.ellipse(self._box(ship.position[0], ship.position[1], ship.radius), fill="black", outline=(r, g, b))
+
+    def plot_bullets(self, bullets: list[Bullet]) -> None:
+        """
+        Plots each bullet object as a line from its tail to its head
+        """
+        width = max(1, round(3 * self.scale))
+        for bullet in bullets:
+            self.draw.line((bullet.position[0] * self.scale, self.game_height - bullet.position[1] * self.scale,
+                            bullet.tail[0] * self.scale, self.game_height - bullet.tail[1] * self.scale),
+                           fill="#EE2737", width=width)
+
+    def plot_asteroids(self, asteroids: list[Asteroid]) -> None:
+        """
+        Plots each asteroid object on the frame
+        """
+        for asteroid in asteroids:
+            self.draw.ellipse(self._box(asteroid.position[0], asteroid.position[1], asteroid.radius), fill="grey")
+
+    def plot_mines(self, mines: list[Mine]) -> None:
+        """
+        Plots each mine object and its detonation ring
+        """
+        for mine in mines:
+            self.draw.ellipse(self._box(mine.position[0], mine.position[1], mine.radius), fill="yellow")
+            light_fill = "red" if mine.countdown_timer - int(mine.countdown_timer) > 0.5 else "orange"
+            self.draw.ellipse(self._box(mine.position[0], mine.position[1], mine.radius * 0.3), fill=light_fill)
+
+            if mine.countdown_timer < mine.detonation_time:
+                explosion_radius = mine.blast_radius * (1 - mine.countdown_timer / mine.detonation_time) ** 2
+                self.draw.ellipse(self._box(mine.position[0], mine.position[1], explosion_radius),
+                                  outline="white", width=max(1, round(10 * self.scale)))
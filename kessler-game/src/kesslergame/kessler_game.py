@@ -5,6 +5,7 @@
 
 import time
 
+from concurrent.futures import Future
 from math import inf, nan, isfinite, isnan
 from typing import Any, TypedDict, cast
 from enum import Enum
@@ -19,7 +20,10 @@ from .asteroid import Asteroid
 from .ship import Ship
 from .bullet import Bullet
 from .settings_dicts import SettingsDict, UISettingsDict
+from .controller_process import ControllerPool, IDLE_ACTION
+from .controller_async import AsyncControllerRunner, Decisions
 from .state_models import GameState, ShipState
+from .spatial_index import LazyAsteroidGrid
 
 
 class StopReason(Enum):
@@ -32,6 +36,7 @@ class StopReason(Enum):
 
 class PerfDict(TypedDict, total=False):
     controller_times: list[float]
+    controller_overruns: list[int]
     total_controller_time: float
     physics_update: float
     collisions_check: float
@@ -51,11 +56,29 @@ class KesslerGame:
         self.prints_on: bool = settings.get("prints_on", True)
         self.graphics_type: GraphicsType = settings.get("graphics_type", GraphicsType.Tkinter)
         self.graphics_obj: KesslerGraphics | None = settings.get("graphics_obj", None)
-        self.realtime_multiplier: float = settings.get("realtime_multiplier", 0.0 if self.graphics_type==GraphicsType.NoGraphics else 1.0)
-        self.frame_skip: int = max(1, int(settings.get("frame_skip", int(self.frequency) if self.realtime_multiplier == 0.0 else round(self.realtime_multiplier))))
+        self.realtime_multiplier: float = settings.get("realtime_multiplier", 0.0 if self.graphics_type in (GraphicsType.NoGraphics, GraphicsType.Video) else 1.0)
+        # Video export records every frame by default, and GraphicsVideo applies its own frame_skip
+        default_frame_skip = 1 if self.graphics_type == GraphicsType.Video else (int(self.frequency) if self.realtime_multiplier == 0.0 else round(self.realtime_multiplier))
+        self.frame_skip: int = max(1, int(settings.get("frame_skip", default_frame_skip)))
+        # Where GraphicsType.Video writes, and how many frames it skips, so parallel games can each record their own file
+        self.video_output_path: str = settings.get("video_output_path", "kessler_game.mp4")
+        self.video_frame_skip: int = max(1, int(settings.get("video_frame_skip", 1)))
         self.time_limit: float = settings.get("time_limit", inf)
         self.random_ast_splits: bool = settings.get("random_ast_splits", False)
         self.competition_safe_mode: bool = settings.get("competition_safe_mode", True)
+        # Run each controller in its own worker process, with an optional per-frame deadline
+        self.controller_processes: bool = settings.get("controller_processes", False)
+        self.controller_time_budget: float | None = settings.get("controller_time_budget", None)
+        self.controller_fallback: tuple[float, float, bool, bool] | str = settings.get("controller_fallback", IDLE_ACTION)
+        # Await all controllers' actions_async concurrently, optionally applying each decision one frame later
+        self.async_controllers: bool = settings.get("async_controllers", False)
+        self.controller_action_latency: int = settings.get("controller_action_latency", 0)
+        if self.controller_action_latency not in (0, 1):
+            raise ValueError(f"controller_action_latency must be 0 or 1 frames, got {self.controller_action_latency!r}")
+        if self.controller_action_latency and not self.async_controllers:
+            raise ValueError("controller_action_latency needs async_controllers")
+        if self.async_controllers and self.controller_processes:
+            raise ValueError("async_controllers and controller_processes cannot be combined")
 
         # UI settings
         default_ui: UISettingsDict = {'ships': True, 'lives_remaining': True, 'accuracy': True,
@@ -66,7 +89,34 @@ class KesslerGame:
                                 'asteroids_hit': True, 'shots_fired': True, 'bullets_remaining': True,
                                 'controller_name': True, 'scale': 1.0}
         self.UI_settings = cast(UISettingsDict, UI_settings)
-        
+
+    def _game_state_copy(self, liveships: list[Ship], asteroids: list[Asteroid], bullets: list[Bullet], mines: list[Mine],
+                         scenario: Scenario, time_limit: float, sim_time: float, sim_frame: int,
+                         asteroid_grid: LazyAsteroidGrid | None = None) -> GameState:
+        """
+        GameState holding copies of the current states, which the game can keep changing without affecting it.
+        Copies of the same frame can share one asteroid_grid, so the spatial index is built once for all of them.
+        """
+        return GameState(
+            # Game entities
+            ships=[ship.state.copy() for ship in liveships],
+            asteroids=[asteroid.state.copy() for asteroid in asteroids],
+            bullets=[bullet.state.copy() for bullet in bullets],
+            mines=[mine.state.copy() for mine in mines],
+            # Environment
+            map_size=scenario.map_size,
+            time_limit=time_limit,
+            # Simulation timing
+            time=sim_time,
+            frame=sim_frame,
+            delta_time=self.delta_time,
+            frame_rate=self.frequency,
+            # Game settings
+            random_asteroid_splits=self.random_ast_splits,
+            competition_safe_mode=self.competition_safe_mode,
+            asteroid_grid=asteroid_grid
+        )
+
     def run(self, scenario: Scenario, controllers: list[KesslerController]) -> tuple[Score, PerfDict]:
         """
         Run an entire scenario from start to finish and return score and stop reason
@@ -99,12 +149,29 @@ class KesslerGame:
             if hasattr(controller, "custom_sprite_path"):
                 ship.custom_sprite_path = controller.custom_sprite_path
 
+        # Start the controller worker processes, before any graphics window exists
+        controller_pool: ControllerPool | None = None
+        if self.controller_processes:
+            controller_pool = ControllerPool(
+                controllers[:len(ships)],
+                {'map_size': scenario.map_size, 'time_limit': time_limit, 'delta_time': self.delta_time, 'frame_rate': self.frequency,
+                 'random_asteroid_splits': self.random_ast_splits, 'competition_safe_mode': self.competition_safe_mode},
+                self.controller_time_budget, self.controller_fallback
+            )
+        async_runner: AsyncControllerRunner | None = None
+        if self.async_controllers:
+            async_runner = AsyncControllerRunner(controllers[:len(ships)])
+        # With one frame of latency, the decisions being computed while this frame's physics runs
+        pending_decisions: Future[Decisions] | None = None
+
         # Initialize graphics display
-        graphics = GraphicsHandler(type=self.graphics_type, scenario=scenario, UI_settings=self.UI_settings, graphics_obj=self.graphics_obj)
+        graphics = GraphicsHandler(type=self.graphics_type, scenario=scenario, UI_settings=self.UI_settings, graphics_obj=self.graphics_obj,
+                                   frequency=self.frequency, video_output_path=self.video_output_path, video_frame_skip=self.video_frame_skip)
 
         # Initialize list of dictionary for performance tracking (will remain empty if perf_tracker is false
         perf_dict: PerfDict = {
             'controller_times': [0.0] * len(ships),
+            'controller_overruns': [0] * len(ships),
             'total_controller_time': 0.0,
             'physics_update': 0.0,
             'collisions_check': 0.0,
@@ -153,9 +220,66 @@ class KesslerGame:
             if self.perf_tracker:
                 t_start = time.perf_counter()
 
+            # Every controller's copy of this frame shares one spatial index, built by the first query
+            frame_grid: LazyAsteroidGrid | None = None
+            if self.competition_safe_mode:
+                frame_grid = LazyAsteroidGrid([asteroid.state for asteroid in asteroids], scenario.map_size)
+
+            # With worker processes or async controllers, every live ship's controller gets the frame at once and they run concurrently
+            batch_actions: dict[int, tuple[float, float, bool, bool]] = {}
+            batch_times: dict[int, float] = {}
+            if controller_pool is not None:
+                own_states: dict[int, list[float | int | bool]] = {}
+                for ship_idx, ship in enumerate(ships):
+                    if ship.alive:
+                        ship.update_state()
+                        if controllers[ship_idx].ship_id != ship.id:
+                            raise RuntimeError("Controller and ship ID do not match")
+                        own_states[ship_idx] = ship.ownstate
+                batch_actions, batch_times = controller_pool.step(
+                    sim_frame, sim_time, own_states, [ship.state for ship in liveships],
+                    [asteroid.state for asteroid in asteroids], [bullet.state for bullet in bullets], [mine.state for mine in mines]
+                )
+            elif async_runner is not None:
+                # Pipelined decisions are read while the game moves on, so they always get their own copies of the states
+                pipelined = self.controller_action_latency > 0
+                requests: dict[int, tuple[ShipState, GameState]] = {}
+                snapshot: GameState | None = None
+                for ship_idx, ship in enumerate(ships):
+                    if ship.alive:
+                        ship.update_state()
+                        if controllers[ship_idx].ship_id != ship.id:
+                            raise RuntimeError("Controller and ship ID do not match")
+                        request_state: GameState
+                        if self.competition_safe_mode:
+                            request_state = self._game_state_copy(liveships, asteroids, bullets, mines, scenario, time_limit, sim_time, sim_frame, frame_grid)
+                        elif pipelined:
+                            # One copy shared by all controllers, as the real game state moves on while they run
+                            if snapshot is None:
+                                snapshot = self._game_state_copy(liveships, asteroids, bullets, mines, scenario, time_limit, sim_time, sim_frame, frame_grid)
+                            request_state = snapshot
+                        else:
+                            assert game_state is not None
+                            request_state = game_state
+                        requests[ship_idx] = (ShipState(ship.ownstate.copy() if pipelined else ship.ownstate), request_state)
+                if pipelined:
+                    # The shared index reads the game's own asteroid states, which move on during the physics
+                    if frame_grid is not None:
+                        frame_grid.get()
+                    # Apply the decisions made from the previous frame, and leave this frame's running alongside the physics
+                    previous_decisions = pending_decisions
+                    pending_decisions = async_runner.submit(requests)
+                    if previous_decisions is not None:
+                        batch_actions, batch_times = previous_decisions.result()
+                else:
+                    batch_actions, batch_times = async_runner.submit(requests).result()
+
             # Loop through each controller/ship combo and apply their actions
             for ship_idx, ship in enumerate(ships):
-                if ship.alive:
+                if ship.alive and (controller_pool is not None or async_runner is not None):
+                    # Ships without a decision yet (the first pipelined frame) idle
+                    thrust, turn_rate, fire, drop_mine = batch_actions.get(ship_idx, IDLE_ACTION)
+                elif ship.alive:
                     ship.update_state() # The ship's state might have changed between the last update call and now, if it got hit
                     if controllers[ship_idx].ship_id != ship.id:
                         raise RuntimeError("Controller and ship ID do not match")
@@ -164,24 +288,7 @@ class KesslerGame:
                     game_state_to_controller: GameState
                     if self.competition_safe_mode:
                         # Must recreate GameState object, so competitors do not accidentally or maliciously modify the true game state
-                        game_state_to_controller = GameState(
-                            # Game entities
-                            ships=[ship.state.copy() for ship in liveships],
-                            asteroids=[asteroid.state.copy() for asteroid in asteroids],
-                            bullets=[bullet.state.copy() for bullet in bullets],
-                            mines=[mine.state.copy() for mine in mines],
-                            # Environment
-                            map_size=scenario.map_size,
-                            time_limit=time_limit,
-                            # Simulation timing
-                            time=sim_time,
-                            frame=sim_frame,
-                            delta_time=self.delta_time,
-                            frame_rate=self.frequency,
-                            # Game settings
-                            random_asteroid_splits=self.random_ast_splits,
-                            competition_safe_mode=self.competition_safe_mode
-                        )
+                        game_state_to_controller = self._game_state_copy(liveships, asteroids, bullets, mines, scenario, time_limit, sim_time, sim_frame, frame_grid)
                     else:
                         assert game_state is not None
                         game_state_to_controller = game_state
@@ -189,6 +296,7 @@ class KesslerGame:
                     # Evaluate each controller letting control be applied
                     thrust, turn_rate, fire, drop_mine = controllers[ship_idx].actions(ShipState(ship.ownstate), game_state_to_controller)
 
+                if ship.alive:
                     assert isinstance(thrust, (int, float)),    f"Controller {ship_idx} thrust is not a number: {thrust!r}"
                     assert isfinite(float(thrust)),             f"Controller {ship_idx} thrust is not finite: {thrust!r}"
                     assert isinstance(turn_rate, (int, float)), f"Controller {ship_idx} turn_rate is not a number: {turn_rate!r}"
@@ -203,7 +311,10 @@ class KesslerGame:
 
                     # Update controller evaluation time if performance tracking
                     if self.perf_tracker:
-                        controller_time = time.perf_counter() - t_start if ship.alive else 0.00
+                        if controller_pool is not None or async_runner is not None:
+                            controller_time = batch_times.get(ship_idx, 0.0)
+                        else:
+                            controller_time = time.perf_counter() - t_start if ship.alive else 0.00
                         perf_dict['controller_times'][ship_idx] += controller_time
                         t_start = time.perf_counter()
 
@@ -608,6 +719,14 @@ class KesslerGame:
         # Close graphics display
         graphics.close()
 
+        # Stop the controller worker processes
+        if controller_pool is not None:
+            controller_pool.close()
+            perf_dict['controller_overruns'] = list(controller_pool.overruns)
+        # Stop the async controllers, dropping a pipelined decision nobody will use
+        if async_runner is not None:
+            async_runner.close()
+
         # Finalize score class before returning
         score.finalize(sim_time, stop_reason, ships)
 
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+from __future__ import annotations
+
+from math import sqrt, ceil, inf, isnan
+from typing import Sequence, TypeAlias
+
+from .math_utils import integrate_ship_movement
+from .collisions import ship_asteroid_continuous_collision_time
+from .state_models import ShipState, GameState
+
+# One frame's ship integration intervals, as filled in by integrate_ship_movement
+IntegrationStates: TypeAlias = list[tuple[float, float, float, float, float, float, float, float]]
+
+
+class Rollout:
+    """
+    Outcome of simulating one action sequence forward with Lookahead.
+
+    collision_time is the seconds from now until the ship first touches an asteroid (inf if it does not
+    within the rollout), and asteroid is that asteroid's index in game_state.asteroids (-1 if none).
+    x, y, speed and heading are the ship's state at the end of the rollout, or at the frame of the collision.
+    path holds the ship's (x, y) after every simulated frame.
+    """
+    __slots__ = ('collision_time', 'asteroid', 'x', 'y', 'speed', 'heading', 'path')
+
+    def __init__(self, collision_time: float, asteroid: int, x: float, y: float, speed: float, heading: float,
+                 path: list[tuple[float, float]]) -> None:
+        self.collision_time = collision_time
+        self.asteroid = asteroid
+        self.x = x
+        self.y = y
+        self.speed = speed
+        self.heading = heading
+        self.path = path
+
+    @property
+    def collides(self) -> bool:
+        return self.collision_time != inf
+
+    @property
+    def position(self) -> tuple[float, float]:
+        return self.x, self.y
+
+    def __repr__(self) -> str:
+        return (f"<Rollout collision_time={self.collision_time} asteroid={self.asteroid} "
+                f"position=({self.x}, {self.y}) speed={self.speed} heading={self.heading} frames={len(self.path)}>")
+
+
+class Lookahead:
+    def __init__(self, ship_state: ShipState, game_state: GameState, horizon: float = 1.0) -> None:
+        """
+        Side-effect free forward model of one ship among the asteroids, for controllers that plan ahead.
+
+        The ship moves with the same frame-by-frame analytic integration as the game (integrate_ship_movement),
+        asteroids move in straight lines and wrap around the map, and collisions are found with the game's own
+        continuous ship-asteroid check, so a rollout matches what the game would do if nothing else changed.
+        Bullets, mines, asteroid splits and other ships are not simulated.
+
+        Everything that does not depend on the actions is done once here and shared by all rollouts: only the
+        asteroids that could reach the ship within the horizon are kept, and their positions are computed once
+        per frame, so evaluating many candidate action sequences per frame stays cheap.
+
+        :param ship_state: The controller's ship_state
+        :param game_state: The controller's game_state. It is read here and never modified or referenced later.
+        :param horizon: Longest rollout in seconds. Rollouts are capped to it.
+        """
+        self.delta_time: float = game_state.delta_time
+        self.map_size: tuple[int, int] = game_state.map_size
+        self.horizon: float = horizon
+        self.max_frames: int = max(1, int(ceil(horizon / self.delta_time - 1e-9)))
+
+        self.x: float = ship_state.x
+        self.y: float = ship_state.y
+        self.speed: float = ship_state.speed
+        self.heading: float = ship_state.heading
+        self.radius: float = ship_state.radius
+        self.drag: float = ship_state.drag
+        self.max_speed: float = ship_state.max_speed
+        self.thrust_range: tuple[float, float] = ship_state.thrust_range
+        self.turn_rate_range: tuple[float, float] = ship_state.turn_rate_range
+        # No collisions count while the ship is still invulnerable
+        self.respawn_time_left: float = ship_state.respawn_time_left if ship_state.is_respawning else 0.0
+
+        # Asteroid data rows: [x, y, vx, vy, size, mass, radius]
+        self._asteroid_rows: list[list[float]] = [[float(v) for v in row] for row in game_state.compact['asteroids']]
+
+        # Keep the asteroids that could touch the ship within the horizon, measured across the map edges
+        width, height = float(self.map_size[0]), float(self.map_size[1])
+        self._candidates: list[int] = []
+        for i, (ax, ay, avx, avy, _, _, ar) in enumerate(self._asteroid_rows):
+            dx = (ax - self.x + 0.5 * width) % width - 0.5 * width
+            dy = (ay - self.y + 0.5 * height) % height - 0.5 * height
+            reach = (self.max_speed + sqrt(avx * avx + avy * avy)) * (self.max_frames * self.delta_time) + self.radius + ar
+            if dx * dx + dy * dy <= reach * reach:
+                self._candidates.append(i)
+        # Positions of the candidate asteroids after each frame, filled in as rollouts reach them
+        self._frames: list[list[tuple[float, float]]] = []
+
+    @property
+    def candidates(self) -> list[int]:
+        """Indices (into game_state.asteroids) of the asteroids the rollouts check for collisions."""
+        return list(self._candidates)
+
+    def asteroid_position(self, index: int, t: float) -> tuple[float, float]:
+        """
+        Where asteroid index (into game_state.asteroids) will be in t seconds, wrapped into the map.
+        """
+        ax, ay, avx, avy = self._asteroid_rows[index][:4]
+        return (ax + avx * t) % self.map_size[0], (ay + avy * t) % self.map_size[1]
+
+    def asteroid_positions(self, t: float) -> list[tuple[float, float]]:
+        """Where every asteroid will be in t seconds, in game_state.asteroids order."""
+        return [self.asteroid_position(i, t) for i in range(len(self._asteroid_rows))]
+
+    def _frame_positions(self, frame: int) -> list[tuple[float, float]]:
+        # Candidate asteroid positions after `frame` frames, stepped like Asteroid.update does
+        while len(self._frames) < frame:
+            prev = self._frames[-1] if self._frames else [(self._asteroid_rows[i][0], self._asteroid_rows[i][1]) for i in self._candidates]
+            rows = [self._asteroid_rows[i] for i in self._candidates]
+            self._frames.append([((x + row[2] * self.delta_time) % self.map_size[0], (y + row[3] * self.delta_time) % self.map_size[1])
+                                 for (x, y), row in zip(prev, rows)])
+        return self._frames[frame - 1]
+
+    def rollout(self, actions: Sequence[tuple[float, float]], duration: float | None = None) -> Rollout:
+        """
+        Simulate the ship under a sequence of (thrust, turn_rate) actions, one per frame, and stop at the first collision.
+
+        :param actions: Per-frame (thrust, turn_rate) commands, clamped to the ship's ranges like the game does.
+            The last one is held if the rollout runs longer than the sequence.
+        :param duration: Seconds to simulate. Defaults to len(actions) frames. Capped to the horizon either way.
+        """
+        if not actions:
+            raise ValueError("A rollout needs at least one (thrust, turn_rate) action")
+        frames = len(actions) if duration is None else int(ceil(duration / self.delta_time - 1e-9))
+        frames = max(1, min(frames, self.max_frames))
+
+        dt = self.delta_time
+        x, y, speed, heading = self.x, self.y, self.speed, self.heading
+        integration_states: IntegrationStates = []
+        path: list[tuple[float, float]] = []
+        rows = [self._asteroid_rows[i] for i in self._candidates]
+        for frame in range(1, frames + 1):
+            thrust, turn_rate = actions[min(frame, len(actions)) - 1]
+            thrust = min(max(self.thrust_range[0], thrust), self.thrust_range[1])
+            turn_rate = min(max(self.turn_rate_range[0], turn_rate), self.turn_rate_range[1])
+            x, y, speed, heading = integrate_ship_movement(x, y, speed, heading, thrust, turn_rate, self.drag, self.max_speed,
+                                                           dt, self.map_size, integration_states)
+            path.append((x, y))
+            if frame * dt <= self.respawn_time_left:
+                continue
+
+            # Earliest collision over the past frame, the same check the game runs after moving everything
+            first_t = inf
+            first_idx = -1
+            for (ax, ay), row, idx in zip(self._frame_positions(frame), rows, self._candidates):
+                avx, avy, ar = row[2], row[3], row[6]
+                t = ship_asteroid_continuous_collision_time(x, y, self.radius, speed, integration_states,
+                                                            ax, ay, avx, avy, ar, sqrt(avx * avx + avy * avy), dt)
+                if not isnan(t) and t < first_t:
+                    first_t = t
+                    first_idx = idx
+            if first_idx != -1:
+                return Rollout(frame * dt + first_t, first_idx, x, y, speed, heading, path)
+        return Rollout(inf, -1, x, y, speed, heading, path)
+
+    def hold(self, thrust: float, turn_rate: float, duration: float | None = None) -> Rollout:
+        """Rollout holding one (thrust, turn_rate) command, for duration seconds (default: the horizon)."""
+        return self.rollout([(thrust, turn_rate)], self.horizon if duration is None else duration)
+
+    def rollouts(self, candidates: Sequence[Sequence[tuple[float, float]]], duration: float | None = None) -> list[Rollout]:
+        """Rollouts of several candidate action sequences, sharing the asteroid positions between them."""
+        return [self.rollout(actions, duration) for actions in candidates]
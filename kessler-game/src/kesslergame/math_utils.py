@@ -3,7 +3,7 @@
 # NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
 # this source code package.
 
-from math import sin, cos, nan, inf, copysign, sqrt, isclose, isnan
+from math import sin, cos, nan, inf, copysign, sqrt, isclose, isnan, radians
 from typing import Callable
 
 
@@ -144,6 +144,164 @@ def analytic_ship_movement_integration(v0: float, a: float, theta0: float, omega
     return dx, dy
 
 
+def integrate_ship_movement(x: float, y: float, speed: float, heading: float, thrust: float, turn_rate: float,
+                            drag: float, max_speed: float, delta_time: float, map_size: tuple[int, int],
+                            integration_states: list[tuple[float, float, float, float, float, float, float, float]]) -> tuple[float, float, float, float]:
+    """
+    Advance a ship by one frame of constant thrust and turn rate, with drag and the speed cap.
+
+    Used by Ship.update, and by anything predicting ship movement, so both follow the same physics.
+    thrust and turn_rate must already be within the ship's ranges. integration_states is cleared and
+    refilled with the frame's integration intervals, which the continuous collision checks integrate
+    backward over.
+
+    Returns:
+        tuple[float, float, float, float]: The new (x, y, speed, heading), position wrapped into the map
+        and heading in [0, 360).
+    """
+    # The tricky part about integration the ship's movement with thrust and drag, is that
+    # there is a speed cap, and there is also the zero boundary.
+    # If the ship hits the speed cap in the middle of the frame, the integration gets split up into two phases.
+    # If the ship has a thrust magnitude of less than drag, and drag causes the ship to stop, technically
+    # the ship undergoes INFINITELY many periods of integration, because drag will cause it to infinitely oscillate
+    # around 0 speed. But of course we will just treat this as having zero net acceleration, and the ship stays at 0 speed.
+    # This is a special case we have to detect, so we don't oscillate the ship, or cause it to bypass the zero boundary.
+
+    # Store speed and heading BEFORE acceleration/thrust for integration
+    initial_speed = speed
+    theta0 = radians(heading)  # convert to radians
+    integration_states.clear()
+
+    is_moving: bool = abs(initial_speed) > 1e-12
+
+    # Get direction of motion for drag
+    if is_moving:
+        motion_sign = copysign(1.0, initial_speed)
+    else:
+        motion_sign = copysign(1.0, thrust) if abs(thrust) > 1e-12 else 0.0
+
+    # Drag will always oppose the direction of motion
+    # If the ship is not moving, then drag will be zero.
+    drag_acc = -drag * motion_sign
+
+    # NOTE: When testing this, there was identical behavior of framerates down to 2 FPS, but 1 FPS gave different behavior.
+    # Took a while to realize the issue is that at a delta_time of 1 second, the ship can both cross the 0 boundary, AND accelerate to hit the speed cap in the same frame!
+    # This does NOT handle that case robustly. It doesn't check for that. Please do not run the game at lower than 2 FPS!
+
+    # Combine thrust and drag into one net acceleration
+    # This constant acceleration will apply for the entire duration of this frame, unless we hit the speed cap or hit 0
+    # If we hit the speed cap, we do 0 acceleration after that time for the rest of the frame
+    # If we hit speed 0, the direction of drag will change right after. We consider two cases:
+    # 1. Net acc doesn't change sign change, so the ship will continue accelerating in the same direction, just with 2*drag less acceleration
+    #    To handle, we split up the integration into period 1 with thrust + drag, and period 2 with thrust - drag, where these two quantities have the same sign
+    # 2. Net acc changes sign, meaning the ship will infinitely oscillate across the 0 boundary every infinitesimal timestep forward.
+    #    To handle this, we split up the integration into period 1 with net_acc, and period 2 with 0 acceleration to simulate the infinite oscillations
+    net_acc = thrust + drag_acc  # m/s²
+    
+    # We perform analytic position integration, which is framerate independent
+    # The shape that the ship traces out with a constant turn rate and thrust over the previous frame is a type of spiral
+    # This spiral can be analytically integrated! Yay!
+
+    x0: float = x
+    y0: float = y
+    omega = radians(turn_rate)
+
+    # Determine if we need to break the frame into two parts
+    t1: float | None = None
+    v1: float = 0.0
+    accel_phase2 = 0.0  # default to coasting at max speed, or stopped in second phase
+
+    # Case 1: drag will bring us to a stop
+    if is_moving and net_acc * initial_speed < 0.0: # Net accel is opposite sign from direction of movement
+        assert net_acc != 0.0
+        t_to_stop = -initial_speed / net_acc # This is a positive number, and net_acc is nonzero
+        assert t_to_stop >= 0.0
+        if 0.0 <= t_to_stop < delta_time:
+            t1 = t_to_stop
+            v1 = 0.0  # Fully stopped
+            # Drag now goes the other way, since our speed has crossed the zero boundary and drag will oppose our new speed
+            # if sign(thrust + drag_acc) == sign(thrust - drag_acc)
+            # This statement is logically equivalent to the faster-to-evaluate:
+            if abs(drag_acc) <= abs(thrust):
+                # The thrust is enough to carry us through the "zero valley" without falling back into it and infinitely oscillating
+                accel_phase2 = thrust - drag_acc
+            else:
+                # Thrust too weak. We fall into zero valley and infinitely oscillate!
+                accel_phase2 = 0.0 # Infinite oscillations around 0. Essentially simulate that with 0 acceleration to bypass oscillations.
+    else:
+        # Case 2: acceleration would exceed max speed
+        speed_cap = copysign(max_speed, initial_speed + net_acc * delta_time)
+        if net_acc != 0.0:
+            to_max = (speed_cap - initial_speed) / net_acc
+            assert to_max >= 0.0
+            # If we'll achieve and exceed max speed within this frame,
+            # or 
+            if 0.0 <= to_max < delta_time:
+                assert ((net_acc > 0.0 and initial_speed <= speed_cap) or (net_acc < 0.0 and initial_speed >= speed_cap))
+                # The starting point for the second integration phase is starting at max speed,
+                # at the time when we will achieve max speed from the first phase
+                t1 = to_max
+                v1 = speed_cap
+                accel_phase2 = 0.0
+
+    if t1 is None or abs(t1 - delta_time) < 1e-12:
+        # No exceeding limit within this step, use normal single-phase analytic integration
+        dx, dy = analytic_ship_movement_integration(initial_speed, net_acc, theta0, omega, delta_time)
+        x = (x0 + dx) % map_size[0]
+        y = (y0 + dy) % map_size[1]
+        speed = initial_speed + net_acc * delta_time
+        # Append the end state, so we can reverse-integrate later by plugging in a negative time
+        integration_states.append((0.0, -delta_time, speed, net_acc, theta0 + omega * delta_time, omega, -dx, -dy))
+    elif abs(t1) < 1e-12:
+        assert v1 is not None
+        # The first period is just zero length, so just skip it
+        # This happens a lot when the ship is gunning it at full throttle, so handle it separately
+        # Constant speed or stopped in this second phase, no acceleration
+        dx, dy = analytic_ship_movement_integration(v1, accel_phase2, theta0, omega, delta_time)
+
+        x = (x0 + dx) % map_size[0]
+        y = (y0 + dy) % map_size[1]
+        speed = v1  # Either stopped or clamped
+
+        # Append the end state, so we can reverse-integrate later by plugging in a negative time
+        integration_states.append((0.0, -delta_time, speed, accel_phase2, theta0 + omega * delta_time, omega, -dx, -dy))
+    else:
+        assert v1 is not None
+        # 2-phase integration splitting frame into two periods. 1: accelerate to speed limit or zero, 2: coasting or stationary
+        # Phase 1: accelerating from v0 to v1 over t1
+        dx1, dy1 = analytic_ship_movement_integration(initial_speed, net_acc, theta0, omega, t1)
+        theta1 = theta0 + omega * t1
+        speed = v1  # Either stopped or clamped
+
+        # Phase 2: constant speed or stopped, no acceleration
+        t2 = delta_time - t1
+        dx2, dy2 = analytic_ship_movement_integration(v1, accel_phase2, theta1, omega, t2)
+
+        x = (x0 + dx1 + dx2) % map_size[0]
+        y = (y0 + dy1 + dy2) % map_size[1]
+        speed += accel_phase2 * t2
+
+        # Append the end state, so we can reverse-integrate later by plugging in a negative time
+        integration_states.append((0.0, -t2, speed, accel_phase2, theta1 + omega * t2, omega, -dx2, -dy2))
+        # And append the midpoint of the integration
+        integration_states.append((-t2, -delta_time, speed, net_acc, theta1, omega, -dx1, -dy1))
+
+    # Clamp speed after acceleration (This is only needed in case of floating point error, but is otherwise unnecessary)
+    if abs(speed) > max_speed:
+        speed = copysign(max_speed, speed)
+    elif abs(speed) <= 1e-12:
+        # Let's be nice and just make it 0.0. Because I just tripped myself up with a ship_state.speed == 0.0 comparison when testing XD
+        speed = 0.0
+
+    # Update the angle based on turning rate
+    heading += turn_rate * delta_time
+
+    # Keep the angle within [0, 360.0)
+    heading %= 360.0
+
+    return x, y, speed, heading
+
+
 def circle_circle_collision_time_interval(
     ax: float, ay: float, vax: float, vay: float, ra: float,
     bx: float, by: float, vbx: float, vby: float, rb: float
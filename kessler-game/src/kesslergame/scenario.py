@@ -3,12 +3,16 @@
 # NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
 # this source code package.
 
-from typing import Any
+from __future__ import annotations
+
+from typing import Any, TYPE_CHECKING
 import random
 from math import isclose, inf
 
 from .ship import Ship
 from .asteroid import Asteroid
+if TYPE_CHECKING:
+    from .compiled_scenario import CompiledScenario
 
 def nudge_asteroid_away_from_border(asteroid_dict: dict[str, Any], map_size: tuple[int, int]) -> dict[str, Any]:
     """
@@ -130,7 +134,8 @@ class Scenario:
 
     @property
     def max_asteroids(self) -> int:
-        return sum([Scenario.count_asteroids(asteroid.size) for asteroid in self.asteroids()])
+        # Asteroids default to size 4, so the count is known without generating (and re-seeding) the asteroids
+        return sum([Scenario.count_asteroids(int(state.get("size") or 4)) for state in self.asteroid_states])
 
     @property
     def bullet_limit(self) -> int:
@@ -181,3 +186,11 @@ class Scenario:
         """
         # Loop through and create ShipSprites based on starting state
         return [Ship(idx + 1, bullets_remaining=self.bullet_limit, **ship_state) for idx, ship_state in enumerate(self.ship_states)]
+
+    def compile(self) -> CompiledScenario:
+        """
+        Generate this scenario's initial state once into an immutable, serializable CompiledScenario with a content hash.
+        The compiled scenario can be run, saved, loaded and sent to worker processes in place of this one.
+        """
+        from .compiled_scenario import CompiledScenario
+        return CompiledScenario.from_scenario(self)
@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+"""
+Parameterized, seeded scenario generation.
+
+A generated scenario is assembled from four independent pieces:
+  - a spatial distribution, giving the asteroid positions
+  - a velocity field, mapping a position to an (angle in degrees, speed) pair
+  - a size mix, picking each asteroid's size
+  - a ship layout, giving the ship states and their teams
+
+Every random draw goes through a single random.Random(seed), so the same arguments always produce the same scenario,
+independently of the global random module. Named stress presets are registered in PRESETS.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from typing import Any, Callable, Sequence
+
+from .scenario import Scenario
+
+Position = tuple[float, float]
+# (x, y, rng) -> (angle in degrees, speed)
+VelocityField = Callable[[float, float, random.Random], tuple[float, float]]
+# (asteroid index, rng) -> size in 1..4
+SizeMix = Callable[[int, random.Random], int]
+
+
+#####################
+# SPATIAL LAYOUTS   #
+#####################
+
+def uniform_positions(count: int, map_size: tuple[int, int], rng: random.Random, margin: float = 0.0) -> list[Position]:
+    """
+    Positions drawn uniformly over the map, optionally keeping a margin from the borders
+    """
+    width, height = map_size
+    return [(rng.uniform(margin, width - margin), rng.uniform(margin, height - margin)) for _ in range(count)]
+
+
+def ring_positions(count: int, center: Position, radius: float, phase: float = 0.0) -> list[Position]:
+    """
+    Positions evenly spaced on a circle, starting at angle phase (radians)
+    """
+    cx, cy = center
+    return [(cx + radius * math.cos(phase + 2.0 * math.pi * (i / count)),
+             cy + radius * math.sin(phase + 2.0 * math.pi * (i / count))) for i in range(count)]
+
+
+def line_positions(count: int, start: Position, end: Position) -> list[Position]:
+    """
+    Positions evenly spaced on the segment from start to end, both ends included
+    """
+    sx, sy = start
+    dx = (end[0] - sx) / max(1, count - 1)
+    dy = (end[1] - sy) / max(1, count - 1)
+    return [(sx + i * dx, sy + i * dy) for i in range(count)]
+
+
+def spiral_positions(arms: int, per_arm: int, center: Position, r_min: float, r_max: float, turns: float = 2.0) -> list[Position]:
+    """
+    Positions along evenly phased spiral arms, going from r_min to r_max over the given number of turns
+    """
+    cx, cy = center
+    positions = []
+    for a in range(arms):
+        arm_phase = (2.0 * math.pi / arms) * a
+        for k in range(per_arm):
+            t = k / max(1, (per_arm - 1))
+            r = r_min + t * (r_max - r_min)
+            theta = arm_phase + 2.0 * turns * t * math.pi
+            positions.append((cx + r * math.cos(theta), cy + r * math.sin(theta)))
+    return positions
+
+
+def grid_positions(rows: int, cols: int, map_size: tuple[int, int], margin: float = 0.0, jitter: float = 0.0, rng: random.Random | None = None) -> list[Position]:
+    """
+    Positions on a rows x cols lattice inside the margin, with optional uniform jitter
+    """
+    width, height = map_size
+    dx = (width - 2 * margin) / max(1, cols - 1)
+    dy = (height - 2 * margin) / max(1, rows - 1)
+    positions = []
+    for r in range(rows):
+        for c in range(cols):
+            x, y = margin + c * dx, margin + r * dy
+            if jitter and rng is not None:
+                x += rng.uniform(-jitter, jitter)
+                y += rng.uniform(-jitter, jitter)
+            positions.append((x, y))
+    return positions
+
+
+def cluster_positions(count_per_cluster: int, centers: Sequence[Position], spread: float, rng: random.Random, gaussian: bool = False) -> list[Position]:
+    """
+    Clumps of positions around each center, spread uniformly within +/- spread, or with a normal of std spread
+    """
+    positions = []
+    for cx, cy in centers:
+        for _ in range(count_per_cluster):
+            if gaussian:
+                positions.append((rng.gauss(cx, spread), rng.gauss(cy, spread)))
+            else:
+                positions.append((cx + rng.uniform(-spread, spread), cy + rng.uniform(-spread, spread)))
+    return positions
+
+
+def wrap_positions(positions: list[Position], map_size: tuple[int, int]) -> list[Position]:
+    """
+    Wrap positions into the map, the same way the game wraps moving objects
+    """
+    width, height = map_size
+    return [(x % width, y % height) for x, y in positions]
+
+
+#####################
+# VELOCITY FIELDS   #
+#####################
+
+def static_field() -> VelocityField:
+    return lambda x, y, rng: (0.0, 0.0)
+
+
+def uniform_field(angle: float, speed: float) -> VelocityField:
+    """
+    Every asteroid moves with the same heading (degrees) and speed
+    """
+    return lambda x, y, rng: (float(angle), float(speed))
+
+
+def random_field(max_speed: float, min_speed: float = 0.0) -> VelocityField:
+    """
+    Uniformly random heading, with a speed uniform in [min_speed, max_speed]
+    """
+    return lambda x, y, rng: (rng.uniform(0.0, 360.0), rng.uniform(min_speed, max_speed))
+
+
+def radial_field(center: Position, speed: float, inward: bool = True, angle_jitter: float = 0.0) -> VelocityField:
+    """
+    Heading straight toward (or away from) a center point, with optional uniform heading jitter in degrees
+    """
+    cx, cy = center
+
+    def field(x: float, y: float, rng: random.Random) -> tuple[float, float]:
+        heading = math.degrees(math.atan2(cy - y, cx - x)) if inward else math.degrees(math.atan2(y - cy, x - cx))
+        if angle_jitter:
+            heading += rng.uniform(-angle_jitter, angle_jitter)
+        return float(heading), float(speed)
+    return field
+
+
+def tangential_field(center: Position, speed: float = 0.0, angular_speed_deg: float = 0.0, clockwise: bool = False) -> VelocityField:
+    """
+    Circulation around a center point, with a constant speed plus a rigid-rotation term proportional to radius
+    """
+    cx, cy = center
+    direction = -1.0 if clockwise else 1.0
+    omega = math.radians(angular_speed_deg)
+
+    def field(x: float, y: float, rng: random.Random) -> tuple[float, float]:
+        theta = math.atan2(y - cy, x - cx)
+        r = math.hypot(x - cx, y - cy)
+        return float(math.degrees(theta + direction * math.pi / 2.0)), float(speed + omega * r)
+    return field
+
+
+#####################
+# SIZE MIXES        #
+#####################
+
+def fixed_size(size: int) -> SizeMix:
+    return lambda i, rng: int(size)
+
+
+def size_cycle(cycle: Sequence[int]) -> SizeMix:
+    """
+    Deterministically repeat a sequence of sizes
+    """
+    sizes = tuple(int(size) for size in cycle)
+    return lambda i, rng: sizes[i % len(sizes)]
+
+
+def size_mix(weights: dict[int, float]) -> SizeMix:
+    """
+    Draw sizes at random with the given relative weights, e.g. {1: 0.4, 2: 0.3, 3: 0.2, 4: 0.1}
+    """
+    sizes = list(weights.keys())
+    probabilities = list(weights.values())
+    return lambda i, rng: int(rng.choices(sizes, probabilities)[0])
+
+
+#####################
+# SHIPS AND TEAMS   #
+#####################
+
+def make_ship(position: Position, angle: float = 90.0, team: int = 1, lives: int = 3, mines: int = 3, team_name: str | None = None) -> dict[str, Any]:
+    ship: dict[str, Any] = {'position': (float(position[0]), float(position[1])), 'angle': float(angle), 'lives': lives, 'team': team, 'mines_remaining': mines}
+    if team_name is not None:
+        ship['team_name'] = team_name
+    return ship
+
+
+def ship_ring(num_ships: int, map_size: tuple[int, int], num_teams: int | None = None, radius_ratio: float = 0.4,
+              lives: int = 3, mines: int = 3, face_center: bool = True) -> list[dict[str, Any]]:
+    """
+    Ships evenly spaced on a ring around the map center. Teams are assigned round-robin, and leaving num_teams as None
+    gives a free-for-all with every ship on its own team.
+    """
+    width, height = map_size
+    center = (width * 0.5, height * 0.5)
+    teams = num_ships if num_teams is None else max(1, num_teams)
+    ships = []
+    for i, (x, y) in enumerate(ring_positions(num_ships, center, min(width, height) * radius_ratio)):
+        angle = math.degrees(math.atan2(center[1] - y, center[0] - x)) if face_center else 90.0
+        team = i % teams + 1
+        ships.append(make_ship((x, y), angle=angle, team=team, lives=lives, mines=mines))
+    return ships
+
+
+#####################
+# ASSEMBLY          #
+#####################
+
+def asteroid_states(positions: Sequence[Position], velocity: VelocityField | Sequence[VelocityField], sizes: SizeMix, rng: random.Random) -> list[dict[str, Any]]:
+    """
+    Combine positions, a velocity field and a size mix into explicit asteroid states. The velocity can also be a
+    sequence with one field per position, for layouts whose asteroids at the same place move differently.
+    """
+    if callable(velocity):
+        fields: list[VelocityField] = [velocity] * len(positions)
+    else:
+        fields = list(velocity)
+        if len(fields) != len(positions):
+            raise ValueError(f"Got {len(fields)} velocity fields for {len(positions)} asteroid positions")
+    states = []
+    for i, (x, y) in enumerate(positions):
+        angle, speed = fields[i](x, y, rng)
+        states.append({'position': (x, y), 'size': sizes(i, rng), 'angle': angle, 'speed': speed})
+    return states
+
+
+def generate_scenario(name: str = "Generated Scenario",
+                      map_size: tuple[int, int] = (1000, 800),
+                      num_asteroids: int = 20,
+                      positions: Callable[[random.Random], Sequence[Position]] | None = None,
+                      velocity: VelocityField | Sequence[VelocityField] | None = None,
+                      sizes: SizeMix | None = None,
+                      ship_states: list[dict[str, Any]] | None = None,
+                      seed: int | None = 0,
+                      time_limit: float = 60.0,
+                      ammo_limit_multiplier: float = 0.0,
+                      stop_if_no_ammo: bool = False,
+                      rng: random.Random | None = None) -> Scenario:
+    """
+    Build a Scenario with fully explicit asteroid states
+
+    :param positions: Optional callable taking the rng and returning positions. Defaults to num_asteroids uniform positions
+    :param velocity: Optional velocity field, or one field per asteroid. Defaults to random headings at up to 120 m/s
+    :param sizes: Optional size mix, defaults to all size 4 like Scenario's random asteroids
+    :param ship_states: Optional ship states, defaults to one ship at the map center
+    :param seed: Seed for the generator's private random.Random, and for the Scenario itself
+    :param rng: Optional random.Random to draw the layout from instead of random.Random(seed), for layouts that
+                should be reproducible without the Scenario reseeding the global random module with seed
+    """
+    if rng is None:
+        rng = random.Random(seed)
+    points = list(positions(rng)) if positions is not None else uniform_positions(num_asteroids, map_size, rng)
+    states = asteroid_states(points, velocity if velocity is not None else random_field(120.0),
+                             sizes if sizes is not None else fixed_size(4), rng)
+    # Wrap after evaluating the velocity field, so a position on or past the border keeps the heading it was given
+    for state, position in zip(states, wrap_positions(points, map_size)):
+        state['position'] = position
+    return Scenario(
+        name=name,
+        asteroid_states=states,
+        ship_states=ship_states if ship_states is not None else [make_ship((map_size[0] * 0.5, map_size[1] * 0.5))],
+        map_size=map_size,
+        seed=seed,
+        time_limit=time_limit,
+        ammo_limit_multiplier=ammo_limit_multiplier,
+        stop_if_no_ammo=stop_if_no_ammo,
+    )
+
+
+#####################
+# STRESS PRESETS    #
+#####################
+
+# Roughly the asteroid density of a 1000 asteroid field on a 3000x2400 map, so larger presets scale the map with the count
+STRESS_SIZE_MIX = {1: 0.4, 2: 0.3, 3: 0.2, 4: 0.1}
+_BASE_STRESS_COUNT = 1000
+_BASE_STRESS_MAP = (3000, 2400)
+
+
+def stress_map_size(num_asteroids: int) -> tuple[int, int]:
+    scale = math.sqrt(max(1, num_asteroids) / _BASE_STRESS_COUNT)
+    return (round(_BASE_STRESS_MAP[0] * scale), round(_BASE_STRESS_MAP[1] * scale))
+
+
+def asteroid_stress(num_asteroids: int, num_ships: int = 4, num_teams: int | None = 2, seed: int | None = 0, time_limit: float = 30.0) -> Scenario:
+    """
+    Dense random field at constant density, with several ships, to load the collision, physics and state export paths
+    """
+    map_size = stress_map_size(num_asteroids)
+    return generate_scenario(
+        name=f"Stress {num_asteroids} Asteroids",
+        map_size=map_size,
+        num_asteroids=num_asteroids,
+        velocity=random_field(150.0, 20.0),
+        sizes=size_mix(STRESS_SIZE_MIX),
+        ship_states=ship_ring(num_ships, map_size, num_teams=num_teams, radius_ratio=0.3),
+        seed=seed,
+        time_limit=time_limit,
+    )
+
+
+def free_for_all(num_ships: int, num_asteroids: int | None = None, seed: int | None = 0, time_limit: float = 60.0) -> Scenario:
+    """
+    Every ship on its own team, facing the center, in a vortex of asteroids
+    """
+    num_asteroids = num_asteroids if num_asteroids is not None else 25 * num_ships
+    map_size = stress_map_size(num_asteroids)
+    center = (map_size[0] * 0.5, map_size[1] * 0.5)
+    return generate_scenario(
+        name=f"Free For All ({num_ships} Ships)",
+        map_size=map_size,
+        num_asteroids=num_asteroids,
+        velocity=tangential_field(center, speed=40.0, angular_speed_deg=6.0),
+        sizes=size_mix(STRESS_SIZE_MIX),
+        ship_states=ship_ring(num_ships, map_size, num_teams=None, radius_ratio=0.35),
+        seed=seed,
+        time_limit=time_limit,
+    )
+
+
+PRESETS: dict[str, Callable[..., Scenario]] = {
+    'stress_1k': lambda seed=0: asteroid_stress(1000, seed=seed),
+    'stress_5k': lambda seed=0: asteroid_stress(5000, seed=seed),
+    'stress_20k': lambda seed=0: asteroid_stress(20000, seed=seed),
+    'ffa_8': lambda seed=0: free_for_all(8, seed=seed),
+    'ffa_32': lambda seed=0: free_for_all(32, seed=seed),
+}
+
+
+def preset(name: str, seed: int | None = 0) -> Scenario:
+    """
+    Build a named preset from PRESETS
+    """
+    if name not in PRESETS:
+        raise ValueError(f'Unknown scenario preset "{name}". Available presets: {", ".join(PRESETS)}')
+    return PRESETS[name](seed=seed)
@@ -5,8 +5,6 @@
 
 from typing import TYPE_CHECKING
 
-import numpy as np
-
 from .ship import Ship
 from .scenario import Scenario
 from .team import Team
@@ -21,16 +19,21 @@ class Score:
 
 
         # Initialize team classes to score team-specific scores
-        team_ids = [ship.team for ship in scenario.ships()]
-        team_names = [ship.team_name for ship in scenario.ships()]
-        self.teams = [Team(int(team_id), str(team_name)) for team_id, team_name in zip(np.unique(team_ids), np.unique(team_names))]
+        ships = scenario.ships()
+        # Pair each team id with its own name, since sorting ids and names separately mismatches them past 9 teams
+        team_names: dict[int, str] = {}
+        for ship in ships:
+            team_names.setdefault(int(ship.team), str(ship.team_name))
+        self.teams = [Team(team_id, team_names[team_id]) for team_id in sorted(team_names)]
 
         # Populate scenario initial conditions into score parameters
+        max_asteroids = scenario.max_asteroids
+        bullet_limit = scenario.bullet_limit
         for team in self.teams:
-            team.total_asteroids = scenario.max_asteroids
-            for ship in scenario.ships():
+            team.total_asteroids = max_asteroids
+            for ship in ships:
                 if team.team_id == ship.team:
-                    team.total_bullets += scenario.bullet_limit
+                    team.total_bullets += bullet_limit
 
     def update(self, ships: list[Ship], sim_time: float, controller_perf: list[float] | None = None) -> None:
         self.sim_time = sim_time
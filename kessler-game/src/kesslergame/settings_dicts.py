@@ -27,7 +27,14 @@ class SettingsDict(TypedDict, total=False):
     graphics_obj: KesslerGraphics | None
     realtime_multiplier: float
     frame_skip: int
+    video_output_path: str
+    video_frame_skip: int
     time_limit: float
     random_ast_splits: bool
     competition_safe_mode: bool
+    controller_processes: bool
+    controller_time_budget: float | None
+    controller_fallback: tuple[float, float, bool, bool] | str
+    async_controllers: bool
+    controller_action_latency: int
     UI_settings: UISettingsDict | str
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+from __future__ import annotations
+
+from math import sqrt, floor, atan2, degrees
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .state_models import AsteroidDataList
+
+
+class AsteroidGrid:
+    """
+    Uniform bucket grid over the asteroids of one frame, used by the GameState spatial queries.
+
+    The map is split into cols x rows equal cells and each asteroid index is stored in the cell
+    holding its center. With wrap=True, the map is treated as the torus the asteroids live on:
+    distances are measured to the nearest wrapped image, and cells past an edge continue on the
+    opposite side. With wrap=False, plain Euclidean distances are used.
+
+    Query results are lists of (distance, index) pairs sorted by distance, where index points
+    into the asteroid list the grid was built from.
+    """
+    __slots__ = ('_xs', '_ys', '_width', '_height', '_cols', '_rows', '_cell_w', '_cell_h', '_cells')
+
+    def __init__(self, asteroids: list[AsteroidDataList], map_size: tuple[int, int], cell_size: float | None = None) -> None:
+        width = float(map_size[0])
+        height = float(map_size[1])
+        n = len(asteroids)
+        if cell_size is None:
+            # About 2 asteroids per cell, without going below a typical asteroid size
+            cell_size = max(sqrt(2.0 * width * height / max(n, 1)), 32.0)
+        self._cols: int = max(1, int(width // cell_size))
+        self._rows: int = max(1, int(height // cell_size))
+        self._cell_w: float = width / self._cols
+        self._cell_h: float = height / self._rows
+        self._width: float = width
+        self._height: float = height
+        self._xs: list[float] = [float(a[0]) for a in asteroids]
+        self._ys: list[float] = [float(a[1]) for a in asteroids]
+        self._cells: list[list[int]] = [[] for _ in range(self._cols * self._rows)]
+        for i in range(n):
+            self._cells[self._cell_of(self._xs[i], self._ys[i])].append(i)
+
+    def __len__(self) -> int:
+        return len(self._xs)
+
+    def _cell_of(self, x: float, y: float) -> int:
+        # Positions can sit exactly on (or a hair past) the far edge, so always wrap into the map
+        col = int((x % self._width) // self._cell_w) % self._cols
+        row = int((y % self._height) // self._cell_h) % self._rows
+        return row * self._cols + col
+
+    def _offset(self, x: float, y: float, i: int, wrap: bool) -> tuple[float, float]:
+        # Vector from (x, y) to asteroid i, through the map edges if that is shorter
+        dx = self._xs[i] - x
+        dy = self._ys[i] - y
+        if wrap:
+            dx = (dx + 0.5 * self._width) % self._width - 0.5 * self._width
+            dy = (dy + 0.5 * self._height) % self._height - 0.5 * self._height
+        return dx, dy
+
+    def _block(self, col_lo: int, col_hi: int, row_lo: int, row_hi: int, wrap: bool) -> list[int]:
+        # Asteroid indices in the cells [col_lo, col_hi] x [row_lo, row_hi], each cell visited once
+        if wrap:
+            cols = range(col_lo, col_hi + 1) if col_hi - col_lo + 1 < self._cols else range(self._cols)
+            rows = range(row_lo, row_hi + 1) if row_hi - row_lo + 1 < self._rows else range(self._rows)
+        else:
+            cols = range(max(col_lo, 0), min(col_hi, self._cols - 1) + 1)
+            rows = range(max(row_lo, 0), min(row_hi, self._rows - 1) + 1)
+        found: list[int] = []
+        for r in rows:
+            base = (r % self._rows) * self._cols
+            for c in cols:
+                found.extend(self._cells[base + c % self._cols])
+        return found
+
+    def within(self, x: float, y: float, radius: float, wrap: bool = True) -> list[tuple[float, int]]:
+        """All asteroids whose center is within radius of (x, y)."""
+        if radius < 0.0 or not self._xs:
+            return []
+        col_lo = floor((x - radius) / self._cell_w)
+        col_hi = floor((x + radius) / self._cell_w)
+        row_lo = floor((y - radius) / self._cell_h)
+        row_hi = floor((y + radius) / self._cell_h)
+        hits: list[tuple[float, int]] = []
+        r2 = radius * radius
+        for i in self._block(col_lo, col_hi, row_lo, row_hi, wrap):
+            dx, dy = self._offset(x, y, i, wrap)
+            d2 = dx * dx + dy * dy
+            if d2 <= r2:
+                hits.append((sqrt(d2), i))
+        hits.sort()
+        return hits
+
+    def nearest(self, x: float, y: float, k: int = 1, wrap: bool = True) -> list[tuple[float, int]]:
+        """The k asteroids closest to (x, y), closest first."""
+        n = len(self._xs)
+        if k <= 0 or n == 0:
+            return []
+        k = min(k, n)
+        # Search rings of cells around (x, y). After ring r, anything not yet seen is at least
+        # r cells away, so stop once the k-th best candidate is closer than that.
+        col = floor(x / self._cell_w)
+        row = floor(y / self._cell_h)
+        step = min(self._cell_w, self._cell_h)
+        max_ring = max(self._cols, self._rows)
+        seen: set[int] = set()
+        best: list[tuple[float, int]] = []
+        ring = 0
+        while True:
+            block = self._block(col - ring, col + ring, row - ring, row + ring, wrap)
+            for i in block:
+                if i not in seen:
+                    seen.add(i)
+                    dx, dy = self._offset(x, y, i, wrap)
+                    best.append((sqrt(dx * dx + dy * dy), i))
+            best.sort()
+            del best[k:]
+            if len(seen) == n or (len(best) == k and best[-1][0] <= ring * step) or ring > max_ring:
+                return best
+            ring += 1
+
+    def in_sector(self, x: float, y: float, heading: float, half_angle: float, radius: float,
+                  wrap: bool = True) -> list[tuple[float, int]]:
+        """
+        Asteroids within radius of (x, y) whose bearing is within half_angle degrees of heading
+        (degrees, the game's convention). heading + 180 gives the cone behind a ship.
+        """
+        hits: list[tuple[float, int]] = []
+        for d, i in self.within(x, y, radius, wrap):
+            dx, dy = self._offset(x, y, i, wrap)
+            off = (degrees(atan2(dy, dx)) - heading + 180.0) % 360.0 - 180.0
+            if abs(off) <= half_angle or d == 0.0:
+                hits.append((d, i))
+        return hits
+
+
+class LazyAsteroidGrid:
+    """
+    An AsteroidGrid built on first use, so every GameState copy of one frame can share a single grid.
+
+    The grid copies the asteroid coordinates when it is built, so the asteroids list must not change
+    until then. The game hands it its own asteroid states and builds it before they move on.
+    """
+    __slots__ = ('_asteroids', '_map_size', '_grid')
+
+    def __init__(self, asteroids: list[AsteroidDataList], map_size: tuple[int, int]) -> None:
+        self._asteroids = asteroids
+        self._map_size = map_size
+        self._grid: AsteroidGrid | None = None
+
+    def get(self) -> AsteroidGrid:
+        if self._grid is None:
+            self._grid = AsteroidGrid(self._asteroids, self._map_size)
+        return self._grid
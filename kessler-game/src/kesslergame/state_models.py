@@ -8,6 +8,8 @@ from typing import Literal, overload, cast, Iterator, TypedDict, TypeAlias, Any
 import builtins
 import copy
 
+from .spatial_index import AsteroidGrid, LazyAsteroidGrid
+
 
 ShipDataList: TypeAlias = list[float | int | bool]
 AsteroidDataList: TypeAlias = list[float | int]
@@ -904,6 +906,7 @@ class GameState:
         "_frame_rate",
         "_random_asteroid_splits",
         "_competition_safe_mode",
+        "_asteroid_grid",
     )
 
     def __init__(self,
@@ -918,7 +921,8 @@ class GameState:
                  delta_time: float,
                  frame_rate: float,
                  random_asteroid_splits: bool,
-                 competition_safe_mode: bool):
+                 competition_safe_mode: bool,
+                 asteroid_grid: LazyAsteroidGrid | None = None):
         # Game entities
         self._ship_data = ships
         self._asteroid_data = asteroids
@@ -935,6 +939,9 @@ class GameState:
         # Game settings
         self._random_asteroid_splits = random_asteroid_splits
         self._competition_safe_mode = competition_safe_mode
+        # Spatial index over the asteroids, built by the first query of a frame. The game passes one
+        # shared by every copy of the same frame, so it is built once per frame for all controllers.
+        self._asteroid_grid: LazyAsteroidGrid | None = asteroid_grid
 
     @property
     def ships(self) -> list[ShipView]:
@@ -959,6 +966,7 @@ class GameState:
     @time.setter
     def time(self, value: float) -> None:
         self._time = value
+        self._asteroid_grid = None
 
     @property
     def frame(self) -> int:
@@ -967,6 +975,7 @@ class GameState:
     @frame.setter
     def frame(self, value: int) -> None:
         self._frame = value
+        self._asteroid_grid = None
 
     @property
     def delta_time(self) -> float:
@@ -994,9 +1003,11 @@ class GameState:
 
     def add_asteroid(self, asteroid_data: AsteroidDataList) -> None:
         self._asteroid_data.append(asteroid_data)
+        self._asteroid_grid = None
 
     def add_asteroids(self, asteroid_list: list[AsteroidDataList]) -> None:
         self._asteroid_data.extend(asteroid_list)
+        self._asteroid_grid = None
 
     def add_bullet(self, bullet_data: BulletDataList) -> None:
         self._bullet_data.append(bullet_data)
@@ -1013,6 +1024,36 @@ class GameState:
         self._asteroid_data[index] = self._asteroid_data[-1]
         # Pop the last element
         self._asteroid_data.pop()
+        self._asteroid_grid = None
+
+    # Spatial queries. They share one grid index per frame, also across the copies that
+    # competition_safe_mode hands each controller. Changing the asteroids drops this copy's share.
+    # Results are (AsteroidView, distance) pairs, closest first. With wrap=True (the default)
+    # distances are measured across the map edges, the way asteroids wrap around.
+
+    def _asteroids_index(self) -> AsteroidGrid:
+        if self._asteroid_grid is None:
+            self._asteroid_grid = LazyAsteroidGrid(self._asteroid_data, self._map_size)
+        return self._asteroid_grid.get()
+
+    def nearest_asteroids(self, position: tuple[float, float], k: int = 1, wrap: bool = True) -> list[tuple[AsteroidView, float]]:
+        """The k asteroids closest to position."""
+        hits = self._asteroids_index().nearest(position[0], position[1], k, wrap)
+        return [(AsteroidView(self._asteroid_data[i]), d) for d, i in hits]
+
+    def asteroids_within(self, position: tuple[float, float], radius: float, wrap: bool = True) -> list[tuple[AsteroidView, float]]:
+        """All asteroids whose center is within radius of position."""
+        hits = self._asteroids_index().within(position[0], position[1], radius, wrap)
+        return [(AsteroidView(self._asteroid_data[i]), d) for d, i in hits]
+
+    def asteroids_in_sector(self, position: tuple[float, float], heading: float, half_angle: float, radius: float,
+                            wrap: bool = True) -> list[tuple[AsteroidView, float]]:
+        """
+        Asteroids within radius of position and within half_angle degrees of heading, e.g. the cone
+        behind a ship is asteroids_in_sector(ship.position, ship.heading + 180.0, 30.0, 200.0).
+        """
+        hits = self._asteroids_index().in_sector(position[0], position[1], heading, half_angle, radius, wrap)
+        return [(AsteroidView(self._asteroid_data[i]), d) for d, i in hits]
 
     def remove_bullet(self, index: int) -> None:
         """Remove bullet at index using swap-and-pop O(1)"""
@@ -1066,7 +1107,8 @@ class GameState:
                 f"Properties: ships, asteroids, bullets, mines, "
                 f"map_size, time_limit, time, frame, delta_time, "
                 f"frame_rate, random_asteroid_splits, competition_safe_mode, "
-                f".dict -> dict, .compact -> dict")
+                f".dict -> dict, .compact -> dict, "
+                f"nearest_asteroids(), asteroids_within(), asteroids_in_sector()")
 
     def __str__(self) -> str:
         return (f"GameState @ frame {self.frame} ({self.time}s)\n"
@@ -1077,7 +1119,8 @@ class GameState:
                 f"Properties: ships, asteroids, bullets, mines, "
                 f"map_size, time_limit, time, frame, delta_time, "
                 f"frame_rate, random_asteroid_splits, competition_safe_mode, "
-                f".dict -> dict, .compact -> dict")
+                f".dict -> dict, .compact -> dict, "
+                f"nearest_asteroids(), asteroids_within(), asteroids_in_sector()")
 
     @property
     def dict(self) -> GameStateDict:
@@ -0,0 +1,95 @@
+import asyncio
+import math
+
+import pytest
+
+from kesslergame import KesslerGame, KesslerController, GraphicsType, Scenario
+
+
+class WiggleController(KesslerController):
+    name = "wiggle"
+
+    def actions(self, ship_state, game_state):
+        f = game_state.frame
+        return 200.0 * math.sin(f / 17.0 + self.ship_id), 150.0 * math.cos(f / 11.0), f % 7 == 0, False
+
+
+class AwaitingWiggleController(WiggleController):
+    name = "awaiting wiggle"
+
+    def actions(self, ship_state, game_state):
+        raise AssertionError("The async path must not call actions")
+
+    async def actions_async(self, ship_state, game_state):
+        # Stands in for a request to a model server
+        await asyncio.sleep(0.001)
+        return WiggleController.actions(self, ship_state, game_state)
+
+
+class TurnByFrameController(KesslerController):
+    """Turns at 10 deg/s per frame number of the state it decided from, and records every state it saw."""
+    name = "turn by frame"
+
+    def __init__(self):
+        self.headings = {}
+
+    async def actions_async(self, ship_state, game_state):
+        self.headings[game_state.frame] = ship_state.heading
+        return 0.0, 10.0 * (game_state.frame + 1), False, False
+
+
+class FailingController(KesslerController):
+    name = "failing"
+
+    async def actions_async(self, ship_state, game_state):
+        if game_state.frame == 3:
+            raise ValueError("model server unavailable")
+        return 0.0, 0.0, False, False
+
+
+def _scenario(time_limit=3.0):
+    return Scenario(num_asteroids=8, ship_states=[{'position': (300, 400)}, {'position': (700, 400)}],
+                    seed=4, time_limit=time_limit)
+
+
+def _play(controller_cls, **settings):
+    game = KesslerGame(settings={'graphics_type': GraphicsType.NoGraphics, 'prints_on': False, **settings})
+    score, _ = game.run(scenario=_scenario(), controllers=[controller_cls(), controller_cls()])
+    return score.sim_time, [(team.asteroids_hit, team.deaths, team.bullets_hit, team.shots_fired) for team in score.teams]
+
+
+@pytest.mark.parametrize("safe_mode", [True, False])
+def test_sync_controller_through_async_path(safe_mode):
+    inline = _play(WiggleController, competition_safe_mode=safe_mode)
+    assert _play(WiggleController, async_controllers=True, competition_safe_mode=safe_mode) == inline
+
+
+def test_awaiting_controller():
+    inline = _play(WiggleController)
+    assert _play(AwaitingWiggleController, async_controllers=True) == inline
+
+
+def test_one_frame_latency():
+    controller = TurnByFrameController()
+    scenario = Scenario(asteroid_states=[{'position': (50, 50), 'speed': 0.0}],
+                        ship_states=[{'position': (500, 400), 'angle': 0.0}], time_limit=0.5)
+    game = KesslerGame(settings={'graphics_type': GraphicsType.NoGraphics, 'prints_on': False,
+                                 'async_controllers': True, 'controller_action_latency': 1})
+    game.run(scenario=scenario, controllers=[controller])
+
+    headings = controller.headings
+    assert len(headings) > 5
+    # Frame 0 has no earlier decision, so the ship idles
+    assert headings[1] == pytest.approx(headings[0])
+    # Frame N applies the decision made from frame N - 1, which turns at 10 * N deg/s
+    for frame in range(1, len(headings) - 1):
+        turned = (headings[frame + 1] - headings[frame]) % 360.0
+        assert turned == pytest.approx(10.0 * frame * game.delta_time)
+
+
+@pytest.mark.parametrize("latency", [0, 1])
+def test_exception_reaches_run(latency):
+    game = KesslerGame(settings={'graphics_type': GraphicsType.NoGraphics, 'prints_on': False,
+                                 'async_controllers': True, 'controller_action_latency': latency})
+    with pytest.raises(ValueError, match="model server unavailable"):
+        game.run(scenario=_scenario(), controllers=[FailingController(), FailingController()])
@@ -0,0 +1,115 @@
+import time
+
+from kesslergame import KesslerGame, KesslerController, GraphicsType, Scenario
+from kesslergame.controller_process import ControllerPool, IDLE_ACTION
+
+
+class SteadyController(KesslerController):
+    name = "steady"
+
+    def actions(self, ship_state, game_state):
+        # Encode what the worker read from shared memory into the action, so it can be checked
+        return float(len(game_state.asteroids)), float(game_state.frame), False, False
+
+
+class SlowController(SteadyController):
+    name = "slow"
+
+    def actions(self, ship_state, game_state):
+        if game_state.frame % 2 == 1:
+            time.sleep(0.2)
+        return super().actions(ship_state, game_state)
+
+
+def _game_settings():
+    return {'map_size': (1000, 800), 'time_limit': 10.0, 'delta_time': 1 / 30, 'frame_rate': 30.0,
+            'random_asteroid_splits': False, 'competition_safe_mode': True}
+
+
+def _step(pool, frame, n_asteroids, own_states):
+    asteroids = [[100.0 * i, 100.0, 10.0, 0.0, 3, 10.0, 24.0] for i in range(n_asteroids)]
+    return pool.step(frame, frame / 30, own_states, [], asteroids, [], [])
+
+
+def _own_state(ship_id):
+    return [400.0, 400.0, 0.0, 0.0, 0.0, 90.0, 300.0, 20.0, ship_id, 1, False, 3, 0] + [0.0] * 16
+
+
+def test_pool_reads_shared_state():
+    controller = SteadyController()
+    controller.ship_id = 1
+    pool = ControllerPool([controller], _game_settings())
+    try:
+        # The shared block grows past its initial size on the second frame
+        for frame, n_asteroids in ((0, 3), (1, 5000), (2, 0)):
+            actions, elapsed = _step(pool, frame, n_asteroids, {0: _own_state(1)})
+            assert actions[0] == (float(n_asteroids), float(frame), False, False)
+            assert elapsed[0] >= 0.0
+        assert pool.overruns == [0]
+    finally:
+        pool.close()
+
+
+def test_pool_deadline_fallback():
+    fallback = (1.0, 2.0, False, False)
+    slow = SlowController()
+    slow.ship_id = 1
+    steady = SteadyController()
+    steady.ship_id = 2
+    pool = ControllerPool([slow, steady], _game_settings(), time_budget=0.05, fallback=fallback)
+    try:
+        actions, _ = _step(pool, 0, 2, {0: _own_state(1), 1: _own_state(2)})
+        assert actions == {0: (2.0, 0.0, False, False), 1: (2.0, 0.0, False, False)}
+        actions, elapsed = _step(pool, 1, 2, {0: _own_state(1), 1: _own_state(2)})
+        assert actions == {0: fallback, 1: (2.0, 1.0, False, False)}
+        assert elapsed[0] >= 0.05
+        assert pool.overruns == [1, 0]
+    finally:
+        pool.close()
+
+
+def test_pool_repeat_fallback():
+    slow = SlowController()
+    slow.ship_id = 1
+    pool = ControllerPool([slow], _game_settings(), time_budget=0.05, fallback="repeat")
+    try:
+        first, _ = _step(pool, 0, 4, {0: _own_state(1)})
+        second, _ = _step(pool, 1, 4, {0: _own_state(1)})
+        assert second == first
+        assert pool.overruns == [1]
+    finally:
+        pool.close()
+
+
+def test_game_counts_overruns():
+    scenario = Scenario(num_asteroids=5, ship_states=[{'position': (300, 400)}, {'position': (700, 400)}],
+                        seed=1, time_limit=0.5)
+    game = KesslerGame(settings={'graphics_type': GraphicsType.NoGraphics, 'perf_tracker': True, 'prints_on': False,
+                                 'controller_processes': True, 'controller_time_budget': 0.02,
+                                 'controller_fallback': IDLE_ACTION})
+    score, perf_dict = game.run(scenario=scenario, controllers=[SlowController(), SteadyController()])
+    assert score.sim_time > 0.0
+    assert perf_dict['controller_overruns'][0] > 0
+    assert perf_dict['controller_overruns'][1] == 0
+
+
+def test_pool_rejects_mismatched_ship_id():
+    class Reassigned(SteadyController):
+        # Takes no notice of the ship the game assigns it
+        @property
+        def ship_id(self):
+            return 99
+
+        @ship_id.setter
+        def ship_id(self, value):
+            pass
+
+    scenario = Scenario(num_asteroids=3, ship_states=[{'position': (300, 400)}], seed=1, time_limit=0.5)
+    game = KesslerGame(settings={'graphics_type': GraphicsType.NoGraphics, 'prints_on': False,
+                                 'controller_processes': True})
+    try:
+        game.run(scenario=scenario, controllers=[Reassigned()])
+    except RuntimeError as e:
+        assert "ID do not match" in str(e)
+    else:
+        raise AssertionError("A mismatched controller was accepted")
@@ -0,0 +1,61 @@
+import math
+
+import pytest
+
+from kesslergame import KesslerGame, KesslerController, GraphicsType, Scenario
+from kesslergame import spatial_index
+
+
+class NearestController(KesslerController):
+    """Queries the nearest asteroids every frame and checks them against a brute-force search."""
+    name = "nearest"
+
+    def __init__(self, frames):
+        self.frames = frames
+
+    def actions(self, ship_state, game_state):
+        x, y = ship_state.position
+        width, height = game_state.map_size
+        hits = game_state.nearest_asteroids((x, y), k=3)
+
+        def wrapped(a):
+            dx = (a.x - x + 0.5 * width) % width - 0.5 * width
+            dy = (a.y - y + 0.5 * height) % height - 0.5 * height
+            return math.hypot(dx, dy)
+
+        expected = sorted(wrapped(a) for a in game_state.asteroids)[:3]
+        assert [d for _, d in hits] == pytest.approx(expected)
+        self.frames.append(game_state.frame)
+        return 50.0, 30.0, False, False
+
+    async def actions_async(self, ship_state, game_state):
+        return self.actions(ship_state, game_state)
+
+
+@pytest.fixture
+def grid_builds(monkeypatch):
+    builds = []
+
+    class CountingGrid(spatial_index.AsteroidGrid):
+        def __init__(self, *args, **kwargs):
+            builds.append(1)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(spatial_index, "AsteroidGrid", CountingGrid)
+    return builds
+
+
+@pytest.mark.parametrize("extra", [{}, {'async_controllers': True, 'controller_action_latency': 1}])
+def test_one_grid_per_frame_in_safe_mode(grid_builds, extra):
+    frames = []
+    scenario = Scenario(num_asteroids=20, ship_states=[{'position': (200, 200)}, {'position': (500, 400)}, {'position': (800, 600)}],
+                        seed=7, time_limit=1.0)
+    game = KesslerGame(settings={'graphics_type': GraphicsType.NoGraphics, 'prints_on': False,
+                                 'competition_safe_mode': True, **extra})
+    game.run(scenario=scenario, controllers=[NearestController(frames) for _ in range(3)])
+
+    # Every live ship queried every frame, from its own GameState copy
+    assert len(frames) > 2 * len(set(frames))
+    # Pipelined decisions build the grid before submitting, also for the last frame whose batch is dropped
+    unqueried = 1 if extra.get('controller_action_latency') else 0
+    assert len(grid_builds) == len(set(frames)) + unqueried